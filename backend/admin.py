@@ -0,0 +1,76 @@
+# backend/admin.py
+
+import os
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from backend.profiling import list_profiles, profile_files
+from backend.diagnostics import memory_report, stop_tracing
+
+# Admin features (profiling, diagnostics) are disabled unless a token is set
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def is_admin_token(token: str | None) -> bool:
+    if not ADMIN_TOKEN or token is None:
+        return False
+    return secrets.compare_digest(token, ADMIN_TOKEN)
+
+
+def require_admin(x_admin_token: str | None = Header(default=None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+# ---------- Profiles ----------
+@router.get("/profiles")
+def get_profiles():
+    return {"profiles": list_profiles()}
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, format: str | None = None):
+    try:
+        files = profile_files(profile_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not files:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    fmt = format or next(iter(files))
+    if fmt not in files:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Profile has no '{fmt}' output (available: {list(files)})"
+        )
+
+    path = files[fmt]
+    return FileResponse(path, filename=os.path.basename(path))
+
+
+# ---------- Diagnostics ----------
+@router.get("/diagnostics/memory")
+def get_memory_diagnostics(top: int = 10, trace: bool = True):
+    """
+    RSS, loaded models, caches and top allocation sites. Consecutive calls
+    are diffed against each other to make leaks easy to spot.
+    """
+    return memory_report(top=top, trace=trace)
+
+
+@router.delete("/diagnostics/memory/tracing")
+def stop_memory_tracing():
+    stop_tracing()
+    return {"tracing": False}
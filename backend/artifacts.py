@@ -0,0 +1,51 @@
+# backend/artifacts.py
+
+import os
+import uuid
+from contextlib import ExitStack, contextmanager
+
+
+def get_meta_path(model_path: str) -> str:
+    """Metadata sidecar stored next to a model artifact."""
+    return os.path.splitext(model_path)[0] + ".meta.json"
+
+
+@contextmanager
+def atomic_path(path: str):
+    """
+    Yield a temporary path next to `path`; on success it is renamed over
+    `path` in one step, so readers never observe a half-written artifact.
+    The temporary name keeps the extension (Keras checks it on save).
+    """
+    with _staged_path(path) as tmp_path:
+        yield tmp_path
+        os.replace(tmp_path, path)
+
+
+@contextmanager
+def atomic_paths(*paths: str):
+    """
+    Like atomic_path for a set of artifacts that belong together: every
+    file is written to its temporary path first and they are renamed into
+    place back to back only once all writes succeeded.
+    """
+    with ExitStack() as stack:
+        tmp_paths = [stack.enter_context(_staged_path(p)) for p in paths]
+        yield tmp_paths
+        for tmp_path, path in zip(tmp_paths, paths):
+            os.replace(tmp_path, path)
+
+
+@contextmanager
+def _staged_path(path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.tmp-{os.getpid()}-{uuid.uuid4().hex[:8]}{ext}"
+    try:
+        yield tmp_path
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
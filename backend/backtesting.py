@@ -1,5 +1,8 @@
 import numpy as np
-from sklearn.metrics import mean_absolute_error, mean_squared_error
+import pandas as pd
+
+from backend.features import FEATURE_COLS
+from backend.risk import TRADING_DAYS
 
 
 def walk_forward_backtest(
@@ -10,6 +13,8 @@ def walk_forward_backtest(
     prices: actual close prices (array)
     predictions: model predicted prices (array)
     """
+    # sklearn is imported lazily so the API can import this module cheaply
+    from sklearn.metrics import mean_absolute_error, mean_squared_error
 
     mae = mean_absolute_error(prices, predictions)
     rmse = mean_squared_error(prices, predictions) ** 0.5
@@ -28,3 +33,189 @@ def walk_forward_backtest(
         "RMSE": round(float(rmse), 4),
         "Directional_Accuracy": round(float(directional_accuracy), 4),
     }
+
+
+# -------------------------------------------------
+# Vectorized engine
+# -------------------------------------------------
+SIZING_METHODS = ("fixed", "vol_target")
+
+
+def size_positions(signals, prices, sizing="fixed", leverage=1.0, target_vol=0.15,
+                   vol_window=20, periods_per_year=TRADING_DAYS):
+    """
+    Turn signals (any real number; sign is direction, magnitude is
+    conviction) into position weights.
+
+    fixed:      weight = signal * leverage
+    vol_target: weight = signal * target_vol / trailing realized volatility,
+                using only returns known at each bar's close
+    """
+    signals = np.nan_to_num(np.asarray(signals, dtype=float))
+    if sizing == "fixed":
+        return signals * leverage
+    if sizing != "vol_target":
+        raise ValueError(f"Unknown sizing '{sizing}'; expected one of {SIZING_METHODS}")
+
+    returns = pd.Series(prices).pct_change()
+    realized = returns.rolling(vol_window).std().to_numpy() * np.sqrt(periods_per_year)
+    scale = np.divide(target_vol, realized, out=np.zeros_like(realized), where=realized > 0)
+    return signals * np.nan_to_num(scale)
+
+
+def run_backtest(prices, signals, capital=100000, cost_bps=0.0, slippage_bps=0.0,
+                 sizing="fixed", leverage=1.0, max_leverage=1.0, allow_short=True,
+                 target_vol=0.15, vol_window=20, periods_per_year=TRADING_DAYS,
+                 dates=None, series=True) -> dict:
+    """
+    Backtest precomputed signals in one vectorized pass.
+
+    signals[t] is decided at the close of bar t and held over the move
+    from prices[t] to prices[t + 1], so the last signal is never traded.
+    NaN signals (indicator warm-up) mean flat. Every unit of turnover pays
+    cost_bps + slippage_bps of traded notional. With series=False only
+    the scalar metrics are returned (parameter sweeps).
+    """
+    prices = np.asarray(prices, dtype=float)
+    signals = np.asarray(signals, dtype=float)
+    if len(prices) != len(signals):
+        raise ValueError(f"{len(prices)} prices but {len(signals)} signals")
+    if len(prices) < 2:
+        raise ValueError("Need at least two prices to backtest")
+
+    positions = size_positions(
+        signals, prices, sizing, leverage, target_vol, vol_window, periods_per_year
+    )[:-1]
+    positions = np.clip(positions, 0.0 if not allow_short else -max_leverage, max_leverage)
+
+    asset_returns = np.diff(prices) / prices[:-1]
+    turnover = np.abs(np.diff(positions, prepend=0.0))
+    costs = turnover * (cost_bps + slippage_bps) / 1e4
+    returns = positions * asset_returns - costs
+
+    return tearsheet(
+        returns, positions, turnover, costs, capital, periods_per_year,
+        dates=None if dates is None else list(dates)[1:], series=series,
+    )
+
+
+def tearsheet(returns, positions, turnover, costs, capital=100000,
+              periods_per_year=TRADING_DAYS, dates=None, series=True) -> dict:
+    equity = capital * np.cumprod(1 + returns)
+    peak = np.maximum.accumulate(np.concatenate([[capital], equity]))[1:]
+    drawdown = equity / peak - 1
+
+    n = len(returns)
+    final = float(equity[-1]) if n else float(capital)
+    std = returns.std()
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2)) if n else 0.0
+    active = positions != 0
+
+    sheet = {
+        "final_equity": final,
+        "total_return": final / capital - 1,
+        "cagr": (final / capital) ** (periods_per_year / n) - 1 if n and final > 0 else -1.0,
+        "volatility": float(std * np.sqrt(periods_per_year)),
+        "sharpe": float(returns.mean() / std * np.sqrt(periods_per_year)) if std > 0 else 0.0,
+        "sortino": (
+            float(returns.mean() / downside * np.sqrt(periods_per_year)) if downside > 0 else 0.0
+        ),
+        "max_drawdown": float(drawdown.min()) if n else 0.0,
+        "turnover": float(turnover.mean() * periods_per_year) if n else 0.0,
+        "hit_rate": float((returns[active] > 0).mean()) if active.any() else 0.0,
+        "exposure": float(active.mean()) if n else 0.0,
+        "n_trades": int(np.count_nonzero(turnover)),
+        "total_costs": float((costs * np.concatenate([[capital], equity[:-1]])).sum()),
+    }
+    if series:
+        sheet.update(
+            equity_curve=equity.tolist(),
+            drawdown=drawdown.tolist(),
+            positions=positions.tolist(),
+            dates=[str(d) for d in dates] if dates is not None else None,
+        )
+    return sheet
+
+
+# -------------------------------------------------
+# Strategy signals
+# -------------------------------------------------
+def _hold(entries):
+    """Carry each entry/exit forward until the next one (NaN before the first)."""
+    return pd.Series(entries, dtype=float).ffill().to_numpy()
+
+
+def rsi_signals(rsi, lower=30.0, upper=70.0, exit_level=50.0):
+    """Mean reversion: long below `lower`, short above `upper`, flat once RSI crosses `exit_level`."""
+    rsi = np.asarray(rsi, dtype=float)
+    entries = np.full(len(rsi), np.nan)
+    prev = np.concatenate([[np.nan], rsi[:-1]])
+    crossed = ((prev < exit_level) & (rsi >= exit_level)) | ((prev > exit_level) & (rsi <= exit_level))
+    entries[crossed] = 0.0
+    entries[rsi < lower] = 1.0
+    entries[rsi > upper] = -1.0
+    return _hold(entries)
+
+
+def ema_crossover_signals(fast, slow):
+    """Trend following: long while the fast EMA is above the slow one, short below."""
+    return np.sign(np.asarray(fast, dtype=float) - np.asarray(slow, dtype=float))
+
+
+def model_signals(predictor, features, lookback=None, threshold=0.0):
+    """Sign of the next-bar return predicted from the window ending before each bar."""
+    lookback = lookback or predictor.lookback
+    signals = np.full(len(features), np.nan)
+    ends = np.arange(lookback, len(features))
+    if len(ends):
+        predicted = predictor.predict_returns_batch(features, ends)[:, 0]
+        signals[ends] = np.where(np.abs(predicted) > threshold, np.sign(predicted), 0.0)
+    return signals
+
+
+# TradingEnv action -> position
+RL_POSITIONS = np.array([-1.0, 0.0, 1.0])
+
+
+def rl_signals(agent, features, sentiment=None):
+    """
+    Replay the DQN policy over history. The agent's state includes its
+    current position, so Q-values are computed in three batched passes
+    (one per possible position) and the path is resolved afterwards with
+    a table lookup per bar.
+    """
+    features = np.asarray(features, dtype=np.float32)
+    n = len(features)
+    if sentiment is None:
+        sentiment = np.zeros(n, dtype=np.float32)
+
+    actions = np.stack([
+        np.argmax(agent.q_values(np.column_stack([
+            features, sentiment, np.full(n, position, dtype=np.float32)
+        ])), axis=1)
+        for position in RL_POSITIONS
+    ])  # (current position index, bar) -> action
+
+    signals = np.empty(n)
+    current = 1  # flat
+    for t in range(n):
+        current = actions[current, t]
+        signals[t] = RL_POSITIONS[current]
+    return signals
+
+
+STRATEGIES = ("lstm", "rl", "rsi", "ema_crossover")
+
+
+def strategy_signals(strategy, df_feat, predictor=None, agent=None, **params):
+    if strategy == "rsi":
+        return rsi_signals(df_feat["rsi"].values, **params)
+    if strategy == "ema_crossover":
+        return ema_crossover_signals(df_feat["ema_20"].values, df_feat["ema_50"].values)
+
+    features = df_feat[FEATURE_COLS].values
+    if strategy == "lstm":
+        return model_signals(predictor, features, **params)
+    if strategy == "rl":
+        return rl_signals(agent, features)
+    raise ValueError(f"Unknown strategy '{strategy}'; expected one of {STRATEGIES}")
@@ -0,0 +1,166 @@
+# backend/batching.py
+"""
+Dynamic micro-batching for model inference.
+
+Concurrent requests that target the same model (one symbol's LSTM or DQN,
+or the shared FinBERT) are queued under a common key. A dispatcher thread
+runs a queue as one batched forward pass once it holds
+INFERENCE_BATCH_MAX_SIZE requests or its oldest request has waited
+INFERENCE_BATCH_MAX_WAIT_MS, then fans the results back out.
+
+    batcher = get_batcher("lstm")
+    row = batcher(key, stacked(predictor.predict_windows), window)     # sync
+    row = await batcher.run(key, stacked(predictor.predict_windows), window)
+"""
+
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import numpy as np
+
+from backend.metrics import histogram
+
+BATCHING_ENABLED = os.getenv("INFERENCE_BATCHING", "1") != "0"
+MAX_BATCH_SIZE = int(os.getenv("INFERENCE_BATCH_MAX_SIZE", "32"))
+MAX_WAIT_MS = float(os.getenv("INFERENCE_BATCH_MAX_WAIT_MS", "5"))
+
+BATCH_SIZE = histogram(
+    "inference_batch_size",
+    "Requests served per batched forward pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+QUEUE_WAIT = histogram(
+    "inference_queue_wait_seconds",
+    "Time a request waited for its batch to be dispatched",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+
+def stacked(fn):
+    """Adapt `fn(array[n, ...]) -> array[n, ...]` to a per-item batch function."""
+    def batch_fn(items):
+        return list(fn(np.stack(items)))
+    return batch_fn
+
+
+class MicroBatcher:
+    def __init__(self, name: str, max_batch_size: int = MAX_BATCH_SIZE,
+                 max_wait_ms: float = MAX_WAIT_MS, enabled: bool = BATCHING_ENABLED):
+        self.name = name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.enabled = enabled and self.max_batch_size > 1
+        self._cond = threading.Condition()
+        self._queues = {}  # key -> SimpleNamespace(fn, deadline, pending)
+        self._thread = None
+
+    def submit(self, key, fn, item) -> Future:
+        """
+        Queue `item` for the model identified by `key`. `fn(items)` must
+        return one result per item; the first queued request's `fn` serves
+        the whole batch, so every caller sharing a key must share weights.
+        """
+        future = Future()
+        entry = (item, future, time.perf_counter())
+
+        if not self.enabled:
+            self._run(fn, [entry])
+            return future
+
+        with self._cond:
+            queue = self._queues.get(key)
+            if queue is None:
+                queue = SimpleNamespace(fn=fn, deadline=entry[2] + self.max_wait, pending=[])
+                self._queues[key] = queue
+            queue.pending.append(entry)
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._dispatch_loop, name=f"batcher-{self.name}", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def __call__(self, key, fn, item):
+        return self.submit(key, fn, item).result()
+
+    async def run(self, key, fn, item):
+        """Awaitable submit: the event loop keeps serving while the batch fills."""
+        return await asyncio.wrap_future(self.submit(key, fn, item))
+
+    def _ready(self, now):
+        return [
+            key for key, queue in self._queues.items()
+            if len(queue.pending) >= self.max_batch_size or queue.deadline <= now
+        ]
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.perf_counter()
+                    ready = self._ready(now)
+                    if ready:
+                        break
+                    timeout = (
+                        min(q.deadline for q in self._queues.values()) - now
+                        if self._queues else None
+                    )
+                    self._cond.wait(timeout)
+
+                batches = []
+                for key in ready:
+                    queue = self._queues[key]
+                    batch = queue.pending[:self.max_batch_size]
+                    queue.pending = queue.pending[self.max_batch_size:]
+                    # Overflow keeps its (already expired) deadline and goes next round
+                    if not queue.pending:
+                        del self._queues[key]
+                    batches.append((queue.fn, batch))
+
+            for fn, batch in batches:
+                self._run(fn, batch)
+
+    def _run(self, fn, batch):
+        # Skip requests whose caller has gone away (cancelled futures)
+        batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            QUEUE_WAIT.observe(started - enqueued, model=self.name)
+        BATCH_SIZE.observe(len(batch), model=self.name)
+
+        try:
+            results = fn([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"Batch function returned {len(results)} results for {len(batch)} requests"
+                )
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+
+# -------------------------------------------------
+# Shared batchers (one dispatcher thread per model family)
+# -------------------------------------------------
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(name: str) -> MicroBatcher:
+    with _batchers_lock:
+        if name not in _batchers:
+            _batchers[name] = MicroBatcher(name)
+        return _batchers[name]
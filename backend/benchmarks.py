@@ -0,0 +1,384 @@
+# backend/benchmarks.py
+"""
+Micro-benchmarks for the backend hot paths.
+
+Runs on deterministic synthetic OHLCV data and tiny model stand-ins, never
+touches the network, and writes machine-readable JSON that can be compared
+across commits:
+
+    python -m backend.benchmarks --output bench.json
+    python -m backend.benchmarks --compare bench.json --threshold 1.25
+
+Benchmarks whose optional dependencies (TensorFlow, torch) are missing are
+reported as skipped rather than failing the run.
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import platform
+import argparse
+import statistics
+import subprocess
+from types import SimpleNamespace
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+import numpy as np
+import pandas as pd
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str, number: int = 1, requires=()):
+    """Register `setup -> callable` as a benchmark."""
+    def decorator(setup):
+        BENCHMARKS[name] = SimpleNamespace(
+            name=name, setup=setup, number=number, requires=tuple(requires)
+        )
+        return setup
+    return decorator
+
+
+# -------------------------------------------------
+# Synthetic fixtures
+# -------------------------------------------------
+def synthetic_ohlcv(n_bars: int = 504, seed: int = 42):
+    """Seeded OHLCV frame shaped like fetch_stock_data, fixed dates for repeatability."""
+    from backend.data_providers import SyntheticProvider
+
+    provider = SyntheticProvider(seed=seed)
+    start = pd.Timestamp("2020-01-01")
+    end = pd.bdate_range(start, periods=n_bars)[-1]
+    return provider.fetch("BENCH", start=start, end=end)
+
+
+def synthetic_feature_arrays(n_bars: int = 504, seed: int = 42):
+    from backend.features import FEATURE_COLS, create_features
+
+    df_feat = create_features(synthetic_ohlcv(n_bars, seed))
+    features = df_feat[FEATURE_COLS].values
+    prices = df_feat["Close"].values
+    return features, prices
+
+
+class ConstantSignPredictor:
+    """Stand-in for LSTMPredictor: cheap, deterministic predictions."""
+
+    lookback = 60
+
+    def predict_return(self, X):
+        return float(X[-1, 0] - 50.0)
+
+    def predict_returns_batch(self, X, ends):
+        return (X[np.asarray(ends) - 1, 0] - 50.0)[:, None]
+
+
+# -------------------------------------------------
+# Benchmarks
+# -------------------------------------------------
+@benchmark("features.create_features", number=10)
+def bench_create_features():
+    from backend.features import create_features
+
+    df = synthetic_ohlcv(504)
+    return lambda: create_features(df)
+
+
+@benchmark("data_providers.SyntheticProvider.fetch_1m_bars", number=3)
+def bench_synthetic_provider():
+    from backend.data_providers import SyntheticProvider
+
+    # Two years of minute bars after the intraday epoch
+    provider = SyntheticProvider(seed=0, end="2026-01-01")
+    return lambda: provider.fetch("BENCH", period="2y", interval="1m")
+
+
+@benchmark("risk.risk_metrics", number=200)
+def bench_risk_metrics():
+    from backend.risk import simple_returns, risk_metrics
+
+    returns = simple_returns(synthetic_ohlcv(504)["Close"].values)
+    return lambda: risk_metrics(returns)
+
+
+@benchmark("risk.min_variance_weights", number=5)
+def bench_min_variance():
+    from backend.risk import simple_returns, min_variance_weights
+
+    returns = np.column_stack([
+        simple_returns(synthetic_ohlcv(253, seed=s)["Close"].values)
+        for s in range(8)
+    ])
+    cov = np.cov(returns.T)
+    return lambda: min_variance_weights(cov)
+
+
+@benchmark("backtesting.strategy_signals_run_backtest", number=3)
+def bench_backtest():
+    from backend.backtesting import run_backtest, strategy_signals
+    from backend.features import create_features
+
+    # Same path as /backtest: model signals, then the vectorized engine
+    df_feat = create_features(synthetic_ohlcv(504))
+    predictor = ConstantSignPredictor()
+
+    def backtest():
+        signals = strategy_signals("lstm", df_feat, predictor=predictor)
+        return run_backtest(
+            df_feat["Close"].values, signals, capital=100000,
+            cost_bps=5.0, slippage_bps=2.0, dates=df_feat["Date"].values,
+        )
+
+    return backtest
+
+
+@benchmark("rl_env.TradingEnv.step", number=5)
+def bench_env_step():
+    from backend.rl_env import TradingEnv
+
+    features, prices = synthetic_feature_arrays(504)
+    env = TradingEnv(prices, features, np.zeros(len(prices)))
+    actions = np.random.default_rng(0).integers(0, 3, len(prices))
+
+    def episode():
+        env.reset()
+        i = 0
+        done = False
+        while not done:
+            _, _, done = env.step(int(actions[i]))
+            i += 1
+
+    return episode
+
+
+@benchmark("lstm_model.LSTMPredictor.train", requires=("tensorflow",))
+def bench_lstm_train():
+    from backend.lstm_model import LSTMPredictor
+
+    features, prices = synthetic_feature_arrays(160)
+    predictor = LSTMPredictor(lookback=10)
+    return lambda: predictor.train(features, prices)
+
+
+@benchmark("lstm_model.LSTMPredictor.train_streaming", requires=("tensorflow",))
+def bench_lstm_train_streaming():
+    from backend.lstm_model import LSTMPredictor
+
+    features, prices = synthetic_feature_arrays(160)
+    predictor = LSTMPredictor(lookback=10)
+    return lambda: predictor.train(features, prices, streaming=True)
+
+
+@benchmark("lstm_model.LSTMPredictor.predict_return", number=20, requires=("tensorflow",))
+def bench_lstm_predict():
+    from backend.lstm_model import LSTMPredictor
+
+    features, prices = synthetic_feature_arrays(160)
+    predictor = LSTMPredictor(lookback=10)
+    predictor.train(features, prices)
+    return lambda: predictor.predict_return(features)
+
+
+@benchmark("numpy_runtime.NumpyLSTMPredictor.predict_returns_batch", number=3)
+def bench_numpy_lstm_batch():
+    from backend.numpy_runtime import NumpyLSTMPredictor
+
+    # Random weights shaped like the production model; no TensorFlow needed
+    rng = np.random.default_rng(0)
+    units, n_features = 64, 4
+    arrays = {
+        "layer0_kernel": rng.normal(0, 0.1, (n_features, 4 * units)).astype(np.float32),
+        "layer0_recurrent_kernel": rng.normal(0, 0.1, (units, 4 * units)).astype(np.float32),
+        "layer0_bias": np.zeros(4 * units, dtype=np.float32),
+        "layer1_kernel": rng.normal(0, 0.1, (units, 1)).astype(np.float32),
+        "layer1_bias": np.zeros(1, dtype=np.float32),
+        "scaler_scale": np.full(n_features, 0.01),
+        "scaler_min": np.zeros(n_features),
+    }
+    spec = {
+        "layers": [
+            {"type": "lstm", "activation": "tanh", "recurrent_activation": "sigmoid"},
+            {"type": "dense", "activation": "linear"},
+        ],
+        "input_shape": [60, n_features],
+    }
+    predictor = NumpyLSTMPredictor(spec, arrays)
+    features, prices = synthetic_feature_arrays(504)
+    ends = np.arange(60, len(prices) - 1)
+    return lambda: predictor.predict_returns_batch(features, ends)
+
+
+@benchmark("dqn_agent_tf.DQNAgentTF.train_step", number=3, requires=("tensorflow",))
+def bench_dqn_train_step():
+    import random
+    from backend.dqn_agent_tf import DQNAgentTF
+
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    agent = DQNAgentTF(state_size=6)
+    for _ in range(64):
+        agent.memory.append((rng.normal(size=6), int(rng.integers(0, 3)),
+                             float(rng.normal()), rng.normal(size=6), False))
+    state, next_state = rng.normal(size=6), rng.normal(size=6)
+    return lambda: agent.train_step(state, 1, 0.01, next_state, False)
+
+
+@benchmark("sentiment.sentiment_score", number=5, requires=("torch", "transformers"))
+def bench_sentiment():
+    import torch
+    from backend import sentiment
+
+    class TinyTokenizer:
+        def __call__(self, texts, return_tensors="pt", truncation=True, padding=True):
+            if isinstance(texts, str):
+                texts = [texts]
+            rows = [[zlib.crc32(w.encode()) % 1000 for w in t.split()[:64]] or [0] for t in texts]
+            width = max(len(r) for r in rows)
+            return {"input_ids": torch.tensor([r + [0] * (width - len(r)) for r in rows])}
+
+    class TinyClassifier(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            torch.manual_seed(0)
+            self.embed = torch.nn.EmbeddingBag(1000, 16)
+            self.head = torch.nn.Linear(16, 3)
+
+        def forward(self, input_ids):
+            return SimpleNamespace(logits=self.head(self.embed(input_ids)))
+
+    # Pre-populate the module cache so load_finbert never downloads
+    sentiment._tokenizer = TinyTokenizer()
+    sentiment._model = TinyClassifier().eval()
+    texts = [
+        f"Company {i} reports quarterly earnings above expectations. Shares move."
+        for i in range(20)
+    ]
+    return lambda: sentiment.sentiment_score(texts)
+
+
+# -------------------------------------------------
+# Runner
+# -------------------------------------------------
+def _missing(requires):
+    import importlib.util
+    return [m for m in requires if importlib.util.find_spec(m) is None]
+
+
+def run_benchmark(bench, repeat: int = 5) -> dict:
+    missing = _missing(bench.requires)
+    if missing:
+        return {"status": "skipped", "reason": f"missing: {', '.join(missing)}"}
+
+    fn = bench.setup()
+    fn()  # warm-up (lazy imports, graph tracing)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(bench.number):
+            fn()
+        timings.append((time.perf_counter() - start) / bench.number)
+
+    return {
+        "status": "ok",
+        "number": bench.number,
+        "repeat": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except Exception:
+        return None
+
+
+def run_all(names=None, repeat: int = 5) -> dict:
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if names and not any(n in name for n in names):
+            continue
+        print(f">>> {name}", file=sys.stderr)
+        results[name] = run_benchmark(bench, repeat)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 1.2) -> list:
+    """Benchmarks whose median slowed down by more than `threshold`x."""
+    regressions = []
+    for name, res in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if res.get("status") != "ok" or not old or old.get("status") != "ok":
+            continue
+        ratio = res["median"] / old["median"] if old["median"] > 0 else float("inf")
+        res["baseline_median"] = old["median"]
+        res["ratio"] = ratio
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def _print_table(report: dict):
+    for name, res in report["results"].items():
+        if res["status"] != "ok":
+            print(f"{name:45s} {res['status']} ({res['reason']})")
+            continue
+        line = f"{name:45s} median {res['median'] * 1000:10.3f} ms"
+        if "ratio" in res:
+            line += f"   x{res['ratio']:.2f} vs baseline"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backend micro-benchmarks")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="median slowdown ratio treated as a regression")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="substring filter on benchmark names")
+    args = parser.parse_args(argv)
+
+    report = run_all(args.only, args.repeat)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        report["regressions"] = regressions
+
+    _print_table(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+# backend/covariance.py
+"""
+Covariance service for portfolio endpoints.
+
+- Close histories are cached per symbol and refreshed incrementally: after
+  COV_REFRESH_TTL seconds only the bars newer than the cached ones are
+  fetched. The last cached bar is fetched again and overwritten, so a
+  close taken during a trading session is replaced by the final one.
+- Return panels are built on the dates every symbol of the basket shares,
+  so series of different lengths or calendars line up row by row.
+- Estimates are cached as "moment blocks" per basket and lookback window:
+  the sample covariance, the per-pair fourth-moment matrix that
+  Ledoit-Wolf needs, and an EWMA covariance. Every quantity decomposes
+  into per-pair entries, so a basket contained in a cached one on the
+  same dates is served by slicing. When new bars arrive, the EWMA matrix
+  is rolled forward with one O(n^2) rank-1 update per bar; a revised
+  last return swaps its rank-1 term for the corrected one.
+
+    estimate = get_covariance_service().estimate(["AAPL", "MSFT"], lookback=252,
+                                                 method="ledoit_wolf")
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backend.diagnostics import register_cache
+from backend.metrics import record_cache, span
+from backend.stock_data import fetch_stock_data
+
+METHODS = ("sample", "ledoit_wolf", "ewma")
+COV_HISTORY_PERIOD = os.getenv("COV_HISTORY_PERIOD", "5y")
+COV_REFRESH_TTL = float(os.getenv("COV_REFRESH_TTL", "300"))
+EWMA_HALFLIFE = float(os.getenv("COV_EWMA_HALFLIFE", "30"))
+MAX_BLOCKS = 64
+
+
+def aligned_returns(closes: dict) -> pd.DataFrame:
+    """Daily returns of several close series, on the dates they all share."""
+    panel = pd.concat(closes, axis=1, join="inner").sort_index()
+    return panel.pct_change().iloc[1:]
+
+
+def ewma_decay(halflife: float) -> float:
+    return 0.5 ** (1.0 / halflife)
+
+
+def ewma_init(returns: np.ndarray, halflife: float) -> np.ndarray:
+    """Zero-mean EWMA covariance of a window, newest row weighted most."""
+    decay = ewma_decay(halflife)
+    weights = decay ** np.arange(len(returns) - 1, -1, -1)
+    weights /= weights.sum()
+    return returns.T @ (returns * weights[:, None])
+
+
+def ewma_update(cov: np.ndarray, r: np.ndarray, halflife: float) -> np.ndarray:
+    """Roll an EWMA covariance forward by one bar: O(n^2)."""
+    decay = ewma_decay(halflife)
+    cov *= decay
+    cov += (1 - decay) * np.outer(r, r)
+    return cov
+
+
+def ledoit_wolf(sample: np.ndarray, pi: np.ndarray, n_obs: int):
+    """
+    Ledoit-Wolf shrinkage towards a scaled identity, from the sample
+    covariance of the centered returns and pi[i, j] = mean((x_i x_j)^2) - sample[i, j]^2.
+    Returns (covariance, shrinkage intensity).
+    """
+    n = len(sample)
+    mu = np.trace(sample) / n
+    delta = ((sample - mu * np.eye(n)) ** 2).sum() / n
+    beta = min(pi.sum() / (n * n_obs), delta)
+    shrinkage = beta / delta if delta > 0 else 0.0
+    return shrinkage * mu * np.eye(n) + (1 - shrinkage) * sample, float(shrinkage)
+
+
+class _Block:
+    """Moments of one basket over one window of aligned dates."""
+
+    def __init__(self, key, returns: pd.DataFrame, halflife: float):
+        self.key = key
+        self.symbols = list(key[0])
+        self.position = {s: i for i, s in enumerate(self.symbols)}
+        self.halflife = halflife
+        self.ewma = ewma_init(returns.values, halflife)
+        # Weight of the newest row's outer product inside self.ewma
+        self.last_weight = 1.0 / np.sum(ewma_decay(halflife) ** np.arange(len(returns)))
+        self._moments(returns)
+
+    def _moments(self, returns: pd.DataFrame):
+        X = returns.values
+        self.dates = returns.index
+        self.last_return = X[-1].copy()
+        self.mean = X.mean(axis=0)
+        centered = X - self.mean
+        self.sample = centered.T @ centered / len(X)
+        squared = centered ** 2
+        self.pi = squared.T @ squared / len(X) - self.sample ** 2
+
+    def matches(self, returns: pd.DataFrame) -> bool:
+        """Whether `returns` (on this block's dates) has the same newest row."""
+        idx = [self.position[s] for s in returns.columns]
+        return np.array_equal(returns.values[-1], self.last_return[idx], equal_nan=True)
+
+    def advance(self, returns: pd.DataFrame):
+        """
+        Move the window to `returns`: correct the EWMA for a revised
+        return on the last known date, then feed it the new rows.
+        """
+        returns = returns[self.symbols]
+        last = self.dates[-1]
+        if last in returns.index:
+            revised = returns.loc[last].values
+            if not np.array_equal(revised, self.last_return, equal_nan=True):
+                self.ewma += self.last_weight * (
+                    np.outer(revised, revised) - np.outer(self.last_return, self.last_return)
+                )
+
+        new = returns.loc[returns.index > last].values
+        for r in new:
+            ewma_update(self.ewma, r, self.halflife)
+        if len(new):
+            self.last_weight = 1 - ewma_decay(self.halflife)
+        self._moments(returns)
+        return len(new)
+
+    def select(self, symbols, method: str) -> dict:
+        idx = [self.position[s] for s in symbols]
+        grid = np.ix_(idx, idx)
+        n_obs = len(self.dates)
+        shrinkage = None
+        if method == "sample":
+            # Unbiased, as np.cov
+            cov = self.sample[grid] * n_obs / max(1, n_obs - 1)
+        elif method == "ledoit_wolf":
+            cov, shrinkage = ledoit_wolf(self.sample[grid], self.pi[grid], n_obs)
+        else:
+            cov = self.ewma[grid].copy()
+        return {
+            "symbols": list(symbols),
+            "method": method,
+            "cov": cov,
+            "mean": self.mean[idx],
+            "n_obs": n_obs,
+            "start": str(self.dates[0]),
+            "end": str(self.dates[-1]),
+            "shrinkage": shrinkage,
+        }
+
+
+class CovarianceService:
+    def __init__(self, period: str = COV_HISTORY_PERIOD, ttl: float = COV_REFRESH_TTL):
+        self.period = period
+        self.ttl = ttl
+        self._closes = {}               # symbol -> (checked_at, close series by date)
+        self._blocks = OrderedDict()    # (symbols, lookback, halflife) -> _Block
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------
+    # Price histories
+    # -------------------------------------------------
+    def _refresh(self, symbol: str, cached):
+        if cached is None:
+            df = fetch_stock_data(symbol, period=self.period, columns=["Close"])
+            if df is None or df.empty:
+                raise ValueError(f"No data available for {symbol}")
+            return df.set_index("Date")["Close"]
+
+        close = cached[1]
+        start = pd.Timestamp(close.index[-1]).strftime("%Y-%m-%d")
+        df = fetch_stock_data(symbol, start=start, columns=["Close"])
+        if df is None or df.empty:
+            return close
+        # The refetch includes the last cached bar; its new close wins
+        fresh = df.set_index("Date")["Close"]
+        merged = pd.concat([close, fresh])
+        return merged[~merged.index.duplicated(keep="last")].sort_index()
+
+    def closes(self, symbols) -> dict:
+        now = time.time()
+        with self._lock:
+            cached = {s: self._closes.get(s) for s in symbols}
+        stale = [s for s, c in cached.items() if c is None or now - c[0] >= self.ttl]
+        for s in symbols:
+            record_cache("covariance_prices", s not in stale)
+
+        if stale:
+            with span("fetch_stock_data"):
+                with ThreadPoolExecutor(max_workers=min(8, len(stale))) as pool:
+                    fresh = dict(zip(stale, pool.map(lambda s: self._refresh(s, cached[s]), stale)))
+            with self._lock:
+                for s, close in fresh.items():
+                    self._closes[s] = (now, close)
+                    cached[s] = (now, close)
+        return {s: c[1] for s, c in cached.items()}
+
+    def returns(self, symbols, lookback: int) -> pd.DataFrame:
+        """The last `lookback` date-aligned daily returns, one column per symbol."""
+        panel = aligned_returns(self.closes(symbols)).tail(lookback)
+        if len(panel) < 2:
+            raise ValueError(f"Not enough overlapping history for {', '.join(symbols)}")
+        return panel
+
+    # -------------------------------------------------
+    # Estimates
+    # -------------------------------------------------
+    def estimate(self, symbols, lookback: int = 252, method: str = "sample",
+                 halflife: float = EWMA_HALFLIFE) -> dict:
+        if method not in METHODS:
+            raise ValueError(f"Unknown covariance method '{method}'; expected one of {METHODS}")
+        symbols = list(dict.fromkeys(symbols))
+        returns = self.returns(symbols, lookback)
+        key = (tuple(sorted(symbols)), lookback, halflife)
+
+        with self._lock:
+            block, source = self._lookup(key, returns)
+            if block is None:
+                block = _Block(key, returns[list(key[0])], halflife)
+                self._blocks[key] = block
+                source = "computed"
+            self._blocks.move_to_end(block.key)
+            while len(self._blocks) > MAX_BLOCKS:
+                self._blocks.popitem(last=False)
+            result = block.select(symbols, method)
+
+        record_cache("covariance", source != "computed")
+        result["source"] = source
+        return result
+
+    def _lookup(self, key, returns: pd.DataFrame):
+        symbols, lookback, halflife = key
+        exact = self._blocks.get(key)
+        if exact is not None:
+            if exact.dates.equals(returns.index) and exact.matches(returns):
+                return exact, "cached"
+            if exact.dates[-1] <= returns.index[-1]:
+                exact.advance(returns)
+                return exact, "updated"
+
+        wanted = set(symbols)
+        for block in reversed(self._blocks.values()):
+            if (block.key[1:] == (lookback, halflife) and wanted <= set(block.symbols)
+                    and block.dates.equals(returns.index) and block.matches(returns)):
+                return block, "subset"
+        return None, None
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_covariance_service() -> CovarianceService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = CovarianceService()
+            register_cache("covariance_prices", _service._closes)
+            register_cache("covariance_blocks", _service._blocks)
+        return _service
@@ -0,0 +1,209 @@
+"""
+Streaming training input for the LSTM.
+
+The in-memory path materializes every (lookback, n_features) window before
+calling fit, so memory grows with lookback x history. The streaming path
+keeps only the compact scaled source array (N, n_features), which can be
+a np.memmap, and builds each batch of windows on the fly inside a tf.data
+pipeline with prefetching. Beyond the source array, memory is bounded by
+the batch size and the shuffle buffer.
+
+Compare both paths (throughput and peak RSS, each in its own process):
+
+    python -m backend.data_pipeline --bars 200000 --epochs 1 --memmap
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import resource
+import subprocess
+
+import numpy as np
+
+# Above this many training windows LSTMPredictor streams instead of materializing
+STREAMING_MIN_SAMPLES = int(os.getenv("LSTM_STREAMING_MIN_SAMPLES", "50000"))
+# Indices (not windows) held for shuffling; bounds memory on long histories
+SHUFFLE_BUFFER = int(os.getenv("LSTM_SHUFFLE_BUFFER", "10000"))
+SCALE_CHUNK = 65536
+
+
+def n_windows(n_rows: int, lookback: int, horizon: int, first: int = 0) -> int:
+    return max(0, n_rows - horizon + 1 - max(lookback, first))
+
+
+def compute_returns(prices) -> np.ndarray:
+    prices = np.asarray(prices, dtype=np.float64)
+    return ((prices[1:] - prices[:-1]) / prices[:-1]).astype(np.float32)
+
+
+def scratch_array(shape, like=None) -> np.ndarray:
+    """float32 work array; file-backed when the source itself is memory-mapped."""
+    if isinstance(like, np.memmap):
+        fd, path = tempfile.mkstemp(suffix=".npy")
+        os.close(fd)
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=shape)
+        os.remove(path)  # the mapping stays valid until it is released
+        return out
+    return np.empty(shape, dtype=np.float32)
+
+
+def fit_scaler_chunked(scaler, X, chunk: int = SCALE_CHUNK):
+    for i in range(0, len(X), chunk):
+        scaler.partial_fit(X[i:i + chunk])
+    return scaler
+
+
+def transform_chunked(scaler, X, chunk: int = SCALE_CHUNK) -> np.ndarray:
+    out = scratch_array(X.shape, like=X)
+    for i in range(0, len(X), chunk):
+        out[i:i + chunk] = scaler.transform(X[i:i + chunk])
+    return out
+
+
+def window_dataset(X_scaled, returns, lookback: int, horizon: int, first: int = 0,
+                   batch_size: int = 32, shuffle: bool = True, seed=None):
+    """
+    tf.data pipeline of (window, target path) batches, matching
+    LSTMPredictor._sequences: the window ending before row i predicts
+    returns[i:i + horizon]. Returns (dataset, n_samples).
+    """
+    import tensorflow as tf
+
+    start = max(lookback, first)
+    stop = len(X_scaled) - horizon + 1
+    n = n_windows(len(X_scaled), lookback, horizon, first)
+    if n == 0:
+        raise ValueError(f"Not enough history to train lookback={lookback}, horizon={horizon}")
+
+    n_features = X_scaled.shape[1]
+    window_offsets = np.arange(-lookback, 0)
+    target_offsets = np.arange(horizon)
+
+    def gather(ends):
+        ends = ends[:, None]
+        return (
+            np.asarray(X_scaled[ends + window_offsets], dtype=np.float32),
+            np.asarray(returns[ends + target_offsets], dtype=np.float32),
+        )
+
+    def load_batch(ends):
+        X, y = tf.numpy_function(gather, [ends], (tf.float32, tf.float32))
+        X.set_shape((None, lookback, n_features))
+        y.set_shape((None, horizon))
+        return X, y
+
+    dataset = tf.data.Dataset.range(start, stop)
+    if shuffle:
+        dataset = dataset.shuffle(min(n, SHUFFLE_BUFFER), seed=seed, reshuffle_each_iteration=True)
+    dataset = (
+        dataset
+        .batch(batch_size)
+        .map(load_batch, num_parallel_calls=tf.data.AUTOTUNE)
+        .prefetch(tf.data.AUTOTUNE)
+    )
+    return dataset, n
+
+
+# -------------------------------------------------
+# Training arrays on disk
+# -------------------------------------------------
+def save_training_arrays(directory: str, features, prices):
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "features.npy"), np.asarray(features, dtype=np.float32))
+    np.save(os.path.join(directory, "prices.npy"), np.asarray(prices, dtype=np.float64))
+
+
+def load_training_arrays(directory: str, mmap: bool = True):
+    mode = "r" if mmap else None
+    return (
+        np.load(os.path.join(directory, "features.npy"), mmap_mode=mode),
+        np.load(os.path.join(directory, "prices.npy"), mmap_mode=mode),
+    )
+
+
+# -------------------------------------------------
+# Throughput / memory comparison
+# -------------------------------------------------
+def synthetic_training_arrays(n_bars: int, seed: int = 42):
+    import pandas as pd
+    from backend.data_providers import SyntheticProvider
+    from backend.features import FEATURE_COLS, create_features
+
+    # 50 extra bars absorb the indicator warm-up that create_features drops
+    bars = SyntheticProvider(seed=seed).generate(n_bars + 50, np.random.default_rng(seed))
+    df_feat = create_features(pd.DataFrame(bars)).tail(n_bars)
+    return df_feat[FEATURE_COLS].values, df_feat["Close"].values
+
+
+def run_mode(directory: str, mode: str, lookback: int, epochs: int, mmap: bool) -> dict:
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    from backend.lstm_model import LSTMPredictor
+
+    features, prices = load_training_arrays(directory, mmap=mmap and mode == "streaming")
+    predictor = LSTMPredictor(lookback=lookback)
+
+    started = time.perf_counter()
+    predictor.train(features, prices, epochs=epochs, streaming=(mode == "streaming"))
+    seconds = time.perf_counter() - started
+
+    n = predictor.metadata["n_samples"]
+    return {
+        "mode": mode,
+        "samples": n,
+        "epochs": epochs,
+        "seconds": round(seconds, 2),
+        "samples_per_s": round(n * epochs / seconds, 1),
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def compare(n_bars: int, lookback: int = 60, epochs: int = 1, mmap: bool = False) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        save_training_arrays(directory, *synthetic_training_arrays(n_bars))
+        for mode in ("in_memory", "streaming"):
+            # Separate processes so each peak RSS is measured in isolation
+            out = subprocess.run(
+                [sys.executable, "-m", "backend.data_pipeline", "--run-mode", mode,
+                 "--source", directory, "--lookback", str(lookback),
+                 "--epochs", str(epochs)] + (["--memmap"] if mmap else []),
+                capture_output=True, text=True, check=True,
+            )
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare in-memory and streaming LSTM training")
+    parser.add_argument("--bars", type=int, default=200000)
+    parser.add_argument("--lookback", type=int, default=60)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--memmap", action="store_true",
+                        help="memory-map the source arrays for the streaming run")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--run-mode", choices=("in_memory", "streaming"), help=argparse.SUPPRESS)
+    parser.add_argument("--source", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_mode:
+        print(json.dumps(run_mode(args.source, args.run_mode, args.lookback, args.epochs, args.memmap)))
+        return 0
+
+    results = compare(args.bars, args.lookback, args.epochs, args.memmap)
+    for r in results:
+        print(f"{r['mode']:<10} {r['samples']:>8} samples  {r['seconds']:>8.2f} s  "
+              f"{r['samples_per_s']:>10.1f} samples/s  peak RSS {r['peak_rss_mb']:>8.1f} MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
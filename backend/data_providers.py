@@ -0,0 +1,344 @@
+# backend/data_providers.py
+
+import os
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------
+# Configuration
+# -------------------------------------------------
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# yfinance (default) | local | synthetic
+MARKET_DATA_PROVIDER = os.getenv("MARKET_DATA_PROVIDER", "yfinance")
+MARKET_DATA_DIR = os.getenv("MARKET_DATA_DIR", os.path.join(BASE_DIR, "data", "market"))
+SYNTHETIC_SEED = int(os.getenv("SYNTHETIC_SEED", "0"))
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+INTERVAL_FREQ = {
+    "1m": "min", "2m": "2min", "5m": "5min", "15m": "15min", "30m": "30min",
+    "60m": "h", "1h": "h", "1d": "B", "5d": "5B", "1wk": "W-FRI", "1mo": "BME",
+}
+
+
+def period_start(end: pd.Timestamp, period: str):
+    """Start of a yfinance-style period ending at `end` (None for 'max')."""
+    if period == "max":
+        return None
+    if period == "ytd":
+        return end.normalize().replace(month=1, day=1)
+    if period not in PERIOD_OFFSETS:
+        raise ValueError(f"Unsupported period: {period}")
+    return end - PERIOD_OFFSETS[period]
+
+
+def _select(df: pd.DataFrame, columns):
+    if columns is None:
+        return df
+    return df[["Date"] + [c for c in columns if c != "Date"]]
+
+
+# -------------------------------------------------
+# Providers
+# -------------------------------------------------
+class MarketDataProvider:
+    """
+    Source of OHLCV bars. `fetch` returns a frame with a `Date` column
+    followed by the requested columns, oldest bar first, the same shape
+    as yfinance's history().reset_index().
+
+    `start`/`end` take precedence over `period` when given.
+    """
+
+    name = "base"
+
+    def fetch(self, symbol: str, period="2y", interval="1d",
+              start=None, end=None, columns=None) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class YFinanceProvider(MarketDataProvider):
+    name = "yfinance"
+
+    def fetch(self, symbol, period="2y", interval="1d",
+              start=None, end=None, columns=None):
+        import yfinance as yf
+
+        ticker = yf.Ticker(symbol)
+        if start is not None or end is not None:
+            df = ticker.history(start=start, end=end, interval=interval)
+        else:
+            df = ticker.history(period=period, interval=interval)
+
+        if df.empty:
+            raise ValueError("Invalid stock symbol or no data found")
+
+        df = df.reset_index()
+        # Intraday frames come back indexed by "Datetime"
+        df = df.rename(columns={"Datetime": "Date"})
+        return _select(df, columns)
+
+
+class LocalFileProvider(MarketDataProvider):
+    """
+    Reads `<dir>/<interval>/<SYMBOL>.parquet|.csv`, falling back to
+    `<dir>/<SYMBOL>.parquet|.csv`. Parquet reads push the column list and
+    date range down to the reader; CSV is streamed in chunks and filtered
+    so memory stays proportional to the selected range.
+    """
+
+    name = "local"
+    CSV_CHUNK_ROWS = 250_000
+
+    def __init__(self, directory: str = MARKET_DATA_DIR):
+        self.directory = directory
+
+    def _resolve(self, symbol: str, interval: str) -> str:
+        for base in (os.path.join(self.directory, interval), self.directory):
+            for ext in (".parquet", ".csv"):
+                path = os.path.join(base, f"{symbol}{ext}")
+                if os.path.exists(path):
+                    return path
+        raise ValueError(f"No local market data for {symbol} ({interval}) in {self.directory}")
+
+    @staticmethod
+    def _align_tz(value, tz):
+        if value is None:
+            return None
+        value = pd.Timestamp(value)
+        if tz is not None and value.tzinfo is None:
+            return value.tz_localize(tz)
+        if tz is None and value.tzinfo is not None:
+            return value.tz_convert(None)
+        return value
+
+    def _read_parquet(self, path, period, start, end, columns):
+        import pyarrow.parquet as pq
+
+        read_cols = None if columns is None else ["Date"] + [c for c in columns if c != "Date"]
+        tz = getattr(pq.read_schema(path).field("Date").type, "tz", None)
+
+        end = self._align_tz(end, tz)
+        start = self._align_tz(start, tz)
+        if start is None and end is None:
+            # Period is relative to the newest stored bar: read only that column
+            dates = pq.read_table(path, columns=["Date"]).column("Date").to_pandas()
+            if dates.empty:
+                return pd.DataFrame(columns=read_cols or ["Date"] + OHLCV_COLUMNS)
+            start = period_start(dates.max(), period)
+
+        filters = []
+        if start is not None:
+            filters.append(("Date", ">=", start))
+        if end is not None:
+            filters.append(("Date", "<=", end))
+
+        df = pd.read_parquet(path, columns=read_cols, filters=filters or None)
+        return df.sort_values("Date").reset_index(drop=True)
+
+    def _read_csv(self, path, period, start, end, columns):
+        usecols = None if columns is None else ["Date"] + [c for c in columns if c != "Date"]
+        chunks = []
+        for chunk in pd.read_csv(path, usecols=usecols, chunksize=self.CSV_CHUNK_ROWS):
+            try:
+                chunk["Date"] = pd.to_datetime(chunk["Date"])
+            except (ValueError, TypeError):
+                # Mixed UTC offsets (e.g. across DST changes)
+                chunk["Date"] = pd.to_datetime(chunk["Date"], utc=True)
+            tz = chunk["Date"].dt.tz
+            lo = self._align_tz(start, tz)
+            hi = self._align_tz(end, tz)
+            mask = np.ones(len(chunk), dtype=bool)
+            if lo is not None:
+                mask &= (chunk["Date"] >= lo).values
+            if hi is not None:
+                mask &= (chunk["Date"] <= hi).values
+            chunks.append(chunk[mask])
+
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=usecols)
+        if start is None and end is None and not df.empty:
+            df = df[df["Date"] >= period_start(df["Date"].max(), period)]
+        return df.sort_values("Date").reset_index(drop=True)
+
+    def fetch(self, symbol, period="2y", interval="1d",
+              start=None, end=None, columns=None):
+        path = self._resolve(symbol, interval)
+        if path.endswith(".parquet"):
+            df = self._read_parquet(path, period, start, end, columns)
+        else:
+            df = self._read_csv(path, period, start, end, columns)
+
+        if df.empty:
+            raise ValueError("Invalid stock symbol or no data found")
+        return df
+
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    Seeded geometric Brownian motion with two-state regime switching
+    (calm / turbulent). Every symbol and interval has one reproducible
+    path, anchored at a fixed epoch; a request returns the slice of that
+    path between its start and end, so any two windows agree on the bars
+    they share. The path is generated in CHUNK_BARS blocks, each seeded by
+    its position, and only the final log level of earlier blocks is kept,
+    so a window costs its own bars plus one pass over unseen history.
+    """
+
+    name = "synthetic"
+
+    # (daily drift, daily volatility) per regime
+    REGIMES = ((0.0005, 0.010), (-0.0010, 0.030))
+    MEAN_REGIME_BARS = (120, 30)
+    EPOCH = pd.Timestamp("2000-01-03")
+    INTRADAY_EPOCH = pd.Timestamp("2024-01-01")
+    CHUNK_BARS = 4096
+
+    def __init__(self, seed: int = SYNTHETIC_SEED, end=None, start_price: float = 100.0):
+        self.seed = seed
+        self.end = end
+        self.start_price = start_price
+        self._levels = {}   # (symbol, interval, chunk) -> log(close) change over the chunk
+
+    def _rng(self, symbol: str, interval: str, chunk: int):
+        key = f"{symbol}|{interval}".encode()
+        return np.random.default_rng([self.seed, zlib.crc32(key), chunk])
+
+    def _window(self, period, interval, start, end):
+        """(epoch grid up to `end`, index of the first bar at or after the start)."""
+        freq = INTERVAL_FREQ.get(interval)
+        if freq is None:
+            raise ValueError(f"Unsupported interval: {interval}")
+
+        if end is None:
+            end = self.end
+        end = pd.Timestamp(end) if end is not None else pd.Timestamp.today().normalize()
+        epoch = self.EPOCH if interval in ("1d", "5d", "1wk", "1mo") else self.INTRADAY_EPOCH
+        if start is None:
+            start = period_start(end, period) if period != "max" else epoch
+        grid = pd.date_range(start=epoch, end=end, freq=freq)
+        return grid, int(grid.searchsorted(pd.Timestamp(start)))
+
+    def _chunk(self, symbol: str, interval: str, chunk: int) -> dict:
+        data = self.generate(self.CHUNK_BARS, self._rng(symbol, interval, chunk))
+        self._levels[(symbol, interval, chunk)] = float(np.log(data["Close"][-1] / self.start_price))
+        return data
+
+    def _level(self, symbol: str, interval: str, chunk: int) -> float:
+        key = (symbol, interval, chunk)
+        if key not in self._levels:
+            self._chunk(symbol, interval, chunk)
+        return self._levels[key]
+
+    def generate(self, n_bars: int, rng) -> dict:
+        # Regime path: alternate calm/turbulent with geometric durations
+        n_switches = int(n_bars / min(self.MEAN_REGIME_BARS)) + 2
+        first = int(rng.integers(0, 2))
+        states = (np.arange(n_switches) + first) % 2
+        durations = rng.geometric(1 / np.array(self.MEAN_REGIME_BARS)[states])
+        regime = np.repeat(states, durations)[:n_bars]
+        if len(regime) < n_bars:
+            regime = np.pad(regime, (0, n_bars - len(regime)), mode="edge")
+
+        mu = np.array([r[0] for r in self.REGIMES])[regime]
+        sigma = np.array([r[1] for r in self.REGIMES])[regime]
+        log_ret = (mu - 0.5 * sigma ** 2) + sigma * rng.standard_normal(n_bars)
+
+        close = self.start_price * np.exp(np.cumsum(log_ret))
+        open_ = np.empty(n_bars)
+        open_[0] = self.start_price
+        open_[1:] = close[:-1]
+        wick = np.abs(rng.standard_normal(n_bars)) * sigma * 0.5 * close
+        volume = rng.lognormal(14.5, 0.4, n_bars) * (1 + 2 * regime)
+
+        return {
+            "Open": open_,
+            "High": np.maximum(open_, close) + wick,
+            "Low": np.minimum(open_, close) - wick,
+            "Close": close,
+            "Volume": np.round(volume),
+        }
+
+    def fetch(self, symbol, period="2y", interval="1d",
+              start=None, end=None, columns=None):
+        grid, first = self._window(period, interval, start, end)
+        if first >= len(grid):
+            raise ValueError("Invalid stock symbol or no data found")
+
+        size = self.CHUNK_BARS
+        first_chunk, last_chunk = first // size, (len(grid) - 1) // size
+        level = sum(self._level(symbol, interval, c) for c in range(first_chunk))
+        wanted = OHLCV_COLUMNS if columns is None else [c for c in columns if c != "Date"]
+
+        parts = {c: [] for c in wanted}
+        for chunk in range(first_chunk, last_chunk + 1):
+            data = self._chunk(symbol, interval, chunk)
+            # Continue from the previous chunk's close; volume is scale-free
+            scale = np.exp(level)
+            for c in wanted:
+                parts[c].append(data[c] if c == "Volume" else data[c] * scale)
+            level += self._levels[(symbol, interval, chunk)]
+
+        lo = first - first_chunk * size
+        hi = len(grid) - first_chunk * size
+        df = pd.DataFrame({c: np.concatenate(parts[c])[lo:hi] for c in wanted})
+        df.insert(0, "Date", grid[first:])
+        return df
+
+
+# -------------------------------------------------
+# Selection
+# -------------------------------------------------
+PROVIDERS = {
+    "yfinance": YFinanceProvider,
+    "local": LocalFileProvider,
+    "synthetic": SyntheticProvider,
+}
+
+_provider = None
+
+
+def get_provider() -> MarketDataProvider:
+    global _provider
+    if _provider is None:
+        if MARKET_DATA_PROVIDER not in PROVIDERS:
+            raise ValueError(
+                f"Unknown MARKET_DATA_PROVIDER '{MARKET_DATA_PROVIDER}' "
+                f"(expected one of {sorted(PROVIDERS)})"
+            )
+        _provider = PROVIDERS[MARKET_DATA_PROVIDER]()
+    return _provider
+
+
+def set_provider(provider: MarketDataProvider):
+    """Swap the active provider (offline replays, load tests, benchmarks)."""
+    global _provider
+    _provider = provider
+
+
+class DelayedProvider(MarketDataProvider):
+    """Wraps a provider and adds a fixed latency, to emulate a remote upstream."""
+
+    def __init__(self, inner: MarketDataProvider, latency: float):
+        self.inner = inner
+        self.latency = latency
+        self.name = f"{inner.name}+delay"
+
+    def fetch(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return self.inner.fetch(*args, **kwargs)
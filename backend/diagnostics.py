@@ -0,0 +1,252 @@
+# backend/diagnostics.py
+
+import gc
+import os
+import sys
+import time
+import weakref
+import threading
+import tracemalloc
+
+# -------------------------------------------------
+# Configuration
+# -------------------------------------------------
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", "10"))
+
+_lock = threading.Lock()
+
+# kind -> WeakSet of live model objects ("lstm", "rl", ...)
+_models = {}
+
+# name -> object or zero-arg callable returning the cached object
+_caches = {}
+
+# Previous report, used to diff consecutive calls
+_last_snapshot = None
+_last_report = None
+
+
+# -------------------------------------------------
+# Registration hooks (called by the modules that own the objects)
+# -------------------------------------------------
+def track_model(kind: str, model):
+    """Remember a loaded model without keeping it alive."""
+    if model is None:
+        return
+    with _lock:
+        _models.setdefault(kind, weakref.WeakSet()).add(model)
+
+
+def register_cache(name: str, obj):
+    """Expose an in-memory cache (dict, DataFrame, array, ...) to diagnostics."""
+    with _lock:
+        _caches[name] = obj
+
+
+# -------------------------------------------------
+# Size estimation
+# -------------------------------------------------
+def rss_bytes() -> int | None:
+    """Current resident set size of this process."""
+    try:
+        import psutil
+        return int(psutil.Process().memory_info().rss)
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    return None
+
+
+def model_bytes(model) -> int:
+    """Parameter memory of a Keras model, assuming float32 weights."""
+    try:
+        return int(model.count_params()) * 4
+    except Exception:
+        return 0
+
+
+def estimate_bytes(obj, _seen=None) -> int:
+    """Best-effort deep size of cached containers of frames and arrays."""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if hasattr(obj, "memory_usage") and hasattr(obj, "columns"):
+        return int(obj.memory_usage(deep=True).sum())
+    if hasattr(obj, "nbytes"):
+        return int(obj.nbytes)
+    if hasattr(obj, "count_params"):
+        return model_bytes(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimate_bytes(k, _seen) + estimate_bytes(v, _seen)
+            for k, v in list(obj.items())
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_bytes(v, _seen) for v in list(obj))
+    if hasattr(obj, "__dict__") and not isinstance(obj, type):
+        return sys.getsizeof(obj) + estimate_bytes(vars(obj), _seen)
+    return sys.getsizeof(obj)
+
+
+def _models_report() -> dict:
+    with _lock:
+        tracked = {kind: list(models) for kind, models in _models.items()}
+    return {
+        kind: {
+            "count": len(models),
+            "estimated_bytes": sum(model_bytes(m) for m in models),
+        }
+        for kind, models in tracked.items()
+    }
+
+
+def _sentiment_report() -> dict:
+    # Never import the sentiment module here: that would load torch
+    module = sys.modules.get("backend.sentiment")
+    model = getattr(module, "_model", None) if module else None
+    if model is None:
+        return {"loaded": False, "estimated_bytes": 0}
+    size = sum(p.numel() * p.element_size() for p in model.parameters())
+    return {"loaded": True, "estimated_bytes": int(size)}
+
+
+def _caches_report() -> dict:
+    with _lock:
+        caches = dict(_caches)
+    report = {}
+    for name, obj in caches.items():
+        if callable(obj) and not hasattr(obj, "__len__"):
+            obj = obj()
+        report[name] = {
+            "entries": len(obj) if hasattr(obj, "__len__") else None,
+            "estimated_bytes": estimate_bytes(obj),
+        }
+    return report
+
+
+def _live_frames_report() -> dict:
+    # DataFrames are gc-tracked; bare ndarrays are not, so only frames are walked
+    pd = sys.modules.get("pandas")
+    if pd is None:
+        return {"count": 0, "estimated_bytes": 0}
+    frames = [o for o in gc.get_objects() if isinstance(o, pd.DataFrame)]
+    return {
+        "count": len(frames),
+        "estimated_bytes": int(sum(f.memory_usage(deep=False).sum() for f in frames)),
+    }
+
+
+# -------------------------------------------------
+# tracemalloc
+# -------------------------------------------------
+def _take_snapshot():
+    snapshot = tracemalloc.take_snapshot()
+    return snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, __file__),
+    ))
+
+
+def _format_stat(stat) -> dict:
+    frame = stat.traceback[0]
+    entry = {
+        "site": f"{frame.filename}:{frame.lineno}",
+        "size_bytes": stat.size,
+        "count": stat.count,
+    }
+    if hasattr(stat, "size_diff"):
+        entry["size_diff_bytes"] = stat.size_diff
+        entry["count_diff"] = stat.count_diff
+    return entry
+
+
+def stop_tracing():
+    global _last_snapshot
+    with _lock:
+        _last_snapshot = None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+# -------------------------------------------------
+# Report
+# -------------------------------------------------
+def _diff(current, previous):
+    if previous is None:
+        return None
+
+    def sub(a, b):
+        if isinstance(a, dict):
+            return {
+                k: sub(v, b.get(k) if isinstance(b, dict) else None)
+                for k, v in a.items()
+            }
+        if isinstance(a, (int, float)) and not isinstance(a, bool):
+            return a - (b if isinstance(b, (int, float)) else 0)
+        return a
+
+    delta = sub(
+        {k: current[k] for k in ("rss_bytes", "models", "sentiment", "caches", "dataframes")},
+        previous,
+    )
+    delta["seconds"] = round(current["timestamp"] - previous["timestamp"], 3)
+    return delta
+
+
+def memory_report(top: int = 10, trace: bool = True) -> dict:
+    """
+    Memory usage by component. Each call is diffed against the previous
+    call so growth between two points in time is directly visible.
+
+    tracemalloc is started by the first call with `trace=True`; allocation
+    sites are therefore only available from the second call onwards.
+    """
+    global _last_snapshot, _last_report
+
+    report = {
+        "timestamp": time.time(),
+        "rss_bytes": rss_bytes(),
+        "models": _models_report(),
+        "sentiment": _sentiment_report(),
+        "caches": _caches_report(),
+        "dataframes": _live_frames_report(),
+    }
+
+    allocations = {"tracing": tracemalloc.is_tracing()}
+    if trace and not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        allocations["started"] = True
+    elif tracemalloc.is_tracing():
+        snapshot = _take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        allocations["traced_bytes"] = current
+        allocations["peak_traced_bytes"] = peak
+        allocations["top"] = [
+            _format_stat(s) for s in snapshot.statistics("lineno")[:top]
+        ]
+        with _lock:
+            previous, _last_snapshot = _last_snapshot, snapshot
+        if previous is not None:
+            allocations["top_growth"] = [
+                _format_stat(s)
+                for s in snapshot.compare_to(previous, "lineno")[:top]
+            ]
+    report["allocations"] = allocations
+
+    with _lock:
+        previous_report, _last_report = _last_report, report
+    report["diff"] = _diff(report, previous_report)
+    return report
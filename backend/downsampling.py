@@ -0,0 +1,170 @@
+# backend/downsampling.py
+"""
+Server-side downsampling of chart series.
+
+Two methods pick a subset of rows, so every column of a row stays
+together:
+
+- minmax: first, last, and the min and max row of each bucket for every
+  column. Fully vectorized; keeps every spike. When `n_out` leaves no
+  room for one min/max pair per column, falls back to lttb.
+- lttb:   Largest-Triangle-Three-Buckets. Each bucket keeps the row whose
+  triangle with the previously kept row and the next bucket's mean is
+  largest, summed over the (z-scored) columns. Long series are first
+  pre-selected with minmax down to 4x the target (MinMaxLTTB), so only
+  the short, per-bucket LTTB pass is sequential.
+
+ResolutionCache keeps power-of-two resolution levels per symbol and data
+version. A request for `max_points` reduces the nearest cached level
+above it, not the full history.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from backend.diagnostics import register_cache
+from backend.metrics import record_cache
+
+METHODS = ("lttb", "minmax")
+MIN_LEVEL = 256
+MINMAX_PRESELECT = 4
+
+
+def _normalize(Y) -> np.ndarray:
+    Y = np.asarray(Y, dtype=np.float64)
+    if Y.ndim == 1:
+        Y = Y[:, None]
+    with np.errstate(invalid="ignore"):
+        mean = np.nanmean(Y, axis=0) if len(Y) else np.zeros(Y.shape[1])
+        std = np.nanstd(Y, axis=0) if len(Y) else np.ones(Y.shape[1])
+    std = np.where(np.isfinite(std) & (std > 0), std, 1.0)
+    return np.nan_to_num((Y - np.nan_to_num(mean)) / std)
+
+
+def minmax_indices(Y, n_out: int) -> np.ndarray:
+    """At most `n_out` row indices: endpoints plus per-bucket extremes of every column."""
+    Z = _normalize(Y)
+    n, k = Z.shape
+    if n <= n_out:
+        return np.arange(n)
+
+    if n_out < 2 + 2 * k:
+        # Too few points for one min/max pair per column
+        return lttb_indices(Z, n_out)
+    n_buckets = (n_out - 2) // (2 * k)
+    bucket = (np.arange(n - 2) * n_buckets) // (n - 2)
+    firsts = np.searchsorted(bucket, np.arange(n_buckets))
+    lasts = np.append(firsts[1:], n - 2) - 1
+
+    picks = [np.array([0, n - 1])]
+    for j in range(k):
+        # Sorted by (bucket, value): each bucket's min comes first, its max last
+        order = np.lexsort((Z[1:-1, j], bucket))
+        picks += [order[firsts] + 1, order[lasts] + 1]
+    return np.unique(np.concatenate(picks))
+
+
+def lttb_indices(Y, n_out: int, x=None) -> np.ndarray:
+    Z = _normalize(Y)
+    n = len(Z)
+    if n <= n_out:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 0)])
+
+    x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)  # n_out - 2 interior buckets
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            cx = x[hi:edges[i + 2]].mean()
+            cz = Z[hi:edges[i + 2]].mean(axis=0)
+        else:
+            cx, cz = x[n - 1], Z[n - 1]
+
+        area = np.abs(
+            (x[a] - cx) * (Z[lo:hi] - Z[a]) - (x[a] - x[lo:hi])[:, None] * (cz - Z[a])
+        ).sum(axis=1)
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_indices(Y, n_out: int, method: str = "lttb", x=None) -> np.ndarray:
+    """Sorted row indices of at most `n_out` rows representing `Y` (n,) or (n, k)."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}'; expected one of {METHODS}")
+    if n_out < 2:
+        raise ValueError("max_points must be at least 2")
+
+    n = len(Y)
+    if n <= n_out:
+        return np.arange(n)
+    if method == "minmax":
+        return minmax_indices(Y, n_out)
+
+    x = np.arange(n) if x is None else np.asarray(x)
+    if n > MINMAX_PRESELECT * n_out:
+        pre = minmax_indices(Y, MINMAX_PRESELECT * n_out)
+        return pre[lttb_indices(np.asarray(Y)[pre], n_out, x=x[pre])]
+    return lttb_indices(Y, n_out, x=x)
+
+
+class ResolutionCache:
+    """
+    key -> (fingerprint, {level size: row indices}). A changed fingerprint
+    (new bars) drops the entry's levels; least recently used keys are
+    evicted beyond `max_entries`.
+    """
+
+    def __init__(self, name: str, max_entries: int = 256):
+        self.name = name
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def indices(self, key, fingerprint, Y, max_points: int, method: str = "lttb") -> np.ndarray:
+        n = len(Y)
+        if max_points >= n:
+            return np.arange(n)
+        if max_points < 2:
+            raise ValueError("max_points must be at least 2")
+
+        key = (key, method)
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != fingerprint:
+            entry = (fingerprint, {})
+            self.entries[key] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        self.entries.move_to_end(key)
+        levels = entry[1]
+
+        level = MIN_LEVEL
+        while level < max_points:
+            level *= 2
+        if level >= n:
+            base = np.arange(n)
+        else:
+            record_cache(self.name, level in levels)
+            if level not in levels:
+                levels[level] = downsample_indices(Y, level, method)
+            base = levels[level]
+
+        if len(base) <= max_points:
+            return base
+        return base[downsample_indices(np.asarray(Y)[base], max_points, method, x=base)]
+
+
+_caches = {}
+
+
+def get_resolution_cache(name: str) -> ResolutionCache:
+    if name not in _caches:
+        _caches[name] = ResolutionCache(name)
+        register_cache(f"downsampling_{name}", _caches[name].entries)
+    return _caches[name]
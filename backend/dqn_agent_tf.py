@@ -2,13 +2,21 @@
 
 import tensorflow as tf
 import numpy as np
+import random
 import os
+from collections import deque
+
+from backend.diagnostics import track_model
+from backend.artifacts import atomic_path
+from backend.numpy_runtime import export_model, get_runtime_path
 
 class DQNAgentTF:
+    runtime = "keras"
+
     def __init__(
         self,
         state_size: int,
-        action_size: int,
+        action_size: int = 3,
         model_path: str | None = None,
         inference_only: bool = False
     ):
@@ -16,6 +24,14 @@ class DQNAgentTF:
         self.action_size = action_size
         self.inference_only = inference_only
 
+        # Training hyper-parameters (unused in inference-only mode)
+        self.memory = deque(maxlen=5000)
+        self.gamma = 0.95
+        self.epsilon = 0.0 if inference_only else 1.0
+        self.epsilon_min = 0.01
+        self.epsilon_decay = 0.995
+        self.batch_size = 32
+
         if model_path is not None:
             if not os.path.exists(model_path):
                 raise RuntimeError(f"Model file not found: {model_path}")
@@ -27,6 +43,8 @@ class DQNAgentTF:
             # 🔹 Training mode (used during RL training)
             self.model = self._build_model()
 
+        track_model("rl", self.model)
+
     def _build_model(self):
         model = tf.keras.Sequential([
             tf.keras.layers.Input(shape=(self.state_size,)),
@@ -42,6 +60,44 @@ class DQNAgentTF:
         return model
 
     def act(self, state):
-        state = np.reshape(state, [1, self.state_size])
-        q_values = self.model.predict(state, verbose=0)
-        return int(np.argmax(q_values[0]))
+        # ε-greedy exploration while training, greedy at inference
+        if self.epsilon > 0 and np.random.rand() < self.epsilon:
+            return random.randrange(self.action_size)
+
+        return int(np.argmax(self.q_values(state)[0]))
+
+    def q_values(self, states) -> np.ndarray:
+        states = np.reshape(states, [-1, self.state_size]).astype(np.float32)
+        # Direct call avoids model.predict's per-call setup overhead
+        return self.model(states, training=False).numpy()
+
+    def train_step(self, state, action, reward, next_state, done):
+        """Store the transition and run one batched replay update."""
+        self.memory.append((state, action, reward, next_state, done))
+        if len(self.memory) < self.batch_size:
+            return
+
+        batch = random.sample(self.memory, self.batch_size)
+        states = np.array([b[0] for b in batch], dtype=np.float32)
+        actions = np.array([b[1] for b in batch])
+        rewards = np.array([b[2] for b in batch], dtype=np.float32)
+        next_states = np.array([b[3] for b in batch], dtype=np.float32)
+        dones = np.array([b[4] for b in batch], dtype=np.float32)
+
+        q = self.model(states, training=False).numpy()
+        q_next = self.model(next_states, training=False).numpy()
+        q[np.arange(len(batch)), actions] = (
+            rewards + self.gamma * np.max(q_next, axis=1) * (1 - dones)
+        )
+        self.model.train_on_batch(states, q)
+
+        if self.epsilon > self.epsilon_min:
+            self.epsilon *= self.epsilon_decay
+
+    def save(self, model_path: str):
+        with atomic_path(model_path) as tmp:
+            self.model.save(tmp)
+        self.export_numpy(model_path)
+
+    def export_numpy(self, model_path: str) -> str:
+        return export_model(self.model, get_runtime_path(model_path), sources=[model_path])
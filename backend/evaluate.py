@@ -1,24 +1,181 @@
+"""
+Walk-forward evaluation of the LSTM predictor.
+
+For every test point the model only sees data before it. Instead of
+training a fresh model per point, the first fold of a chain trains from
+scratch and every later fold fine-tunes the previous fold's weights on
+the newest samples. Chains (one or more per symbol) are independent and
+run in a process pool with pinned thread counts:
+
+    python -m backend.evaluate --symbols AAPL,MSFT --test-size 20 --workers 2
+"""
+
+import sys
+import json
+import time
+import argparse
+
 import numpy as np
-from lstm_model import LSTMPricePredictor
 
-def backtest_lstm(X, y, lookback=60, test_size=20):
+from backend.backtesting import walk_forward_backtest
+from backend.features import FEATURE_COLS
+from backend.parallel import process_pool
 
+
+def split_chains(test_points, n_chains: int = 1):
+    """Split test points into contiguous, independently warm-started chains."""
+    n_chains = max(1, min(n_chains, len(test_points)))
+    return [list(c) for c in np.array_split(np.asarray(test_points), n_chains)]
+
+
+def run_chain(X, y, test_points, lookback=60, epochs=10,
+              fine_tune_epochs=2, replay=64):
     """
-    Backtest on last `test_size` points
+    Walk forward over `test_points`, warm-starting each fold from the
+    previous one. Predicted prices follow /predict: last close compounded
+    with the predicted next return.
     """
+    from backend.lstm_model import LSTMPredictor
 
-    predictions = []
-    actuals = []
+    predictor = None
+    previous = None
+    actuals, predictions = [], []
 
-    for i in range(len(X) - test_size, len(X)):
+    for i in test_points:
         X_train = X[:i]
         y_train = y[:i]
 
-        model = LSTMPricePredictor(lookback=lookback)
-        model.train(X_train, y_train)
+        if predictor is None:
+            predictor = LSTMPredictor(lookback=lookback)
+            predictor.train(X_train, y_train, epochs=epochs)
+        else:
+            # New samples since the previous fold plus a short replay window
+            predictor.fine_tune(
+                X_train, y_train,
+                start=max(0, previous - replay),
+                epochs=fine_tune_epochs,
+            )
+
+        predicted_return = predictor.predict_return(X_train)
+        predictions.append(float(y_train[-1] * (1 + predicted_return)))
+        actuals.append(float(y[i]))
+        previous = int(i)
 
-        pred = model.predict(X_train[-lookback:])
-        predictions.append(pred)
-        actuals.append(y[i])
+    return actuals, predictions
+
+
+def backtest_lstm(X, y, lookback=60, test_size=20, n_chains=1, **kwargs):
+    """
+    Backtest on last `test_size` points (in-process).
+    """
+    test_points = range(len(X) - test_size, len(X))
+    actuals, predictions = [], []
+    for chain in split_chains(test_points, n_chains):
+        a, p = run_chain(X, y, chain, lookback=lookback, **kwargs)
+        actuals.extend(a)
+        predictions.extend(p)
 
     return np.array(actuals), np.array(predictions)
+
+
+def load_symbol_arrays(symbol: str, period: str = "2y"):
+    from backend.feature_store import load_features
+
+    df_feat = load_features(symbol, period=period)
+    return df_feat[FEATURE_COLS].values, df_feat["Close"].values
+
+
+def evaluate_symbols(symbols, test_size=20, n_chains=1, workers=None,
+                     threads=1, period="2y", **chain_kwargs) -> dict:
+    """
+    Walk-forward evaluation for several symbols. Data is fetched once per
+    symbol in the parent; every (symbol, chain) pair is a pool task.
+    """
+    data = {sym: load_symbol_arrays(sym, period) for sym in symbols}
+
+    tasks = []
+    for sym, (X, y) in data.items():
+        if len(X) <= test_size + chain_kwargs.get("lookback", 60):
+            raise ValueError(f"Not enough history for {sym}")
+        test_points = range(len(X) - test_size, len(X))
+        for chain in split_chains(test_points, n_chains):
+            tasks.append((sym, chain))
+
+    started = time.perf_counter()
+    outputs = {}
+    if workers == 1:
+        for sym, chain in tasks:
+            X, y = data[sym]
+            outputs[(sym, chain[0])] = run_chain(X, y, chain, **chain_kwargs)
+    else:
+        with process_pool(workers, threads) as pool:
+            futures = {
+                (sym, chain[0]): pool.submit(run_chain, *data[sym], chain, **chain_kwargs)
+                for sym, chain in tasks
+            }
+            outputs = {key: f.result() for key, f in futures.items()}
+
+    results = {}
+    for sym in symbols:
+        actuals, predictions = [], []
+        for key in sorted(k for k in outputs if k[0] == sym):
+            a, p = outputs[key]
+            actuals.extend(a)
+            predictions.extend(p)
+        results[sym] = {
+            "metrics": walk_forward_backtest(np.array(actuals), np.array(predictions)),
+            "actuals": actuals,
+            "predictions": predictions,
+        }
+
+    return {
+        "seconds": round(time.perf_counter() - started, 2),
+        "test_size": test_size,
+        "chains_per_symbol": n_chains,
+        "symbols": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm-started walk-forward LSTM evaluation")
+    parser.add_argument("--symbols", default="AAPL", help="comma separated symbols")
+    parser.add_argument("--test-size", type=int, default=20)
+    parser.add_argument("--chains", type=int, default=1,
+                        help="independent warm-start chains per symbol")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (1 runs in-process)")
+    parser.add_argument("--threads", type=int, default=1, help="TF/BLAS threads per worker")
+    parser.add_argument("--lookback", type=int, default=60)
+    parser.add_argument("--epochs", type=int, default=10, help="epochs for the first fold")
+    parser.add_argument("--fine-tune-epochs", type=int, default=2)
+    parser.add_argument("--replay", type=int, default=64,
+                        help="recent samples replayed when fine-tuning")
+    parser.add_argument("--period", default="2y")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = evaluate_symbols(
+        [s.strip() for s in args.symbols.split(",") if s.strip()],
+        test_size=args.test_size,
+        n_chains=args.chains,
+        workers=args.workers,
+        threads=args.threads,
+        period=args.period,
+        lookback=args.lookback,
+        epochs=args.epochs,
+        fine_tune_epochs=args.fine_tune_epochs,
+        replay=args.replay,
+    )
+
+    for sym, res in report["symbols"].items():
+        print(f"{sym}: {res['metrics']}")
+    print(f"total: {report['seconds']} s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,470 @@
+# backend/expressions.py
+"""
+Indicator expression language.
+
+Indicators are written as expressions over the raw bar fields, e.g.
+
+    macd   = ema(close, 12) - ema(close, 26)
+    vol_20 = rolling_std(returns, 20)
+    trend  = ema(close, 20) > ema(close, 50)
+
+A set of named expressions is parsed (Python syntax, restricted to
+numbers, the INPUTS fields, + - * / ** unary minus, comparisons and the
+FUNCTIONS below) and compiled into one DAG. Every node is interned by a
+canonical key, so a subexpression shared by several indicators (or
+written twice in one) is computed once. Aliases and default arguments
+are resolved first, so sma(close, 20) and rolling_mean(close, 20) are
+the same node, and so are rsi(close) and rsi(close, 14). Operands of
++ and * are ordered, so a + b and b + a are the same node too.
+
+Nodes are evaluated on (dates, symbols) arrays. Element-wise nodes are
+NumPy operations. Window nodes (ema, rolling_*, rsi) run pandas'
+column-wise C loops over the whole panel at once. One symbol is a panel
+with one column. Each node's result is cached under the hash of its
+canonical key and the hash of the input data, so later requests on the
+same bars reuse every subexpression they share with earlier ones.
+
+    program = compile_expressions({"macd": "ema(close,12) - ema(close,26)"})
+    outputs = program.evaluate({"close": closes})
+"""
+
+import ast
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from backend.diagnostics import register_cache
+from backend.metrics import record_cache, span
+
+INPUTS = ("open", "high", "low", "close", "volume")
+MAX_EXPRESSIONS = 32
+MAX_EXPRESSION_LENGTH = 500
+MAX_WINDOW = 5000
+MAX_CACHED_NODES = 512
+
+
+# -------------------------------------------------
+# Kernels: (n_dates, n_symbols) float arrays in, same shape out
+# -------------------------------------------------
+def _frame(x):
+    return pd.DataFrame(x, copy=False)
+
+
+def _shift(x, periods):
+    out = np.full_like(x, np.nan)
+    if periods < len(x):
+        out[periods:] = x[:len(x) - periods]
+    return out
+
+
+def wilder_rsi(x, window: int = 14):
+    """Wilder RSI per column, exactly as ta.momentum.RSIIndicator."""
+    diff = np.diff(x, axis=0, prepend=np.nan)
+    up = _frame(np.where(diff > 0, diff, 0.0)).ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    down = _frame(np.where(diff < 0, -diff, 0.0)).ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    up, down = up.to_numpy(), down.to_numpy()
+    return np.where(down == 0, 100.0, 100 - 100 / (1 + up / down))
+
+
+def _rolling(method):
+    return lambda x, window: getattr(_frame(x).rolling(window), method)().to_numpy()
+
+
+# name -> (kernel, number of series arguments, (parameter defaults; None = required))
+FUNCTIONS = {
+    "ema": (lambda x, span: _frame(x).ewm(span=span, min_periods=span, adjust=False).mean().to_numpy(),
+            1, (None,)),
+    "rolling_mean": (_rolling("mean"), 1, (None,)),
+    "rolling_std": (_rolling("std"), 1, (None,)),
+    "rolling_min": (_rolling("min"), 1, (None,)),
+    "rolling_max": (_rolling("max"), 1, (None,)),
+    "rolling_sum": (_rolling("sum"), 1, (None,)),
+    "rsi": (wilder_rsi, 1, (14,)),
+    "shift": (_shift, 1, (1,)),
+    "diff": (lambda x, periods: x - _shift(x, periods), 1, (1,)),
+    "pct_change": (lambda x, periods: x / _shift(x, periods) - 1, 1, (1,)),
+    "abs": (np.abs, 1, ()),
+    "log": (np.log, 1, ()),
+    "sqrt": (np.sqrt, 1, ()),
+    "exp": (np.exp, 1, ()),
+    "max": (np.fmax, 2, ()),
+    "min": (np.fmin, 2, ()),
+}
+ALIASES = {"sma": "rolling_mean"}
+
+
+def _compare(op):
+    def kernel(a, b):
+        # Two constants compare to a NumPy scalar; mask on an array
+        out = np.asarray(op(a, b), dtype=np.float64)
+        out[np.isnan(a + b)] = np.nan
+        return out
+    return kernel
+
+
+OPERATORS = {
+    "add": np.add, "sub": np.subtract, "mul": np.multiply,
+    "div": np.divide, "pow": np.power, "neg": np.negative,
+    "lt": _compare(np.less), "le": _compare(np.less_equal),
+    "gt": _compare(np.greater), "ge": _compare(np.greater_equal),
+}
+_BINOPS = {ast.Add: "add", ast.Sub: "sub", ast.Mult: "mul", ast.Div: "div", ast.Pow: "pow"}
+_CMPOPS = {ast.Lt: "lt", ast.LtE: "le", ast.Gt: "gt", ast.GtE: "ge"}
+_COMMUTATIVE = {"add", "mul"}
+
+
+# -------------------------------------------------
+# Compilation
+# -------------------------------------------------
+class Program:
+    """
+    Nodes in topological order: (op, child node ids, parameters, key).
+    op is "input", "const", an OPERATORS name or a FUNCTIONS name.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.hashes = []
+        self.index = {}      # canonical key -> node id
+        self.outputs = {}    # name -> node id
+        self.terms = 0       # nodes requested before sharing
+
+    def intern(self, op, children=(), params=()):
+        self.terms += 1
+        key = (op, tuple(self.nodes[c][3] for c in children), tuple(params))
+        if key not in self.index:
+            self.index[key] = len(self.nodes)
+            self.nodes.append((op, tuple(children), tuple(params), key))
+            self.hashes.append(hashlib.sha1(repr(key).encode()).hexdigest()[:16])
+        return self.index[key]
+
+    @property
+    def inputs(self):
+        return sorted({params[0] for op, _, params, _ in self.nodes if op == "input"})
+
+    def summary(self) -> dict:
+        return {
+            "outputs": len(self.outputs),
+            "nodes": len(self.nodes),
+            "terms": self.terms,
+            "shared": self.terms - len(self.nodes),
+        }
+
+    def evaluate(self, data: dict, cache=None, data_key=None) -> dict:
+        """
+        name -> array for every output. `data` maps input fields to arrays of
+        shape (n,) or (n, n_symbols); outputs have the same shape. With a
+        cache, node results are looked up and stored under (data_key, node hash).
+        """
+        missing = [name for name in self.inputs if name not in data]
+        if missing:
+            raise ValueError(f"Missing input series: {missing}")
+        first = np.asarray(data[self.inputs[0]])
+        shape = first.shape if first.ndim == 2 else (len(first), 1)
+        squeeze = all(np.ndim(data[name]) == 1 for name in self.inputs)
+        use_cache = cache is not None and data_key is not None
+
+        values = {}
+        needed, stack = set(), list(self.outputs.values())
+        while stack:
+            node = stack.pop()
+            if node in needed or node in values:
+                continue
+            op = self.nodes[node][0]
+            if use_cache and op not in ("input", "const"):
+                hit = cache.get((data_key, self.hashes[node]))
+                if hit is not None:
+                    values[node] = hit
+                    continue
+            needed.add(node)
+            stack.extend(self.nodes[node][1])
+
+        # Intermediates are released once their last consumer has run
+        remaining = {}
+        for node in needed:
+            for child in self.nodes[node][1]:
+                remaining[child] = remaining.get(child, 0) + 1
+        keep = set(self.outputs.values())
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            for node in sorted(needed):
+                op, children, params, _ = self.nodes[node]
+                if op == "input":
+                    result = np.asarray(data[params[0]], dtype=np.float64)
+                    result = result[:, None] if result.ndim == 1 else result
+                elif op == "const":
+                    result = np.float64(params[0])
+                elif op in OPERATORS:
+                    result = OPERATORS[op](*(values[c] for c in children))
+                else:
+                    result = FUNCTIONS[op][0](*(values[c] for c in children), *params)
+                values[node] = result
+
+                if use_cache and op not in ("input", "const"):
+                    result = np.asarray(result)
+                    result.setflags(write=False)
+                    cache.put((data_key, self.hashes[node]), result)
+                for child in children:
+                    remaining[child] -= 1
+                    if remaining[child] == 0 and child not in keep:
+                        values.pop(child, None)
+
+        out = {}
+        for name, node in self.outputs.items():
+            result = np.broadcast_to(values[node], shape)
+            out[name] = result[:, 0] if squeeze else result
+        return out
+
+
+class _Compiler:
+    def __init__(self, program: Program):
+        self.program = program
+
+    def compile(self, text: str) -> int:
+        if len(text) > MAX_EXPRESSION_LENGTH:
+            raise ValueError(f"Expression longer than {MAX_EXPRESSION_LENGTH} characters")
+        try:
+            tree = ast.parse(text.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression '{text}': {e.msg}")
+        return self.visit(tree.body)
+
+    def visit(self, node) -> int:
+        p = self.program
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) \
+                and not isinstance(node.value, bool):
+            return p.intern("const", params=(float(node.value),))
+        if isinstance(node, ast.Name):
+            if node.id == "returns":
+                return p.intern("pct_change", (p.intern("input", params=("close",)),), (1,))
+            if node.id not in INPUTS:
+                raise ValueError(f"Unknown series '{node.id}'; expected one of {INPUTS + ('returns',)}")
+            return p.intern("input", params=(node.id,))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            operand = self.visit(node.operand)
+            return operand if isinstance(node.op, ast.UAdd) else p.intern("neg", (operand,))
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+            return self.binary(_BINOPS[type(node.op)], self.visit(node.left), self.visit(node.right))
+        if isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in _CMPOPS:
+            return self.binary(_CMPOPS[type(node.ops[0])], self.visit(node.left),
+                               self.visit(node.comparators[0]))
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            return self.call(node.func.id, node.args)
+        raise ValueError(f"Unsupported syntax: '{ast.unparse(node)}'")
+
+    def binary(self, op, left, right) -> int:
+        if op in _COMMUTATIVE:
+            left, right = sorted((left, right), key=lambda n: repr(self.program.nodes[n][3]))
+        return self.program.intern(op, (left, right))
+
+    def call(self, name, args) -> int:
+        name = ALIASES.get(name, name)
+        if name == "zscore":
+            # (x - rolling_mean(x, n)) / rolling_std(x, n), sharing both windows
+            if len(args) != 2:
+                raise ValueError("zscore takes (series, window)")
+            x = self.visit(args[0])
+            window = self.parameter("zscore", args[1])
+            mean = self.program.intern("rolling_mean", (x,), (window,))
+            std = self.program.intern("rolling_std", (x,), (window,))
+            return self.binary("div", self.binary("sub", x, mean), std)
+
+        if name not in FUNCTIONS:
+            raise ValueError(f"Unknown function '{name}'; expected one of {sorted(list(FUNCTIONS) + list(ALIASES) + ['zscore'])}")
+        _, n_series, defaults = FUNCTIONS[name]
+        if not n_series <= len(args) <= n_series + len(defaults):
+            raise ValueError(f"{name} takes {n_series} series and {len(defaults)} parameter(s)")
+
+        children = tuple(self.visit(a) for a in args[:n_series])
+        params = [self.parameter(name, a) for a in args[n_series:]]
+        for default in defaults[len(params):]:
+            if default is None:
+                raise ValueError(f"{name} requires a window/period parameter")
+            params.append(default)
+        return self.program.intern(name, children, params)
+
+    @staticmethod
+    def parameter(name, node) -> int:
+        if not (isinstance(node, ast.Constant) and isinstance(node.value, int)
+                and not isinstance(node.value, bool) and 1 <= node.value <= MAX_WINDOW):
+            raise ValueError(f"{name}: parameters must be integers between 1 and {MAX_WINDOW}")
+        return node.value
+
+
+def compile_expressions(expressions: dict) -> Program:
+    """One DAG for several named expressions, with shared subexpressions merged."""
+    if not expressions:
+        raise ValueError("No expressions given")
+    if len(expressions) > MAX_EXPRESSIONS:
+        raise ValueError(f"At most {MAX_EXPRESSIONS} expressions per request")
+    return _compile(tuple(sorted(expressions.items())))
+
+
+@lru_cache(maxsize=256)
+def _compile(items) -> Program:
+    program = Program()
+    compiler = _Compiler(program)
+    for name, text in items:
+        program.outputs[name] = compiler.compile(text)
+    if not program.inputs:
+        raise ValueError(f"Expressions must use at least one of {INPUTS + ('returns',)}")
+    return program
+
+
+# -------------------------------------------------
+# Result cache
+# -------------------------------------------------
+class ExpressionCache:
+    """(data hash, node hash) -> read-only array, least recently used evicted."""
+
+    def __init__(self, max_entries: int = MAX_CACHED_NODES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+        record_cache("expressions", value is not None)
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+expression_cache = ExpressionCache()
+register_cache("expressions", expression_cache.entries)
+
+
+# -------------------------------------------------
+# Inputs
+# -------------------------------------------------
+def frame_inputs(df: pd.DataFrame) -> dict:
+    """INPUTS fields of one symbol's bar frame, as 1-D arrays."""
+    return {name: df[name.capitalize()].to_numpy(dtype=np.float64)
+            for name in INPUTS if name.capitalize() in df}
+
+
+def evaluate_frame(df: pd.DataFrame, expressions: dict, cache: Optional[ExpressionCache] = None,
+                   data_key=None) -> pd.DataFrame:
+    """Expressions over one symbol's bars, one column per expression."""
+    outputs = compile_expressions(expressions).evaluate(frame_inputs(df), cache, data_key)
+    return pd.DataFrame(outputs, index=df.index)
+
+
+def build_inputs(symbols, period: str = "1y", interval: str = "1d"):
+    """(dates, field -> (dates, symbols) array, symbols kept, skipped, data hash)."""
+    from backend.feature_store import raw_hash
+    from backend.stock_data import fetch_stock_data
+
+    def fetch(symbol):
+        try:
+            df = fetch_stock_data(symbol, period=period, interval=interval)
+        except Exception:
+            return None
+        return None if df is None or df.empty else df
+
+    with span("fetch_stock_data"):
+        with ThreadPoolExecutor(max_workers=min(8, len(symbols))) as pool:
+            frames = dict(zip(symbols, pool.map(fetch, symbols)))
+
+    skipped = [s for s, df in frames.items() if df is None]
+    frames = {s: df.set_index("Date") for s, df in frames.items() if df is not None}
+    if not frames:
+        raise ValueError("No data available for any requested symbol")
+
+    data, dates = {}, None
+    for name in INPUTS:
+        field = name.capitalize()
+        # Union of dates; a holiday of one market repeats its previous bar
+        panel = pd.concat({s: df[field] for s, df in frames.items()}, axis=1).sort_index().ffill()
+        data[name], dates = panel.to_numpy(dtype=np.float64), panel.index
+    digest = hashlib.sha1(repr(
+        (period, interval, [(s, raw_hash(df)) for s, df in frames.items()])
+    ).encode()).hexdigest()[:16]
+    return dates, data, list(frames), skipped, digest
+
+
+def run_expressions(symbols, expressions: dict, period: str = "1y", interval: str = "1d",
+                    limit: int = 100) -> dict:
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    program = compile_expressions(expressions)
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        raise ValueError("No symbols given")
+
+    dates, data, kept, skipped, digest = build_inputs(symbols, period, interval)
+    with span("expressions"):
+        outputs = program.evaluate(data, expression_cache, digest)
+
+    rows = slice(max(0, len(dates) - limit), None)
+
+    def clean(column):
+        return [None if not np.isfinite(v) else round(float(v), 6) for v in column[rows]]
+
+    return {
+        "as_of": str(dates[-1]),
+        "program": program.summary(),
+        "skipped": skipped,
+        "dates": [str(d) for d in dates[rows]],
+        "symbols": {
+            symbol: {name: clean(values[:, j]) for name, values in outputs.items()}
+            for j, symbol in enumerate(kept)
+        },
+    }
+
+
+# -------------------------------------------------
+# API
+# -------------------------------------------------
+class ExpressionRequest(BaseModel):
+    symbols: List[str]
+    expressions: Dict[str, str]   # name -> expression
+    period: str = "1y"
+    interval: str = "1d"
+    limit: int = 100              # latest rows returned per symbol
+
+
+router = APIRouter(prefix="/expressions", tags=["Expressions"])
+
+
+@router.get("/functions")
+def expression_functions():
+    """Input series and functions available in expressions."""
+    return {
+        "inputs": list(INPUTS) + ["returns"],
+        "functions": {
+            name: {"series": n_series, "parameters": list(defaults)}
+            for name, (_, n_series, defaults) in FUNCTIONS.items()
+        },
+        "aliases": {**ALIASES, "zscore": "(x - rolling_mean(x, n)) / rolling_std(x, n)"},
+        "operators": ["+", "-", "*", "/", "**", "<", "<=", ">", ">="],
+    }
+
+
+@router.post("")
+def evaluate_expressions(req: ExpressionRequest):
+    """
+    Evaluate named indicator expressions over one or more symbols, e.g.
+    {"symbols": ["AAPL", "MSFT"], "expressions": {"macd": "ema(close,12) - ema(close,26)"}}
+    """
+    try:
+        symbols = [s.strip().upper() for s in req.symbols if s.strip()]
+        return run_expressions(symbols, req.expressions, req.period, req.interval, req.limit)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,305 @@
+# backend/feature_store.py
+"""
+Versioned on-disk feature store shared by training and serving.
+
+A feature set is a named builder (raw OHLCV frame -> feature frame), the
+model input columns it provides and an explicit version. Its version id
+also carries a hash of the builder's source, so editing the builder or
+bumping the version starts a new set of files instead of reusing stale
+ones.
+
+Materialized features live under
+
+    FEATURE_STORE_DIR/<set>/v<version>-<definition hash>/<interval>/<symbol>-<period>/
+        <raw hash>/values.npy   float64 (rows, columns), memory-mapped on read
+                   dates.npy    the Date column (naive UTC when tz-aware)
+                   index.npy    the builder's row labels
+                   meta.json
+
+A snapshot is named after a hash of the raw bars it was built from and
+never changes once written: it is staged under a temporary name and
+renamed into place, and older snapshots of the same key are removed.
+Features are therefore recomputed only when the raw data or the
+definition changes, and a trainer and an endpoint that see the same bars
+read the same files. Recently used frames are also kept in memory.
+
+    df_feat = load_features("AAPL", df)     # df from fetch_stock_data("AAPL")
+    X = df_feat[FEATURE_COLS].values
+
+    python -m backend.feature_store --symbols AAPL,MSFT --period 2y
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import inspect
+import logging
+import argparse
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from backend.diagnostics import register_cache
+from backend.features import FEATURE_COLS, create_features
+from backend.metrics import record_cache, span
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR", os.path.join(BASE_DIR, "data", "features"))
+FEATURE_STORE_MAX_FRAMES = int(os.getenv("FEATURE_STORE_MAX_FRAMES", "128"))
+DEFAULT_FEATURE_SET = "default"
+
+
+# -------------------------------------------------
+# Feature set definitions
+# -------------------------------------------------
+class FeatureSet:
+    def __init__(self, name: str, builder, columns, version: int = 1):
+        self.name = name
+        self.builder = builder
+        self.columns = list(columns)
+        self.version = version
+
+        try:
+            source = inspect.getsource(builder)
+        except (OSError, TypeError):
+            source = f"{builder.__module__}.{builder.__qualname__}"
+        definition = json.dumps(
+            {"name": name, "version": version, "columns": self.columns, "source": source}
+        )
+        self.definition_hash = hashlib.sha256(definition.encode()).hexdigest()[:12]
+        self.version_id = f"v{version}-{self.definition_hash}"
+
+
+FEATURE_SETS = {}
+
+
+def register_feature_set(name: str, builder, columns, version: int = 1) -> FeatureSet:
+    FEATURE_SETS[name] = FeatureSet(name, builder, columns, version)
+    return FEATURE_SETS[name]
+
+
+def get_feature_set(name: str) -> FeatureSet:
+    if name not in FEATURE_SETS:
+        raise ValueError(f"Unknown feature set '{name}'; expected one of {sorted(FEATURE_SETS)}")
+    return FEATURE_SETS[name]
+
+
+register_feature_set(DEFAULT_FEATURE_SET, create_features, FEATURE_COLS)
+
+
+def raw_hash(df: pd.DataFrame) -> str:
+    """Content hash of a raw bar frame (column names and values, not the index)."""
+    h = hashlib.blake2b(digest_size=8)
+    h.update("\0".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+# -------------------------------------------------
+# Snapshots
+# -------------------------------------------------
+def _write_snapshot(directory: str, frame: pd.DataFrame, meta: dict):
+    columns = [c for c in frame.columns if c != "Date"]
+    meta = {
+        **meta,
+        "columns": list(frame.columns),
+        "dtypes": {c: str(frame[c].dtype) for c in columns},
+        "rows": len(frame),
+        "tz": None,
+        "index": frame.index.dtype.kind in "iu",
+    }
+    np.save(os.path.join(directory, "values.npy"), frame[columns].to_numpy(dtype=np.float64))
+    if meta["index"]:
+        np.save(os.path.join(directory, "index.npy"), frame.index.to_numpy())
+    if "Date" in frame:
+        dates = pd.to_datetime(frame["Date"])
+        if dates.dt.tz is not None:
+            meta["tz"] = str(dates.dt.tz)
+            dates = dates.dt.tz_convert("UTC").dt.tz_localize(None)
+        np.save(os.path.join(directory, "dates.npy"), dates.to_numpy())
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+
+def _read_snapshot(directory: str, mmap: bool = True) -> pd.DataFrame:
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    # An empty array cannot be memory-mapped
+    mode = "r" if mmap and meta["rows"] else None
+
+    values = np.load(os.path.join(directory, "values.npy"), mmap_mode=mode)
+    index = np.load(os.path.join(directory, "index.npy")) if meta["index"] else None
+    columns = [c for c in meta["columns"] if c != "Date"]
+    frame = pd.DataFrame(values, columns=columns, index=index, copy=False)
+    for column, dtype in meta["dtypes"].items():
+        if dtype != "float64":
+            frame[column] = frame[column].astype(dtype)
+
+    if "Date" in meta["columns"]:
+        dates = pd.DatetimeIndex(np.load(os.path.join(directory, "dates.npy")))
+        if meta["tz"]:
+            dates = dates.tz_localize("UTC").tz_convert(meta["tz"])
+        frame.insert(meta["columns"].index("Date"), "Date", dates.array)
+    return frame
+
+
+# -------------------------------------------------
+# Store
+# -------------------------------------------------
+class FeatureStore:
+    def __init__(self, root: str = FEATURE_STORE_DIR, max_frames: int = FEATURE_STORE_MAX_FRAMES):
+        self.root = root
+        self.max_frames = max_frames
+        self._frames = OrderedDict()    # (set, version id, interval, symbol, period) -> (raw hash, frame)
+        self._lock = threading.Lock()
+
+    def directory(self, symbol: str, period: str = "2y", interval: str = "1d",
+                  feature_set: str = DEFAULT_FEATURE_SET) -> str:
+        fs = get_feature_set(feature_set)
+        name = re.sub(r"[^A-Za-z0-9._^=-]", "_", f"{symbol}-{period}")
+        return os.path.join(self.root, fs.name, fs.version_id, interval, name)
+
+    def materialize(self, symbol: str, df=None, period: str = "2y", interval: str = "1d",
+                    feature_set: str = DEFAULT_FEATURE_SET):
+        """(feature frame, source): source is memory, disk or computed."""
+        if df is None:
+            from backend.stock_data import fetch_stock_data
+
+            with span("fetch_stock_data"):
+                df = fetch_stock_data(symbol, period=period, interval=interval)
+        if df is None or df.empty:
+            raise ValueError(f"No data available for {symbol}")
+
+        fs = get_feature_set(feature_set)
+        key = (fs.name, fs.version_id, interval, symbol, period)
+        digest = raw_hash(df)
+
+        with self._lock:
+            cached = self._frames.get(key)
+            if cached is not None and cached[0] == digest:
+                self._frames.move_to_end(key)
+                record_cache("feature_store", True)
+                return cached[1].copy(deep=False), "memory"
+
+        directory = self.directory(symbol, period, interval, feature_set)
+        snapshot = os.path.join(directory, digest)
+        frame, source = None, "disk"
+        try:
+            with span("feature_store_read"):
+                frame = _read_snapshot(snapshot)
+        except (OSError, ValueError, KeyError):
+            # Missing, or pruned by a concurrent writer
+            pass
+        record_cache("feature_store", frame is not None)
+
+        if frame is None:
+            with span("create_features"):
+                frame = fs.builder(df)
+            source = "computed"
+            self._write(directory, digest, frame, {
+                "symbol": symbol,
+                "period": period,
+                "interval": interval,
+                "feature_set": fs.name,
+                "version_id": fs.version_id,
+                "raw_hash": digest,
+                "raw_rows": len(df),
+                "created_at": time.time(),
+            })
+
+        with self._lock:
+            self._frames[key] = (digest, frame)
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+        return frame.copy(deep=False), source
+
+    def features(self, symbol: str, df=None, period: str = "2y", interval: str = "1d",
+                 feature_set: str = DEFAULT_FEATURE_SET) -> pd.DataFrame:
+        return self.materialize(symbol, df, period, interval, feature_set)[0]
+
+    def _write(self, directory: str, digest: str, frame: pd.DataFrame, meta: dict):
+        staged = os.path.join(directory, f".{digest}.tmp-{os.getpid()}-{uuid.uuid4().hex[:8]}")
+        try:
+            os.makedirs(staged)
+            _write_snapshot(staged, frame, meta)
+            try:
+                os.rename(staged, os.path.join(directory, digest))
+            except OSError:
+                # Another writer materialized the same bars first
+                pass
+            for entry in os.listdir(directory):
+                if entry != digest and not entry.startswith("."):
+                    shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+        except OSError as e:
+            logger.warning(f"Feature store: could not write {directory}: {e}")
+        finally:
+            shutil.rmtree(staged, ignore_errors=True)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_feature_store() -> FeatureStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FeatureStore()
+            register_cache("feature_store", _store._frames)
+        return _store
+
+
+def load_features(symbol: str, df=None, period: str = "2y", interval: str = "1d",
+                  feature_set: str = DEFAULT_FEATURE_SET) -> pd.DataFrame:
+    """
+    Features of `df` (fetched for `period` when omitted), as create_features
+    would return them, read from the store when they are already materialized.
+    """
+    return get_feature_store().features(symbol, df, period, interval, feature_set)
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Materialize feature sets ahead of training")
+    parser.add_argument("--symbols", default="all",
+                        help="comma separated symbols, or 'all' for SUPPORTED_STOCKS")
+    parser.add_argument("--period", default="2y")
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--feature-set", default=DEFAULT_FEATURE_SET)
+    args = parser.parse_args(argv)
+
+    if args.symbols == "all":
+        from backend.config.stocks import SUPPORTED_STOCKS
+        symbols = list(SUPPORTED_STOCKS)
+    else:
+        symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
+
+    store = get_feature_store()
+    failed = 0
+    for symbol in symbols:
+        try:
+            frame, source = store.materialize(
+                symbol, period=args.period, interval=args.interval, feature_set=args.feature_set
+            )
+        except Exception as e:
+            print(f">>> {symbol}: skipped ({e})", file=sys.stderr)
+            failed += 1
+            continue
+        print(f">>> {symbol}: {len(frame)} rows ({source})")
+    return 1 if failed == len(symbols) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
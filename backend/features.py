@@ -1,7 +1,12 @@
 import pandas as pd
-import ta
+
+# Model inputs, in the order every model and agent is trained on
+FEATURE_COLS = ["rsi", "ema_20", "ema_50", "volatility"]
+
 
 def create_features(df: pd.DataFrame):
+    import ta
+
     df = df.copy()
 
     df["returns"] = df["Close"].pct_change()
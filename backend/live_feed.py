@@ -0,0 +1,300 @@
+# backend/live_feed.py
+"""
+Push channel for live prices, indicators and trade signals.
+
+Every dashboard tab polling /history, /indicators and /trade-signal on a
+timer multiplies backend work by the number of viewers. Here clients
+subscribe to symbols over a WebSocket (/live/ws) or Server-Sent Events
+(/live/stream?symbols=AAPL,MSFT) instead:
+
+- one background poller per subscribed symbol refreshes the data,
+  indicators and signal once per LIVE_POLL_INTERVAL seconds and
+  broadcasts the snapshot to all of that symbol's subscribers;
+- each subscriber holds at most one undelivered snapshot per symbol, so
+  a slow consumer skips stale updates (counted in
+  live_updates_dropped_total) instead of growing a queue; a connection
+  that cannot take a message within LIVE_SEND_TIMEOUT is closed;
+- the poller stops when its last subscriber leaves.
+
+WebSocket clients send {"action": "subscribe" | "unsubscribe", "symbols": [...]}.
+"""
+
+import os
+import json
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from backend.metrics import counter, gauge, span
+
+logger = logging.getLogger(__name__)
+
+LIVE_POLL_INTERVAL = float(os.getenv("LIVE_POLL_INTERVAL", "15"))
+LIVE_SEND_TIMEOUT = float(os.getenv("LIVE_SEND_TIMEOUT", "10"))
+LIVE_HEARTBEAT = float(os.getenv("LIVE_HEARTBEAT", "15"))
+LIVE_MAX_SYMBOLS = int(os.getenv("LIVE_MAX_SYMBOLS", "20"))
+
+SUBSCRIBERS = gauge("live_subscribers", "Connected live-feed clients")
+POLLERS = gauge("live_pollers", "Symbols with an active upstream poller")
+POLLS = counter("live_polls_total", "Upstream refreshes run by live-feed pollers")
+DROPPED = counter(
+    "live_updates_dropped_total",
+    "Snapshots superseded before a slow subscriber received them",
+)
+
+
+def build_snapshot(symbol: str) -> dict:
+    """Latest bar, indicators and trade signal for one symbol (blocking)."""
+    from backend.stock_data import fetch_stock_data
+    from backend.features import FEATURE_COLS
+    from backend.feature_store import load_features
+
+    with span("fetch_stock_data"):
+        df = fetch_stock_data(symbol, period="6mo")
+    if df is None or df.empty:
+        raise ValueError(f"No data available for {symbol}")
+    df_feat = load_features(symbol, df, period="6mo")
+
+    last = df_feat.iloc[-1]
+    prev_close = float(df_feat["Close"].iloc[-2]) if len(df_feat) > 1 else float(last["Close"])
+
+    try:
+        from backend.trade_signal import get_trade_signal
+
+        signal = get_trade_signal(symbol)
+        signal = {"signal": signal["signal"], "confidence": signal["confidence"]}
+    except Exception as e:
+        signal = {"signal": None, "error": str(e)}
+
+    return {
+        "type": "update",
+        "symbol": symbol,
+        "date": str(last["Date"]),
+        "price": float(last["Close"]),
+        "change": round(float(last["Close"]) - prev_close, 4),
+        "change_pct": round(float(last["Close"]) / prev_close - 1, 6) if prev_close else 0.0,
+        "indicators": {
+            col: float(last[col]) for col in FEATURE_COLS
+        },
+        "signal": signal,
+    }
+
+
+class Subscriber:
+    """One client connection: latest undelivered snapshot per symbol."""
+
+    def __init__(self):
+        self.symbols = set()
+        self.pending = {}   # symbol -> newest snapshot not yet sent
+        self.ready = asyncio.Event()
+        self.dropped = 0
+
+    def offer(self, symbol: str, message: dict):
+        if symbol in self.pending:
+            self.dropped += 1
+            DROPPED.inc(symbol=symbol)
+        self.pending[symbol] = message
+        self.ready.set()
+
+    async def next(self, timeout: Optional[float] = None) -> list:
+        """Wait for updates; [] on timeout (time for a heartbeat)."""
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self.ready.clear()
+        messages, self.pending = list(self.pending.values()), {}
+        return messages
+
+
+class SymbolPoller:
+    def __init__(self, symbol: str, interval: float):
+        self.symbol = symbol
+        self.interval = interval
+        self.subscribers = set()
+        self.latest = None
+        self.task = None
+
+    def start(self):
+        self.task = asyncio.create_task(self._run(), name=f"live-{self.symbol}")
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    async def _run(self):
+        while True:
+            try:
+                snapshot = await asyncio.to_thread(build_snapshot, self.symbol)
+            except Exception as e:
+                snapshot = {"type": "error", "symbol": self.symbol, "error": str(e)}
+            POLLS.inc(symbol=self.symbol)
+
+            if snapshot != self.latest:
+                self.latest = snapshot
+                for subscriber in list(self.subscribers):
+                    subscriber.offer(self.symbol, snapshot)
+            await asyncio.sleep(self.interval)
+
+
+class LiveFeed:
+    """
+    Symbol -> poller registry. Only touched from the event loop, so it
+    needs no locking.
+    """
+
+    def __init__(self, interval: float = LIVE_POLL_INTERVAL):
+        self.interval = interval
+        self._pollers = {}
+
+    def connect(self) -> Subscriber:
+        SUBSCRIBERS.inc()
+        return Subscriber()
+
+    def disconnect(self, subscriber: Subscriber):
+        self.unsubscribe(subscriber)
+        SUBSCRIBERS.dec()
+
+    def subscribe(self, subscriber: Subscriber, symbols):
+        symbols = [s.strip().upper() for s in symbols if s and s.strip()]
+        if len(subscriber.symbols | set(symbols)) > LIVE_MAX_SYMBOLS:
+            raise ValueError(f"At most {LIVE_MAX_SYMBOLS} symbols per connection")
+
+        for symbol in symbols:
+            if symbol in subscriber.symbols:
+                continue
+            poller = self._pollers.get(symbol)
+            if poller is None:
+                poller = SymbolPoller(symbol, self.interval)
+                self._pollers[symbol] = poller
+                poller.start()
+                POLLERS.inc()
+            poller.subscribers.add(subscriber)
+            subscriber.symbols.add(symbol)
+            # Late joiners get the current state without waiting a full interval
+            if poller.latest is not None:
+                subscriber.offer(symbol, poller.latest)
+
+    def unsubscribe(self, subscriber: Subscriber, symbols=None):
+        symbols = subscriber.symbols if symbols is None else {s.strip().upper() for s in symbols}
+        for symbol in list(symbols):
+            subscriber.symbols.discard(symbol)
+            subscriber.pending.pop(symbol, None)
+            poller = self._pollers.get(symbol)
+            if poller is None:
+                continue
+            poller.subscribers.discard(subscriber)
+            if not poller.subscribers:
+                poller.stop()
+                del self._pollers[symbol]
+                POLLERS.dec()
+
+    def stats(self) -> dict:
+        return {
+            "poll_interval": self.interval,
+            "symbols": {
+                symbol: len(poller.subscribers) for symbol, poller in self._pollers.items()
+            },
+        }
+
+    async def shutdown(self):
+        for poller in self._pollers.values():
+            poller.stop()
+        await asyncio.gather(
+            *(p.task for p in self._pollers.values() if p.task), return_exceptions=True
+        )
+        POLLERS.dec(len(self._pollers))
+        self._pollers.clear()
+
+
+live_feed = LiveFeed()
+
+
+# -------------------------------------------------
+# API
+# -------------------------------------------------
+router = APIRouter(prefix="/live", tags=["Live"])
+
+
+@router.get("/stats")
+async def live_stats():
+    return live_feed.stats()
+
+
+@router.get("/stream")
+async def live_stream(request: Request, symbols: str):
+    """Server-Sent Events: one `data:` line per snapshot, comment heartbeats."""
+    subscriber = live_feed.connect()
+    try:
+        live_feed.subscribe(subscriber, symbols.split(","))
+    except ValueError as e:
+        live_feed.disconnect(subscriber)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                messages = await subscriber.next(timeout=LIVE_HEARTBEAT)
+                if not messages:
+                    yield ": keep-alive\n\n"
+                for message in messages:
+                    yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+        finally:
+            live_feed.disconnect(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def live_ws(websocket: WebSocket):
+    await websocket.accept()
+    subscriber = live_feed.connect()
+
+    async def send_updates():
+        while True:
+            messages = await subscriber.next(timeout=LIVE_HEARTBEAT)
+            for message in messages or [{"type": "heartbeat"}]:
+                await asyncio.wait_for(websocket.send_json(message), LIVE_SEND_TIMEOUT)
+
+    sender = asyncio.create_task(send_updates())
+    try:
+        while True:
+            receive = asyncio.create_task(websocket.receive_text())
+            done, _ = await asyncio.wait({receive, sender}, return_when=asyncio.FIRST_COMPLETED)
+            if sender in done:
+                receive.cancel()
+                sender.result()  # surfaces the send timeout / disconnect
+
+            try:
+                command = json.loads(receive.result())
+                action = command.get("action") if isinstance(command, dict) else None
+                if action not in ("subscribe", "unsubscribe"):
+                    raise ValueError(f"Unknown action: {action}")
+                symbols = command.get("symbols", [])
+                if not isinstance(symbols, list) or not all(isinstance(s, str) for s in symbols):
+                    raise ValueError("'symbols' must be a list of strings")
+                if action == "subscribe":
+                    live_feed.subscribe(subscriber, symbols)
+                else:
+                    live_feed.unsubscribe(subscriber, symbols)
+            except ValueError as e:
+                subscriber.offer("_error", {"type": "error", "error": str(e)})
+                continue
+            subscriber.offer("_subscriptions", {
+                "type": "subscriptions", "symbols": sorted(subscriber.symbols),
+            })
+    except asyncio.TimeoutError:
+        logger.warning("[LIVE] Closing slow WebSocket consumer")
+        await websocket.close(code=1013)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        sender.cancel()
+        live_feed.disconnect(subscriber)
@@ -0,0 +1,303 @@
+# backend/loadtest.py
+"""
+Load generator for backend.main:app.
+
+By default the app is started in-process on a local port with offline
+stand-ins for yfinance and NewsAPI, then driven with an open-loop request
+schedule at a fixed target rate:
+
+    python -m backend.loadtest --rate 20 --duration 60 \\
+        --mix indicators=5,trade-signal=3,backtest=1,predict=1,paper-trade=1
+
+Latencies are measured from each request's scheduled start time, so
+queueing inside the load generator counts against the server (no
+coordinated omission). Use --url to target an already running server;
+RSS is then sampled through /admin/diagnostics/memory when --admin-token
+is given.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from backend.data_providers import SyntheticProvider, DelayedProvider, set_provider
+
+DEFAULT_MIX = "indicators=5,trade-signal=3,backtest=1,predict=1,paper-trade=1"
+DEFAULT_SYMBOLS = "AAPL"
+
+
+# -------------------------------------------------
+# Offline stand-ins for upstream services
+# -------------------------------------------------
+def make_offline_news(headlines: int = 0, latency: float = 0.0):
+    """
+    Canned headlines instead of NewsAPI. With headlines=0 no articles are
+    returned, so FinBERT is not exercised.
+    """
+    def fetch_company_news(company, days=5, page_size=20):
+        if latency:
+            time.sleep(latency)
+        return [
+            f"{company} shares move after analyst update {i}. "
+            f"Investors weigh guidance for the coming quarter."
+            for i in range(min(headlines, page_size))
+        ]
+    return fetch_company_news
+
+
+def install_offline_standins(upstream_latency: float = 0.0, headlines: int = 0):
+    """Serve market data from the synthetic provider and news from canned headlines."""
+    import backend.main as main
+
+    provider = SyntheticProvider()
+    if upstream_latency:
+        provider = DelayedProvider(provider, upstream_latency)
+    set_provider(provider)
+    main.fetch_company_news = make_offline_news(headlines, upstream_latency)
+    return main.app
+
+
+def start_local_server(app, port: int):
+    import uvicorn
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 30
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("Local server did not start")
+        time.sleep(0.05)
+    return server, thread
+
+
+# -------------------------------------------------
+# Request mix
+# -------------------------------------------------
+def build_request(endpoint: str, symbol: str):
+    if endpoint == "predict":
+        return "POST", "/predict", {"symbol": symbol}
+    if endpoint == "backtest":
+        return "GET", f"/backtest/{symbol}", None
+    if endpoint == "indicators":
+        return "GET", f"/indicators/{symbol}", None
+    if endpoint == "trade-signal":
+        return "POST", "/trade-signal", {"symbol": symbol}
+    if endpoint == "paper-trade":
+        return "POST", "/paper-trade", {"symbol": symbol, "days": 5}
+    if endpoint == "history":
+        return "GET", f"/history/{symbol}", None
+    if endpoint == "risk":
+        return "GET", f"/risk/{symbol}", None
+    raise ValueError(f"Unknown endpoint in mix: {endpoint}")
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        build_request(name.strip(), "X")  # validate name
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+# -------------------------------------------------
+# Load generation
+# -------------------------------------------------
+def _rss_sampler(stop, samples, url, admin_token, interval=1.0):
+    from backend.diagnostics import rss_bytes
+
+    start = time.perf_counter()
+    session = requests.Session()
+    while not stop.wait(interval):
+        rss = None
+        if url is None:
+            rss = rss_bytes()
+        elif admin_token:
+            try:
+                r = session.get(
+                    f"{url}/admin/diagnostics/memory",
+                    params={"trace": "false", "top": 0},
+                    headers={"X-Admin-Token": admin_token},
+                    timeout=5,
+                )
+                rss = r.json().get("rss_bytes")
+            except Exception:
+                pass
+        samples.append({"t": round(time.perf_counter() - start, 2), "rss_bytes": rss})
+
+
+def run_load(base_url, weights, symbols, rate, duration, concurrency,
+             seed=0, timeout=120.0, sample_rss=None, admin_token=None):
+    rng = np.random.default_rng(seed)
+    names = list(weights)
+    probs = np.array([weights[n] for n in names], dtype=float)
+    probs /= probs.sum()
+
+    n_requests = max(1, int(rate * duration))
+    plan = [
+        (i / rate, names[e], symbols[s])
+        for i, (e, s) in enumerate(zip(
+            rng.choice(len(names), n_requests, p=probs),
+            rng.integers(0, len(symbols), n_requests),
+        ))
+    ]
+
+    local = threading.local()
+    results = []
+    results_lock = threading.Lock()
+
+    def fire(scheduled, endpoint, symbol):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        method, path, body = build_request(endpoint, symbol)
+        status, error = None, None
+        try:
+            resp = session.request(method, base_url + path, json=body, timeout=timeout)
+            status = resp.status_code
+        except Exception as e:
+            error = type(e).__name__
+        latency = time.perf_counter() - scheduled
+        with results_lock:
+            results.append({
+                "endpoint": endpoint,
+                "latency": latency,
+                "status": status,
+                "ok": error is None and status is not None and status < 400,
+            })
+
+    stop = threading.Event()
+    rss_samples = []
+    sampler = threading.Thread(
+        target=_rss_sampler,
+        args=(stop, rss_samples, sample_rss, admin_token),
+        daemon=True,
+    )
+    sampler.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for offset, endpoint, symbol in plan:
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, scheduled, endpoint, symbol)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    sampler.join()
+    return summarize(results, elapsed, rate, rss_samples)
+
+
+def _latency_stats(latencies) -> dict:
+    if not latencies:
+        return {}
+    arr = np.array(latencies) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(arr, 50)), 2),
+        "p95_ms": round(float(np.percentile(arr, 95)), 2),
+        "p99_ms": round(float(np.percentile(arr, 99)), 2),
+        "max_ms": round(float(arr.max()), 2),
+    }
+
+
+def summarize(results, elapsed, target_rate, rss_samples) -> dict:
+    by_endpoint = defaultdict(list)
+    for r in results:
+        by_endpoint[r["endpoint"]].append(r)
+
+    def block(rows):
+        errors = sum(1 for r in rows if not r["ok"])
+        return {
+            "requests": len(rows),
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+            **_latency_stats([r["latency"] for r in rows]),
+        }
+
+    return {
+        "target_rate": target_rate,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "overall": block(results),
+        "endpoints": {name: block(rows) for name, rows in sorted(by_endpoint.items())},
+        "rss": rss_samples,
+    }
+
+
+def _print_report(report: dict):
+    print(f"throughput: {report['throughput_rps']} req/s "
+          f"(target {report['target_rate']}) over {report['elapsed_s']} s")
+    rows = [("overall", report["overall"])] + list(report["endpoints"].items())
+    for name, s in rows:
+        print(f"{name:14s} n={s['requests']:6d} err={s['error_rate']:.2%} "
+              f"p50={s.get('p50_ms', 0):9.1f}ms p95={s.get('p95_ms', 0):9.1f}ms "
+              f"p99={s.get('p99_ms', 0):9.1f}ms")
+    rss = [s["rss_bytes"] for s in report["rss"] if s["rss_bytes"]]
+    if rss:
+        print(f"rss: start {rss[0] / 2**20:.0f} MiB, peak {max(rss) / 2**20:.0f} MiB, "
+              f"end {rss[-1] / 2**20:.0f} MiB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test backend.main:app")
+    parser.add_argument("--url", help="target a running server instead of an in-process one")
+    parser.add_argument("--port", type=int, default=8765, help="port for the in-process server")
+    parser.add_argument("--rate", type=float, default=10.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=64, help="max in-flight requests")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint=weight,...")
+    parser.add_argument("--symbols", default=DEFAULT_SYMBOLS, help="comma separated symbols")
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0,
+                        help="simulated latency of the market data / news stand-ins")
+    parser.add_argument("--headlines", type=int, default=0,
+                        help="stand-in news articles per call (>0 exercises FinBERT)")
+    parser.add_argument("--admin-token", default=os.getenv("ADMIN_TOKEN"),
+                        help="used to sample RSS from a remote server")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    weights = parse_mix(args.mix)
+    symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
+
+    server = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+        sample_rss = base_url
+    else:
+        app = install_offline_standins(args.upstream_latency_ms / 1000, args.headlines)
+        server, _ = start_local_server(app, args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+        sample_rss = None
+
+    try:
+        report = run_load(
+            base_url, weights, symbols, args.rate, args.duration,
+            args.concurrency, seed=args.seed,
+            sample_rss=sample_rss, admin_token=args.admin_token,
+        )
+    finally:
+        if server is not None:
+            server.should_exit = True
+
+    _print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,63 +1,272 @@
 import numpy as np
 import joblib
+import json
 import os
+from datetime import datetime, timezone
 from tensorflow.keras.models import Sequential, load_model
 from tensorflow.keras.layers import LSTM, Dense, Input
 from sklearn.preprocessing import MinMaxScaler
 
+from backend.diagnostics import track_model
+from backend.artifacts import atomic_path, atomic_paths, get_meta_path
+from backend.numpy_runtime import export_model, get_runtime_path, sliding_windows
+from backend.data_pipeline import (
+    STREAMING_MIN_SAMPLES,
+    compute_returns,
+    fit_scaler_chunked,
+    n_windows,
+    transform_chunked,
+    window_dataset,
+)
+
+# Artifact format version, stored in the metadata sidecar next to the model.
+#   1: single-output model, no metadata file
+#   2: multi-horizon head (Dense(horizon)) + metadata
+ARTIFACT_VERSION = 2
+
+# Refresh extends the scaler once new bars leave its fitted range by more
+# than this fraction of the range (see LSTMPredictor.refresh)
+SCALER_DRIFT_TOLERANCE = float(os.getenv("LSTM_SCALER_DRIFT_TOLERANCE", "0.05"))
+
 
 class LSTMPredictor:
-    def __init__(self, lookback: int = 60):
+    runtime = "keras"
+
+    def __init__(self, lookback: int = 60, horizon: int = 1):
         self.lookback = lookback
+        self.horizon = horizon
         self.model = None
         self.scaler = MinMaxScaler()
+        self.metadata = {}
 
     def _build_model(self, n_features: int):
         model = Sequential([
             Input(shape=(self.lookback, n_features)),
             LSTM(64, return_sequences=False),
-            Dense(1)  # predict return
+            Dense(self.horizon)  # predict returns for steps 1..horizon
         ])
         model.compile(optimizer="adam", loss="mse")
         return model
 
-    def train(self, X: np.ndarray, prices: np.ndarray):
-        # ----- compute returns -----
-        returns = (prices[1:] - prices[:-1]) / prices[:-1]
+    def _sequences(self, X_scaled: np.ndarray, returns: np.ndarray, first: int = 0):
+        # target i is the path of the next `horizon` returns
+        X_seq, y_seq = [], []
+        for i in range(max(self.lookback, first), len(X_scaled) - self.horizon + 1):
+            X_seq.append(X_scaled[i - self.lookback:i])
+            y_seq.append(returns[i:i + self.horizon])
+
+        return np.array(X_seq), np.array(y_seq)
+
+    def _use_streaming(self, n_rows: int, first: int, streaming) -> bool:
+        if streaming is None:
+            return n_windows(n_rows, self.lookback, self.horizon, first) >= STREAMING_MIN_SAMPLES
+        return streaming
+
+    def _fit(self, X_scaled, returns, epochs: int, first: int = 0, streaming=None) -> int:
+        """
+        Fit on every window whose target starts at `first` or later. Long
+        histories stream windows through tf.data instead of materializing
+        them (see backend.data_pipeline). Returns the number of samples.
+        """
+        if (self._use_streaming(len(X_scaled), first, streaming)
+                and n_windows(len(X_scaled), self.lookback, self.horizon, first)):
+            dataset, n = window_dataset(X_scaled, returns, self.lookback, self.horizon, first)
+            if self.model is None:
+                self.model = self._build_model(X_scaled.shape[1])
+            # window_dataset already shuffles; Keras warns if asked to again
+            self.model.fit(dataset, epochs=epochs, shuffle=False, verbose=0)
+            return n
 
+        X_seq, y_seq = self._sequences(X_scaled, returns, first)
+        if len(X_seq) == 0:
+            if self.model is None:
+                raise ValueError(
+                    f"Not enough history to train lookback={self.lookback}, horizon={self.horizon}"
+                )
+            return 0
+
+        if self.model is None:
+            self.model = self._build_model(X_seq.shape[2])
+        self.model.fit(X_seq, y_seq, epochs=epochs, batch_size=32, verbose=0)
+        return int(len(X_seq))
+
+    def train(self, X: np.ndarray, prices: np.ndarray, epochs: int = 10, streaming=None,
+              last_bar: str | None = None):
+        """
+        `X` and `prices` may be memory-mapped. `streaming` forces the
+        streaming (True) or in-memory (False) input path; by default long
+        histories stream. `last_bar` is the timestamp of the newest bar in
+        `X`, used as the cursor for later incremental refreshes.
+        """
+        self.model = None
         X = X[:-1]  # align with returns
 
-        # ----- scale features -----
-        X_scaled = self.scaler.fit_transform(X)
+        # ----- compute returns / scale features -----
+        if self._use_streaming(len(X), 0, streaming):
+            returns = compute_returns(prices)
+            fit_scaler_chunked(self.scaler, X)
+            X_scaled = transform_chunked(self.scaler, X)
+            streaming = True
+        else:
+            returns = (prices[1:] - prices[:-1]) / prices[:-1]
+            X_scaled = self.scaler.fit_transform(X)
+            streaming = False
 
-        # ----- create sequences -----
-        X_seq, y_seq = [], []
-        for i in range(self.lookback, len(X_scaled)):
-            X_seq.append(X_scaled[i - self.lookback:i])
-            y_seq.append(returns[i])
+        n_samples = self._fit(X_scaled, returns, epochs, streaming=streaming)
+        self.metadata = {
+            "version": ARTIFACT_VERSION,
+            "lookback": self.lookback,
+            "horizon": self.horizon,
+            "n_features": int(X_scaled.shape[1]),
+            "trained_at": datetime.now(timezone.utc).isoformat(),
+            "n_samples": int(n_samples),
+            "last_bar": last_bar,
+        }
+        track_model("lstm", self.model)
 
-        X_seq = np.array(X_seq)
-        y_seq = np.array(y_seq)
+    def fine_tune(self, X: np.ndarray, prices: np.ndarray, start: int = 0, epochs: int = 2,
+                  streaming=None) -> int:
+        """
+        Continue training the current weights on the samples whose target
+        starts at index `start` or later. The fitted scaler is reused so the
+        input scale the model has learned stays unchanged.
 
-        self.model = self._build_model(X_seq.shape[2])
-        self.model.fit(X_seq, y_seq, epochs=10, batch_size=32, verbose=0)
+        Returns the number of samples used.
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded")
 
-    def predict_return(self, X: np.ndarray) -> float:
+        X = X[:-1]
+        if self._use_streaming(len(X), start, streaming):
+            returns = compute_returns(prices)
+            X_scaled = transform_chunked(self.scaler, X)
+            streaming = True
+        else:
+            returns = (prices[1:] - prices[:-1]) / prices[:-1]
+            X_scaled = self.scaler.transform(X)
+            streaming = False
+
+        n_samples = self._fit(X_scaled, returns, epochs, first=start, streaming=streaming)
+        if n_samples:
+            self.metadata["trained_at"] = datetime.now(timezone.utc).isoformat()
+        return n_samples
+
+    def scaler_drift(self, X_new: np.ndarray) -> float:
+        """How far `X_new` leaves the fitted scaler range, as a fraction of that range."""
+        data_range = np.where(self.scaler.data_range_ > 0, self.scaler.data_range_, 1.0)
+        below = (self.scaler.data_min_ - X_new.min(axis=0)) / data_range
+        above = (X_new.max(axis=0) - self.scaler.data_max_) / data_range
+        return float(max(0.0, below.max(), above.max()))
+
+    def refresh(self, X: np.ndarray, prices: np.ndarray, first_new: int, epochs: int = 2,
+                replay: int = 32, scaler_policy: str = "auto", last_bar: str | None = None) -> dict:
+        """
+        Warm-start update for bars appended since the last training run.
+
+        `first_new` is the index of the first new bar in `X`/`prices`. Only
+        samples whose target path touches a new bar (plus `replay` older
+        samples, against forgetting) are trained on, and only the rows they
+        need are transformed, so the cost scales with the new data.
+
+        scaler_policy:
+            "keep"   – reuse the fitted scaler as is
+            "extend" – widen its range to cover the new bars
+            "auto"   – extend only when the new bars drift further than
+                       SCALER_DRIFT_TOLERANCE outside the fitted range
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded")
+        if scaler_policy not in ("keep", "extend", "auto"):
+            raise ValueError(f"Unknown scaler policy: {scaler_policy}")
+
+        X_new = X[first_new:]
+        drift = self.scaler_drift(X_new) if len(X_new) else 0.0
+        extend = len(X_new) > 0 and (
+            scaler_policy == "extend"
+            or (scaler_policy == "auto" and drift > SCALER_DRIFT_TOLERANCE)
+        )
+        if extend:
+            self.scaler.partial_fit(X_new)
+
+        # Sample i targets returns[i:i + horizon]; the first one involving
+        # bar `first_new` is i = first_new - horizon
+        first = max(0, first_new - self.horizon - replay)
+        offset = max(0, first - self.lookback)
+        n_samples = self.fine_tune(X[offset:], prices[offset:], start=first - offset, epochs=epochs)
+
+        if last_bar is not None:
+            self.metadata["last_bar"] = last_bar
+        return {
+            "new_bars": int(len(X_new)),
+            "n_samples": n_samples,
+            "scaler_drift": round(drift, 4),
+            "scaler_extended": bool(extend),
+        }
+
+    def predict_returns(self, X: np.ndarray) -> np.ndarray:
+        """Predicted returns for steps 1..horizon in a single forward pass."""
         if self.model is None or self.scaler is None:
             raise ValueError("Model or scaler not loaded")
 
         X_scaled = self.scaler.transform(X)
         seq = X_scaled[-self.lookback:].reshape(1, self.lookback, -1)
 
-        return float(self.model.predict(seq, verbose=0)[0][0])
+        return np.asarray(self.model.predict(seq, verbose=0)[0], dtype=float)
+
+    def predict_return(self, X: np.ndarray) -> float:
+        return float(self.predict_returns(X)[0])
+
+    def predict_windows(self, windows: np.ndarray) -> np.ndarray:
+        """Predicted return paths for raw feature windows shaped (n, lookback, n_features)."""
+        if self.model is None or self.scaler is None:
+            raise ValueError("Model or scaler not loaded")
+
+        n_features = windows.shape[-1]
+        scaled = self.scaler.transform(windows.reshape(-1, n_features)).reshape(windows.shape)
+        return np.asarray(self.model.predict(scaled, batch_size=256, verbose=0), dtype=float)
+
+    def predict_returns_batch(self, X: np.ndarray, ends) -> np.ndarray:
+        """Predicted return paths for the windows ending before each index in `ends`."""
+        if self.model is None or self.scaler is None:
+            raise ValueError("Model or scaler not loaded")
+
+        windows = sliding_windows(self.scaler.transform(X), ends, self.lookback)
+        return np.asarray(self.model.predict(windows, batch_size=256, verbose=0), dtype=float)
 
     def save(self, model_path: str, scaler_path: str):
-        os.makedirs(os.path.dirname(model_path), exist_ok=True)
-        os.makedirs(os.path.dirname(scaler_path), exist_ok=True)
+        # Model and scaler are staged to temp files and renamed into place
+        # together; metadata goes last so it never describes a model not yet
+        # on disk
+        with atomic_paths(model_path, scaler_path) as (model_tmp, scaler_tmp):
+            self.model.save(model_tmp)
+            joblib.dump(self.scaler, scaler_tmp)
+        self.export_numpy(model_path, scaler_path)
+        with atomic_path(get_meta_path(model_path)) as tmp:
+            with open(tmp, "w") as f:
+                json.dump(self.metadata, f, indent=2)
 
-        self.model.save(model_path)
-        joblib.dump(self.scaler, scaler_path)
+    def export_numpy(self, model_path: str, scaler_path: str) -> str:
+        """Write the TensorFlow-free inference export (see backend.numpy_runtime)."""
+        return export_model(
+            self.model,
+            get_runtime_path(model_path),
+            sources=[model_path, scaler_path],
+            scaler=self.scaler,
+            metadata=self.metadata,
+        )
 
     def load(self, model_path: str, scaler_path: str):
         self.model = load_model(model_path)
         self.scaler = joblib.load(scaler_path)
+
+        meta_path = get_meta_path(model_path)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.metadata = json.load(f)
+        else:
+            # Version 1 artifacts: single-output model without metadata
+            self.metadata = {"version": 1}
+
+        self.lookback = int(self.model.input_shape[1])
+        self.horizon = int(self.model.output_shape[-1])
+        track_model("lstm", self.model)
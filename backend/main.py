@@ -15,12 +15,14 @@ from typing import List, Dict, Any, Optional
 import logging
 
 # External dependencies
+import time
+import asyncio
 import numpy as np
 import threading
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
-from scipy.optimize import minimize
 
 # ============================================================================
 # Logging Configuration
@@ -35,6 +37,26 @@ logger = logging.getLogger(__name__)
 print(f"[INIT] Starting backend.main module initialization...")
 logger.info("[INIT] FastAPI module loading...")
 
+# Metrics are dependency-free and must always be available
+from backend.metrics import (
+    span,
+    start_request_timings,
+    server_timing_header,
+    render_prometheus,
+    REQUEST_LATENCY,
+    REQUESTS_TOTAL,
+    IN_FLIGHT,
+)
+from backend.admin import ADMIN_TOKEN, is_admin_token, router as admin_router
+from backend.profiling import profiled, requested_mode
+from backend.diagnostics import register_cache
+from backend.batching import get_batcher, stacked
+from backend.downsampling import downsample_indices, get_resolution_cache
+from backend.paper_sessions import router as paper_sessions_router
+from backend.live_feed import live_feed, router as live_router
+from backend.screener import router as screener_router
+from backend.expressions import router as expressions_router
+
 # Internal imports (ABSOLUTE, PACKAGE-SAFE)
 try:
     logger.info("[INIT] Importing schemas...")
@@ -42,17 +64,29 @@ try:
         PredictionRequest,
         PredictionResponse,
         PortfolioRequest,
+        MonteCarloRequest,
     )
     logger.info("[INIT] ✅ Schemas imported")
     
     logger.info("[INIT] Importing stock_data...")
-    from backend.stock_data import fetch_stock_data
+    from backend.stock_data import fetch_stock_data, rows_since
     logger.info("[INIT] ✅ stock_data imported")
     
     logger.info("[INIT] Importing features...")
-    from backend.features import create_features
+    from backend.features import FEATURE_COLS
+    from backend.feature_store import load_features
     logger.info("[INIT] ✅ features imported")
     
+    from backend.risk import (
+        simple_returns,
+        risk_metrics as compute_risk_metrics,
+        min_variance_weights,
+        portfolio_stats,
+    )
+    from backend.montecarlo import monte_carlo_risk
+    from backend.covariance import get_covariance_service
+    from backend.backtesting import run_backtest, strategy_signals
+    
     logger.info("[INIT] Importing news_fetcher...")
     from backend.news_fetcher import fetch_company_news
     logger.info("[INIT] ✅ news_fetcher imported")
@@ -78,7 +112,7 @@ except ImportError as e:
     print(f"[INIT-ERROR] Import error: {e}")
     # Continue execution even if some imports fail
     fetch_stock_data = None
-    create_features = None
+    load_features = None
     fetch_company_news = None
     sentiment_score = None
     run_paper_trading = None
@@ -87,7 +121,7 @@ except Exception as e:
     print(f"[INIT-ERROR] Unexpected error: {e}")
     # Still continue
     fetch_stock_data = None
-    create_features = None
+    load_features = None
     fetch_company_news = None
     sentiment_score = None
     run_paper_trading = None
@@ -121,6 +155,57 @@ try:
 except Exception as e:
     logger.error(f"[INIT] ❌ Failed to setup CORS: {e}")
 
+# Request metrics middleware
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    """Record per-endpoint latency and expose stage timings via Server-Timing"""
+    timings = start_request_timings()
+    IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        IN_FLIGHT.dec()
+        # Use the route template so per-symbol paths share one series
+        route = request.scope.get("route")
+        endpoint = getattr(route, "path", "unmatched")
+        REQUEST_LATENCY.observe(elapsed, endpoint=endpoint, method=request.method)
+        REQUESTS_TOTAL.inc(endpoint=endpoint, method=request.method, status=status)
+    response.headers["Server-Timing"] = server_timing_header(timings, elapsed)
+    return response
+
+# On-demand profiling: only installed when an admin token is configured,
+# so the default deployment pays nothing for it
+if ADMIN_TOKEN:
+    @app.middleware("http")
+    async def profiling_middleware(request: Request, call_next):
+        """Profile a request when an admin asks for it via X-Profile / ?profile="""
+        mode = requested_mode(
+            request.headers.get("x-profile", request.query_params.get("profile"))
+        )
+        if mode is None or not is_admin_token(request.headers.get("x-admin-token")):
+            return await call_next(request)
+
+        with profiled(mode) as profile_id:
+            response = await call_next(request)
+
+        if profile_id is None:
+            response.headers["X-Profile-Status"] = "busy"
+        else:
+            response.headers["X-Profile-Id"] = profile_id
+            logger.info(f"[PROFILE] Saved {mode} profile {profile_id} for {request.url.path}")
+        return response
+    logger.info("[INIT] ✅ Profiling middleware enabled")
+
+app.include_router(admin_router)
+app.include_router(paper_sessions_router)
+app.include_router(live_router)
+app.include_router(screener_router)
+app.include_router(expressions_router)
+
 # ============================================================================
 # Pydantic Models
 # ============================================================================
@@ -156,6 +241,7 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("🛑 FastAPI application shutting down...")
+    await live_feed.shutdown()
 
 # ============================================================================
 # Router Registration
@@ -176,13 +262,18 @@ logger.info("[INIT] Router registration deferred to startup event")
 # Project root
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RL_TRADERS = {}  # Cache RL agents for performance
+register_cache("rl_traders", RL_TRADERS)
+
+def _fingerprint(df):
+    """Identifies one version of a bar window for the downsampling cache."""
+    return (len(df), str(df["Date"].iloc[0]), str(df["Date"].iloc[-1]), float(df["Close"].iloc[-1]))
 
 # ============================================================================
 # Dependency Check Helper
 # ============================================================================
 def check_dependencies():
     """Check if critical dependencies are available"""
-    if fetch_stock_data is None or create_features is None:
+    if fetch_stock_data is None or load_features is None:
         raise HTTPException(
             status_code=503,
             detail="Required stock analysis dependencies not available. Service initializing..."
@@ -203,15 +294,28 @@ async def root():
             "/predict",
             "/history/{symbol}",
             "/risk/{symbol}",
+            "/risk/{symbol}/montecarlo",
+            "/risk/portfolio/montecarlo",
             "/backtest/{symbol}",
             "/portfolio/optimize",
             "/paper-trade",
             "/indicators/{symbol}",
+            "/screener",
+            "/expressions",
             "/trade-signal",
+            "/metrics",
             "/docs"
         ]
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus exposition of request, stage and cache metrics"""
+    return PlainTextResponse(
+        render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
+
 @app.get("/health", include_in_schema=True)
 @app.head("/health", include_in_schema=False)
 async def health_check():
@@ -224,21 +328,20 @@ async def health_check():
 @app.post("/predict", response_model=PredictionResponse)
 async def predict_stock(req: PredictionRequest):
     """
-    Predict next stock price using LSTM + News Sentiment
+    Predict the stock price path over `horizon` days using LSTM + News Sentiment
     """
     check_dependencies()
     try:
         logger.info(f"Predicting stock: {req.symbol}")
         
         # 1. Fetch stock data
-        df = fetch_stock_data(req.symbol)
+        with span("fetch_stock_data"):
+            df = fetch_stock_data(req.symbol)
         if df is None or df.empty:
             raise ValueError(f"No data available for {req.symbol}")
         
-        df_feat = create_features(df)
-        
-        feature_cols = ["rsi", "ema_20", "ema_50", "volatility"]
-        X = df_feat[feature_cols].values
+        df_feat = load_features(req.symbol, df)
+        X = df_feat[FEATURE_COLS].values
         y = df_feat["Close"].values
 
         lookback = 60
@@ -261,20 +364,31 @@ async def predict_stock(req: PredictionRequest):
                 logger.error(f"Model registry unavailable: {e}")
                 raise HTTPException(status_code=503, detail="Model registry unavailable")
 
-        predictor, needs_training = load_or_create_lstm(req.symbol)
+        predictor, needs_training = load_or_create_lstm(req.symbol, req.horizon)
 
         if needs_training:
             logger.info(f"Training LSTM model for {req.symbol}...")
-            predictor.train(X, y)
-            predictor.save(
-                model_path=get_model_path(req.symbol),
-                scaler_path=get_scaler_path(req.symbol),
-            )
+            with span("lstm_train"):
+                predictor.train(X, y, last_bar=str(df_feat["Date"].iloc[-1]))
+                predictor.save(
+                    model_path=get_model_path(req.symbol),
+                    scaler_path=get_scaler_path(req.symbol),
+                )
             logger.info(f"✅ Model saved for {req.symbol}")
 
-        # 3. Predict next price
-        predicted_return = predictor.predict_return(X)
-        predicted_price = float(y[-1] * (1 + predicted_return))
+        # 3. Predict the price path for steps 1..horizon (one forward pass)
+        # Concurrent requests for the same model share one forward pass
+        batch_key = (
+            req.symbol, predictor.runtime, predictor.horizon,
+            predictor.metadata.get("trained_at"),
+        )
+        with span("lstm_inference"):
+            predicted_returns = await get_batcher("lstm").run(
+                batch_key, stacked(predictor.predict_windows), X[-predictor.lookback:]
+            )
+        predicted_returns = predicted_returns[:req.horizon]
+        predicted_path = y[-1] * np.cumprod(1 + predicted_returns)
+        predicted_price = float(predicted_path[-1])
 
         # 4. News sentiment (safe fallback, lazy import)
         sent_score = 0.0
@@ -285,14 +399,16 @@ async def predict_stock(req: PredictionRequest):
                 global sentiment_score
                 if sentiment_score is None:
                     try:
-                        from backend.sentiment import sentiment_score as _sent
+                        with span("sentiment_import"):
+                            from backend.sentiment import sentiment_score as _sent
                         sentiment_score = _sent
                         logger.info("Sentiment module loaded at runtime")
                     except Exception as e:
                         logger.warning(f"Sentiment module unavailable: {e}")
                         sentiment_score = lambda x: 0.0
                 
-                sent_score = sentiment_score(news)
+                # Off the event loop so concurrent requests can batch
+                sent_score = await asyncio.to_thread(sentiment_score, news)
         except Exception as e:
             logger.warning(f"Could not fetch sentiment for {req.symbol}: {e}")
             sent_score = 0.0
@@ -312,7 +428,11 @@ async def predict_stock(req: PredictionRequest):
                 f"LSTM + News Sentiment | "
                 f"Sentiment: {sentiment_label} "
                 f"(score={sent_score:.2f})"
-            )
+            ),
+            horizon=req.horizon,
+            predicted_path=[round(float(p), 2) for p in predicted_path],
+            predicted_returns=[round(float(r), 6) for r in predicted_returns],
+            model_version=predictor.metadata.get("version"),
         )
 
     except Exception as e:
@@ -323,24 +443,55 @@ async def predict_stock(req: PredictionRequest):
 # Price History Endpoint
 # ============================================================================
 @app.get("/history/{symbol}")
-async def get_price_history(symbol: str, limit: int = 60):
-    """Get historical price data for a stock"""
+async def get_price_history(
+    symbol: str,
+    limit: int = 60,
+    since: Optional[str] = None,
+    max_points: Optional[int] = None,
+    downsample: str = "lttb",
+    period: str = "6mo",
+    interval: str = "1d",
+):
+    """
+    Get historical price data for a stock.
+
+    Pass the `cursor` from a previous response as `since` to receive only
+    the bars added after it. With `max_points`, the returned bars (the last
+    `limit`, or those after `since`) are reduced server-side to at most that
+    many (downsample: lttb | minmax).
+    """
     check_dependencies()
     try:
         logger.info(f"Fetching history for {symbol}")
-        df = fetch_stock_data(symbol, period="6mo")
+        with span("fetch_stock_data"):
+            df = fetch_stock_data(symbol, period=period, interval=interval)
         
         if df is None or df.empty:
-            return {"symbol": symbol, "history": []}
+            return {"symbol": symbol, "history": [], "cursor": since}
+
+        window = df.tail(limit)
+        # The cursor applies to the raw bars; only what is returned is reduced
+        new_rows = rows_since(window, since)
+        if max_points is not None and len(new_rows) > max_points:
+            with span("downsample"):
+                if len(new_rows) == len(window):
+                    idx = get_resolution_cache("history").indices(
+                        (symbol, period, interval, limit), _fingerprint(window),
+                        window["Close"].values, max_points, downsample,
+                    )
+                else:
+                    idx = downsample_indices(new_rows["Close"].values, max_points, downsample)
+            new_rows = new_rows.iloc[idx]
 
         history = [
-            {"date": str(row["Date"]), "price": float(row["Close"])}
-            for _, row in df.tail(limit).iterrows()
+            {"date": str(d), "price": float(p)}
+            for d, p in zip(new_rows["Date"], new_rows["Close"])
         ]
 
         return {
             "symbol": symbol,
-            "history": history
+            "history": history,
+            "cursor": str(window["Date"].iloc[-1]) if len(window) else since,
         }
     except Exception as e:
         logger.error(f"History fetch error for {symbol}: {str(e)}")
@@ -357,34 +508,24 @@ async def risk_metrics(symbol: str, window: int = 252):
     check_dependencies()
     try:
         logger.info(f"Calculating risk metrics for {symbol}")
-        df = fetch_stock_data(symbol)
+        with span("fetch_stock_data"):
+            df = fetch_stock_data(symbol)
         
         if df is None or df.empty:
             raise ValueError(f"No data available for {symbol}")
 
-        prices = df["Close"].values
-        returns = np.diff(prices) / prices[:-1]
+        returns = simple_returns(df["Close"].values)
 
         if len(returns) < 30:
             raise HTTPException(status_code=400, detail="Not enough data for risk metrics")
 
-        # --- Volatility (annualized) ---
-        volatility = float(np.std(returns) * np.sqrt(252))
-
-        # --- Max Drawdown ---
-        cumulative = np.cumprod(1 + returns)
-        peak = np.maximum.accumulate(cumulative)
-        drawdown = (cumulative - peak) / peak
-        max_drawdown = float(drawdown.min())
-
-        # --- VaR (95%) ---
-        var_95 = float(np.percentile(returns, 5))
+        metrics = compute_risk_metrics(returns)
 
         return {
             "symbol": symbol,
-            "volatility": round(volatility, 4),
-            "max_drawdown": round(max_drawdown, 4),
-            "var_95": round(var_95, 4)
+            "volatility": round(metrics["volatility"], 4),
+            "max_drawdown": round(metrics["max_drawdown"], 4),
+            "var_95": round(metrics["var_95"], 4)
         }
     except HTTPException:
         raise
@@ -392,69 +533,162 @@ async def risk_metrics(symbol: str, window: int = 252):
         logger.error(f"Risk metrics error for {symbol}: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
+def _parse_list(text: str, cast):
+    return [cast(v) for v in text.split(",") if v.strip()]
+
+@app.get("/risk/{symbol}/montecarlo")
+async def monte_carlo_risk_metrics(
+    symbol: str,
+    method: str = "gbm",
+    n_paths: int = 10000,
+    horizons: str = "1,5,21",
+    confidence: str = "0.95,0.99",
+    block_size: int = 5,
+    seed: Optional[int] = None,
+    window: int = 504,
+    initial_value: float = 100000,
+):
+    """
+    Simulated VaR/CVaR and terminal-value distribution per horizon.
+
+    method: gbm | bootstrap | block_bootstrap, fitted on the last `window`
+    daily returns. horizons (days) and confidence are comma separated.
+    """
+    check_dependencies()
+    try:
+        with span("fetch_stock_data"):
+            df = fetch_stock_data(symbol, period="5y")
+        if df is None or df.empty:
+            raise ValueError(f"No data available for {symbol}")
+
+        returns = simple_returns(df["Close"].values)[-window:]
+        with span("monte_carlo"):
+            result = await asyncio.to_thread(
+                monte_carlo_risk, returns,
+                horizons=_parse_list(horizons, int),
+                confidences=_parse_list(confidence, float),
+                n_paths=n_paths, method=method, block_size=block_size,
+                seed=seed, initial_value=initial_value,
+            )
+        return {"symbol": symbol, "n_returns": len(returns), **result}
+    except Exception as e:
+        logger.error(f"Monte Carlo risk error for {symbol}: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/risk/portfolio/montecarlo")
+async def monte_carlo_portfolio_risk(req: MonteCarloRequest):
+    """
+    Monte Carlo VaR/CVaR of a daily-rebalanced portfolio. Assets are
+    resampled jointly on their shared trading dates.
+    """
+    check_dependencies()
+    try:
+        returns = get_covariance_service().returns(req.symbols, req.window)
+        weights = req.weights
+        if weights is not None:
+            total = sum(weights)
+            if len(weights) != len(req.symbols) or total == 0:
+                raise ValueError("Provide one weight per symbol with a non-zero sum")
+            weights = [w / total for w in weights]
+
+        with span("monte_carlo"):
+            result = await asyncio.to_thread(
+                monte_carlo_risk, returns.values, weights,
+                horizons=req.horizons, confidences=req.confidence,
+                n_paths=req.n_paths, method=req.method, block_size=req.block_size,
+                seed=req.seed, initial_value=req.initial_value,
+            )
+        return {
+            "symbols": req.symbols,
+            "weights": dict(zip(req.symbols, weights or [1 / len(req.symbols)] * len(req.symbols))),
+            "n_returns": len(returns),
+            **result,
+        }
+    except Exception as e:
+        logger.error(f"Monte Carlo portfolio risk error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
 # ============================================================================
 # Backtesting Endpoint
 # ============================================================================
 @app.get("/backtest/{symbol}")
-async def backtest(symbol: str, capital: float = 100000):
+async def backtest(
+    symbol: str,
+    capital: float = 100000,
+    strategy: str = "lstm",
+    cost_bps: float = 0.0,
+    slippage_bps: float = 0.0,
+    sizing: str = "fixed",
+    leverage: float = 1.0,
+    target_vol: float = 0.15,
+    allow_short: bool = True,
+):
     """
-    Backtest trading strategy on historical data
+    Backtest a strategy on historical data.
+
+    strategy: lstm | rl | rsi | ema_crossover
+    sizing:   fixed (signal * leverage) | vol_target (scaled to target_vol)
+    Costs and slippage are charged in basis points of traded notional.
     """
     check_dependencies()
     try:
-        logger.info(f"Running backtest for {symbol}")
+        logger.info(f"Running {strategy} backtest for {symbol}")
         
-        df = fetch_stock_data(symbol)
+        with span("fetch_stock_data"):
+            df = fetch_stock_data(symbol)
         if df is None or df.empty:
             raise ValueError(f"No data available for {symbol}")
         
-        df_feat = create_features(df)
-
-        prices = df_feat["Close"].values
-        features = df_feat[["rsi", "ema_20", "ema_50", "volatility"]].values
-
-        lookback = 60
-        equity = capital
-        equity_curve = []
-
-        # Lazy import model_registry to avoid heavy startup imports
-        global load_or_create_lstm
-        if load_or_create_lstm is None:
-            try:
-                from backend.model_registry import load_or_create_lstm as _load
-                load_or_create_lstm = _load
-            except Exception as e:
-                logger.error(f"Model registry unavailable for backtest: {e}")
-                raise HTTPException(status_code=503, detail="Model registry unavailable")
-
-        predictor, _ = load_or_create_lstm(symbol)
-
-        for t in range(lookback, len(prices) - 1):
-            X = features[:t]
-            predicted_return = predictor.predict_return(X)
+        df_feat = load_features(symbol, df)
 
-            position = np.sign(predicted_return)
-            daily_ret = (prices[t+1] - prices[t]) / prices[t]
-
-            equity *= (1 + position * daily_ret)
-            equity_curve.append(equity)
-
-        if len(equity_curve) > 1:
-            returns = np.diff(equity_curve) / equity_curve[:-1]
-            sharpe = (
-                (np.mean(returns) / np.std(returns) * np.sqrt(252))
-                if np.std(returns) > 0 else 0.0
+        predictor, agent = None, None
+        if strategy == "lstm":
+            # Lazy import model_registry to avoid heavy startup imports
+            global load_or_create_lstm
+            if load_or_create_lstm is None:
+                try:
+                    from backend.model_registry import load_or_create_lstm as _load
+                    load_or_create_lstm = _load
+                except Exception as e:
+                    logger.error(f"Model registry unavailable for backtest: {e}")
+                    raise HTTPException(status_code=503, detail="Model registry unavailable")
+
+            predictor, _ = load_or_create_lstm(symbol)
+        elif strategy == "rl":
+            from backend.rl_inference import RLTrader
+            agent = RLTrader(symbol).agent
+
+        with span("backtest_loop"):
+            signals = strategy_signals(strategy, df_feat, predictor=predictor, agent=agent)
+            result = run_backtest(
+                df_feat["Close"].values, signals, capital=capital,
+                cost_bps=cost_bps, slippage_bps=slippage_bps, sizing=sizing,
+                leverage=leverage, max_leverage=max(1.0, leverage),
+                allow_short=allow_short, target_vol=target_vol,
+                dates=df_feat["Date"].values,
             )
-        else:
-            sharpe = 0.0
 
+        metrics = {
+            k: round(float(result[k]), 4)
+            for k in ("cagr", "volatility", "sharpe", "sortino", "max_drawdown",
+                      "turnover", "hit_rate", "exposure", "total_costs")
+        }
         return {
             "symbol": symbol,
-            "final_equity": round(float(equity), 2),
-            "total_return": round((equity / capital - 1), 4),
-            "sharpe": round(float(sharpe), 3),
-            "equity_curve": equity_curve[-200:] if equity_curve else []
+            "strategy": strategy,
+            "final_equity": round(float(result["final_equity"]), 2),
+            "total_return": round(result["total_return"], 4),
+            "sharpe": round(float(result["sharpe"]), 3),
+            "equity_curve": result["equity_curve"][-200:],
+            "tearsheet": dict(
+                metrics,
+                n_trades=result["n_trades"],
+                dates=result["dates"][-200:],
+                drawdown=result["drawdown"][-200:],
+            ),
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Backtest error for {symbol}: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -469,7 +703,7 @@ async def optimize_portfolio(req: PortfolioRequest):
     """
     check_dependencies()
     try:
-        symbols = req.symbols
+        symbols = list(dict.fromkeys(req.symbols))
         lookback = req.lookback
 
         if len(symbols) < 2:
@@ -480,42 +714,15 @@ async def optimize_portfolio(req: PortfolioRequest):
 
         logger.info(f"Optimizing portfolio with symbols: {symbols}")
 
-        returns_data = []
-
-        for sym in symbols:
-            df = fetch_stock_data(sym)
-            if df is None or df.empty:
-                raise ValueError(f"No data available for {sym}")
-            
-            prices = df["Close"].values[-lookback:]
-            returns = np.diff(prices) / prices[:-1]
-            returns_data.append(returns)
-
-        returns_matrix = np.column_stack(returns_data)
-        mean_returns = returns_matrix.mean(axis=0)
-        cov_matrix = np.cov(returns_matrix.T)
+        # Date-aligned returns and cached covariance estimates
+        estimate = get_covariance_service().estimate(symbols, lookback, method=req.covariance)
+        mean_returns = estimate["mean"]
+        cov_matrix = estimate["cov"]
 
-        n = len(symbols)
+        with span("portfolio_optimize"):
+            weights = min_variance_weights(cov_matrix)
 
-        def portfolio_volatility(weights):
-            return np.sqrt(weights.T @ cov_matrix @ weights)
-
-        constraints = [{"type": "eq", "fun": lambda w: np.sum(w) - 1}]
-        bounds = [(0, 1)] * n
-        init_weights = np.ones(n) / n
-
-        result = minimize(
-            portfolio_volatility,
-            init_weights,
-            method="SLSQP",
-            bounds=bounds,
-            constraints=constraints,
-        )
-
-        weights = result.x
-
-        expected_return = float(mean_returns @ weights * 252)
-        expected_risk = float(portfolio_volatility(weights) * np.sqrt(252))
+        expected_return, expected_risk = portfolio_stats(weights, mean_returns, cov_matrix)
 
         return {
             "symbols": symbols,
@@ -525,6 +732,14 @@ async def optimize_portfolio(req: PortfolioRequest):
             },
             "expected_return": round(expected_return, 4),
             "expected_risk": round(expected_risk, 4),
+            "covariance": {
+                "method": estimate["method"],
+                "n_obs": estimate["n_obs"],
+                "start": estimate["start"],
+                "end": estimate["end"],
+                "shrinkage": estimate["shrinkage"],
+                "source": estimate["source"],
+            },
         }
     except HTTPException:
         raise
@@ -563,23 +778,35 @@ async def paper_trade(req: PaperTradeRequest):
 # Technical Indicators Endpoint
 # ============================================================================
 @app.get("/indicators/{symbol}")
-async def get_technical_indicators(symbol: str, limit: int = 100):
+async def get_technical_indicators(
+    symbol: str,
+    limit: int = 100,
+    since: Optional[str] = None,
+    max_points: Optional[int] = None,
+    downsample: str = "lttb",
+):
     """
     Returns comprehensive technical indicators:
     - RSI (Relative Strength Index)
     - MACD (Moving Average Convergence Divergence)
     - Bollinger Bands
     - Volume Analysis
+
+    Pass the `cursor` from a previous response as `since` to receive only
+    the points added after it. With `max_points`, the returned rows (all,
+    or those after `since`) are reduced server-side to at most that many, chosen over the price and indicator
+    columns together (downsample: lttb | minmax).
     """
     check_dependencies()
     try:
         logger.info(f"Fetching technical indicators for {symbol}")
         
-        df = fetch_stock_data(symbol, period="1y")
+        with span("fetch_stock_data"):
+            df = fetch_stock_data(symbol, period="1y")
         if df is None or df.empty:
             raise ValueError(f"No data available for {symbol}")
         
-        df_feat = create_features(df)
+        df_feat = load_features(symbol, df, period="1y")
         
         # Limit to latest data
         df_feat = df_feat.tail(limit)
@@ -597,8 +824,27 @@ async def get_technical_indicators(symbol: str, limit: int = 100):
         bb_upper = sma_20 + (std_20 * 2)
         bb_lower = sma_20 - (std_20 * 2)
         
+        # Only serialise points newer than the client's cursor
+        start = len(df_feat) - len(rows_since(df_feat, since))
+        rows = np.arange(start, len(df_feat))
+
+        # The cursor applies to the raw rows; only what is returned is reduced
+        if max_points is not None and len(rows) > max_points:
+            columns = np.column_stack([
+                df_feat["Close"].values, df_feat["rsi"].values, df_feat["ema_20"].values,
+                df_feat["ema_50"].values, macd_line.values, signal_line.values,
+                bb_upper.values, bb_lower.values,
+            ])[start:]
+            with span("downsample"):
+                selected = get_resolution_cache("indicators").indices(
+                    (symbol, limit, since), _fingerprint(df_feat.iloc[start:]),
+                    columns, max_points, downsample,
+                )
+            rows = start + selected
+        
         indicators = []
-        for idx, (_, row) in enumerate(df_feat.iterrows()):
+        for idx in rows:
+            row = df_feat.iloc[idx]
             def safe_float(val):
                 """Safely convert value to float, handling NaN"""
                 try:
@@ -627,7 +873,8 @@ async def get_technical_indicators(symbol: str, limit: int = 100):
         
         return {
             "symbol": symbol,
-            "indicators": indicators
+            "indicators": indicators,
+            "cursor": str(df_feat["Date"].iloc[-1]) if len(df_feat) else since,
         }
     except Exception as e:
         logger.error(f"Technical indicators error for {symbol}: {str(e)}")
@@ -0,0 +1,216 @@
+# backend/metrics.py
+
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+
+# -------------------------------------------------
+# Lightweight in-process metrics (Prometheus text format)
+# -------------------------------------------------
+# Seconds; wide upper range because LSTM auto-training runs inside requests
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+_lock = threading.Lock()
+_metrics = {}
+
+# Per-request list of (stage, seconds) used for the Server-Timing header
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def _label_key(labels: dict):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def _format_labels(key, extra=None):
+    items = list(key) + (list(extra) if extra else [])
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in items)
+    return "{" + body + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str):
+        self.name = name
+        self.doc = doc
+        self.values = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self):
+        return [
+            f"{self.name}{_format_labels(key)} {value}"
+            for key, value in self.values.items()
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with _lock:
+            self.values[_label_key(labels)] = float(value)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.buckets = tuple(buckets)
+        self.values = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with _lock:
+            state = self.values.get(key)
+            if state is None:
+                state = [0] * len(self.buckets) + [0.0, 0]
+                self.values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self):
+        lines = []
+        for key, state in self.values.items():
+            for bound, count in zip(self.buckets, state):
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_format_labels(key, [('le', bound)])} {count}"
+                )
+            lines.append(
+                f"{self.name}_bucket"
+                f"{_format_labels(key, [('le', '+Inf')])} {state[-1]}"
+            )
+            lines.append(f"{self.name}_sum{_format_labels(key)} {state[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {state[-1]}")
+        return lines
+
+
+def _register(metric):
+    with _lock:
+        return _metrics.setdefault(metric.name, metric)
+
+
+def counter(name: str, doc: str) -> Counter:
+    return _register(Counter(name, doc))
+
+
+def gauge(name: str, doc: str) -> Gauge:
+    return _register(Gauge(name, doc))
+
+
+def histogram(name: str, doc: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, doc, buckets))
+
+
+# -------------------------------------------------
+# Standard metrics
+# -------------------------------------------------
+REQUEST_LATENCY = histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by endpoint",
+)
+REQUESTS_TOTAL = counter(
+    "http_requests_total",
+    "HTTP requests by endpoint and status code",
+)
+IN_FLIGHT = gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+)
+STAGE_LATENCY = histogram(
+    "stage_duration_seconds",
+    "Latency of individual pipeline stages",
+)
+CACHE_REQUESTS = counter(
+    "cache_requests_total",
+    "Cache lookups by cache name and result (hit/miss)",
+)
+
+
+# -------------------------------------------------
+# Instrumentation helpers
+# -------------------------------------------------
+@contextmanager
+def span(stage: str):
+    """Time a block of work and record it as a pipeline stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.observe(elapsed, stage=stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed))
+
+
+def timed(stage: str):
+    """Decorator form of `span`."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def start_request_timings():
+    """Begin collecting stage timings for the current request context."""
+    timings = []
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing_header(timings, total: float | None = None) -> str:
+    """Format collected stage timings as a Server-Timing header value."""
+    parts = [
+        f"{stage.replace(' ', '_')};dur={elapsed * 1000:.1f}"
+        for stage, elapsed in timings
+    ]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def render_prometheus() -> str:
+    """Render every registered metric in Prometheus exposition format."""
+    lines = []
+    with _lock:
+        for metric in _metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.doc}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -1,7 +1,12 @@
 import os
+import threading
 
 # ---------- Internal imports (ABSOLUTE, PACKAGE-SAFE) ----------
-from backend.lstm_model import LSTMPredictor
+# backend.lstm_model (and with it TensorFlow) is imported only when a
+# model has to be trained or no NumPy export is available
+from backend.features import FEATURE_COLS
+from backend.metrics import span, record_cache
+from backend.numpy_runtime import NumpyLSTMPredictor, get_runtime_path
 
 
 # -------------------------------------------------
@@ -11,6 +16,26 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 MODEL_DIR = os.path.join(BASE_DIR, "models", "lstm")
 SCALER_DIR = os.path.join(BASE_DIR, "models", "scalers")
+RL_MODEL_DIR = os.path.join(BASE_DIR, "models", "rl")
+MULTI_SYMBOL_DIR = os.path.join(BASE_DIR, "models", "multi_symbol")
+
+# Newly trained models predict at least this many steps ahead so that
+# later multi-horizon requests do not force a retrain
+DEFAULT_HORIZON = int(os.getenv("LSTM_DEFAULT_HORIZON", "1"))
+MAX_HORIZON = int(os.getenv("LSTM_MAX_HORIZON", "30"))
+
+# "numpy": serve from the .npz export when it is fresh (exporting it on the
+# first Keras load), "keras": always serve through TensorFlow
+INFERENCE_RUNTIME = os.getenv("INFERENCE_RUNTIME", "numpy")
+
+# Incremental refresh (refresh_lstm): epochs and older samples replayed
+REFRESH_EPOCHS = int(os.getenv("LSTM_REFRESH_EPOCHS", "2"))
+REFRESH_REPLAY = int(os.getenv("LSTM_REFRESH_REPLAY", "32"))
+
+# "per_symbol": one LSTM per symbol, "multi_symbol": one shared LSTM with a
+# symbol embedding (backend.multi_symbol_lstm); symbols it cannot serve
+# fall back to the per-symbol model
+LSTM_MODEL_TYPE = os.getenv("LSTM_MODEL_TYPE", "per_symbol")
 
 
 # -------------------------------------------------
@@ -24,24 +49,52 @@ def get_scaler_path(symbol: str) -> str:
     return os.path.join(SCALER_DIR, f"{symbol}_scaler.joblib")
 
 
+def get_rl_model_path(symbol: str) -> str:
+    return os.path.join(RL_MODEL_DIR, f"{symbol}.keras")
+
+
+def get_multi_symbol_model_path() -> str:
+    return os.path.join(MULTI_SYMBOL_DIR, "lstm.keras")
+
+
+# -------------------------------------------------
+# Per-symbol locks: loads never see a half-swapped refresh
+# -------------------------------------------------
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _symbol_lock(symbol: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(symbol, threading.Lock())
+
+
 # -------------------------------------------------
 # Model registry (FINAL, SAFE)
 # -------------------------------------------------
-def load_or_create_lstm(symbol: str):
+def load_or_create_lstm(symbol: str, horizon: int = 1):
     """
     Always returns a predictor that is either:
-    - fully loaded (model + scaler), OR
+    - fully loaded (model + scaler) and covering `horizon` steps, OR
     - empty but explicitly marked for training
 
     Returns:
         predictor: LSTMPredictor
         needs_training: bool
     """
+    if not 1 <= horizon <= MAX_HORIZON:
+        raise ValueError(f"horizon must be between 1 and {MAX_HORIZON}")
+
+    if LSTM_MODEL_TYPE == "multi_symbol":
+        predictor = _load_multi_symbol(symbol, horizon)
+        if predictor is not None:
+            record_cache("lstm_artifacts", True)
+            return predictor, False
 
     model_path = get_model_path(symbol)
     scaler_path = get_scaler_path(symbol)
 
-    predictor = LSTMPredictor()
+    train_horizon = max(horizon, DEFAULT_HORIZON)
 
     model_exists = os.path.exists(model_path)
     scaler_exists = os.path.exists(scaler_path)
@@ -50,17 +103,116 @@ def load_or_create_lstm(symbol: str):
     # Case 1: Both artifacts exist → LOAD
     # -------------------------------------------------
     if model_exists and scaler_exists:
-        predictor.load(model_path, scaler_path)
-        return predictor, False
+        with _symbol_lock(symbol):
+            return _load_existing(symbol, horizon, train_horizon, model_path, scaler_path)
 
-    # -------------------------------------------------
-    # Case 2: Partial / corrupt state → retrain
-    # -------------------------------------------------
-    if model_exists or scaler_exists:
-        # One exists without the other → unsafe
-        return predictor, True
+    record_cache("lstm_artifacts", False)
 
     # -------------------------------------------------
+    # Case 2: Partial / corrupt state → retrain
     # Case 3: Fresh start → train
     # -------------------------------------------------
-    return predictor, True
+    return _untrained(60, train_horizon), True
+
+
+def _load_existing(symbol, horizon, train_horizon, model_path, scaler_path):
+    predictor = None
+    if INFERENCE_RUNTIME == "numpy":
+        with span("lstm_load"):
+            predictor = NumpyLSTMPredictor.load(
+                get_runtime_path(model_path), model_path, scaler_path
+            )
+
+    if predictor is None:
+        from backend.lstm_model import LSTMPredictor
+
+        predictor = LSTMPredictor(horizon=train_horizon)
+        with span("lstm_load"):
+            predictor.load(model_path, scaler_path)
+        if INFERENCE_RUNTIME == "numpy":
+            # Next load (and next process) can skip TensorFlow
+            predictor.export_numpy(model_path, scaler_path)
+
+    # Stored model is too short-sighted for this request → retrain wider
+    if predictor.horizon < horizon:
+        record_cache("lstm_artifacts", False)
+        return _untrained(predictor.lookback, train_horizon), True
+
+    record_cache("lstm_artifacts", True)
+    return predictor, False
+
+
+def _untrained(lookback: int, horizon: int):
+    from backend.lstm_model import LSTMPredictor
+
+    return LSTMPredictor(lookback=lookback, horizon=horizon)
+
+
+def _load_multi_symbol(symbol: str, horizon: int):
+    """Per-symbol view of the shared model, or None if it cannot serve `horizon`."""
+    model_path = get_multi_symbol_model_path()
+    if not os.path.exists(model_path):
+        return None
+
+    from backend.multi_symbol_lstm import SymbolPredictor, load_shared
+
+    with span("lstm_load"):
+        shared = load_shared(model_path, INFERENCE_RUNTIME)
+    if shared.horizon < horizon:
+        return None
+    return SymbolPredictor(shared, symbol)
+
+
+# -------------------------------------------------
+# Incremental refresh
+# -------------------------------------------------
+def refresh_lstm(symbol: str, df_feat=None, epochs: int = REFRESH_EPOCHS,
+                 replay: int = REFRESH_REPLAY, scaler_policy: str = "auto") -> dict:
+    """
+    Fine-tune the stored LSTM on the bars added since it was last trained
+    (metadata "last_bar", falling back to "trained_at") and swap the
+    refreshed artifacts in. `df_feat` is the featurized history; it is
+    fetched when omitted.
+    """
+    from backend.lstm_model import LSTMPredictor
+    from backend.stock_data import rows_since
+
+    model_path = get_model_path(symbol)
+    scaler_path = get_scaler_path(symbol)
+    if not (os.path.exists(model_path) and os.path.exists(scaler_path)):
+        raise ValueError(f"No trained model for {symbol}; train it first")
+
+    predictor = LSTMPredictor()
+    predictor.load(model_path, scaler_path)
+
+    cursor = predictor.metadata.get("last_bar") or predictor.metadata.get("trained_at")
+    if cursor is None:
+        return {"symbol": symbol, "status": "skipped",
+                "reason": "artifact has no training timestamp; retrain it"}
+
+    if df_feat is None:
+        from backend.feature_store import load_features
+
+        df_feat = load_features(symbol)
+
+    new_rows = rows_since(df_feat, cursor)
+    if new_rows.empty:
+        return {"symbol": symbol, "status": "up_to_date", "last_bar": cursor}
+
+    X = df_feat[FEATURE_COLS].values
+    prices = df_feat["Close"].values
+    last_bar = str(df_feat["Date"].iloc[-1])
+
+    result = predictor.refresh(
+        X, prices,
+        first_new=len(df_feat) - len(new_rows),
+        epochs=epochs,
+        replay=replay,
+        scaler_policy=scaler_policy,
+        last_bar=last_bar,
+    )
+    with _symbol_lock(symbol):
+        predictor.save(model_path, scaler_path)
+
+    return {"symbol": symbol, "status": "refreshed", "previous_bar": cursor,
+            "last_bar": last_bar, **result}
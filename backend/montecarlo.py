@@ -0,0 +1,162 @@
+# backend/montecarlo.py
+"""
+Monte Carlo simulation of future portfolio returns.
+
+Historical daily returns (one column per asset) are turned into many
+simulated paths with one of three methods:
+
+- gbm:             multivariate geometric Brownian motion with the
+                   historical drift and covariance of log returns;
+- bootstrap:       whole historical days resampled with replacement,
+                   keeping the cross-asset correlation of each day;
+- block_bootstrap: runs of `block_size` consecutive days resampled
+                   (circularly), which also keeps short-range
+                   autocorrelation and volatility clustering.
+
+Paths are generated in chunks of at most MC_CHUNK_ELEMENTS floats, so
+memory stays bounded by the chunk plus one terminal return per path and
+horizon, whatever n_paths is. The portfolio is rebalanced daily to its
+weights. Results are reproducible for a given seed.
+"""
+
+import os
+import time
+
+import numpy as np
+
+METHODS = ("gbm", "bootstrap", "block_bootstrap")
+MC_CHUNK_ELEMENTS = int(os.getenv("MC_CHUNK_ELEMENTS", "4000000"))
+MC_MAX_PATHS = int(os.getenv("MC_MAX_PATHS", "100000"))
+MC_MAX_HORIZON = int(os.getenv("MC_MAX_HORIZON", "756"))
+PERCENTILES = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+
+
+def _daily_returns(returns, weights, n, horizon, method, block_size, rng, gbm):
+    """Simulated daily portfolio returns of `n` paths, shape (n, horizon)."""
+    T, k = returns.shape
+    if method == "gbm":
+        mu, chol = gbm
+        z = rng.standard_normal((n, horizon, k))
+        assets = np.expm1(mu + z @ chol.T)
+    elif method == "bootstrap":
+        assets = returns[rng.integers(0, T, size=(n, horizon))]
+    else:
+        n_blocks = -(-horizon // block_size)
+        starts = rng.integers(0, T, size=(n, n_blocks, 1))
+        idx = (starts + np.arange(block_size)).reshape(n, -1)[:, :horizon] % T
+        assets = returns[idx]
+    return assets @ weights
+
+
+def simulate_terminal_returns(returns, weights=None, horizons=(1, 5, 21), n_paths=10000,
+                              method="gbm", block_size=5, seed=None) -> np.ndarray:
+    """
+    Cumulative portfolio return at each horizon for every simulated path,
+    shape (n_paths, len(horizons)).
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    if returns.ndim == 1:
+        returns = returns[:, None]
+    T, k = returns.shape
+    weights = np.full(k, 1.0 / k) if weights is None else np.asarray(weights, dtype=np.float64)
+    horizons = np.asarray(sorted(set(int(h) for h in horizons)))
+
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}'; expected one of {METHODS}")
+    if len(horizons) == 0:
+        raise ValueError("At least one horizon is required")
+    if len(weights) != k:
+        raise ValueError(f"{len(weights)} weights for {k} assets")
+    if T < 2:
+        raise ValueError("Need at least two historical returns")
+    if not 1 <= n_paths <= MC_MAX_PATHS:
+        raise ValueError(f"n_paths must be between 1 and {MC_MAX_PATHS}")
+    if horizons[0] < 1 or horizons[-1] > MC_MAX_HORIZON:
+        raise ValueError(f"Horizons must be between 1 and {MC_MAX_HORIZON} days")
+    if block_size < 1:
+        raise ValueError("block_size must be positive")
+
+    gbm = None
+    if method == "gbm":
+        log_returns = np.log1p(returns)
+        cov = np.atleast_2d(np.cov(log_returns, rowvar=False))
+        # Jitter keeps the Cholesky factor defined for collinear assets
+        chol = np.linalg.cholesky(cov + np.eye(k) * 1e-12)
+        gbm = (log_returns.mean(axis=0), chol)
+
+    rng = np.random.default_rng(seed)
+    horizon = int(horizons[-1])
+    chunk = max(1, MC_CHUNK_ELEMENTS // (horizon * k))
+    terminal = np.empty((n_paths, len(horizons)))
+
+    for start in range(0, n_paths, chunk):
+        n = min(chunk, n_paths - start)
+        daily = _daily_returns(returns, weights, n, horizon, method, block_size, rng, gbm)
+        growth = np.cumsum(np.log1p(np.maximum(daily, -1 + 1e-12)), axis=1)
+        terminal[start:start + n] = np.expm1(growth[:, horizons - 1])
+    return terminal
+
+
+def risk_summary(terminal, horizons, confidences=(0.95, 0.99), initial_value=1.0,
+                 bins: int = 50) -> list:
+    """VaR/CVaR (as positive losses) and terminal-value distribution per horizon."""
+    horizons = sorted(set(int(h) for h in horizons))
+    out = []
+    for j, h in enumerate(horizons):
+        ret = np.sort(terminal[:, j])
+        risk = {}
+        for c in confidences:
+            tail = max(1, int(np.floor(len(ret) * (1 - c))))
+            var = -np.quantile(ret, 1 - c)
+            cvar = -ret[:tail].mean()
+            risk[f"{c:g}"] = {
+                "var": round(float(var), 6),
+                "cvar": round(float(cvar), 6),
+                "var_value": round(float(var * initial_value), 2),
+                "cvar_value": round(float(cvar * initial_value), 2),
+            }
+
+        values = initial_value * (1 + ret)
+        counts, edges = np.histogram(values, bins=bins)
+        out.append({
+            "horizon": h,
+            "mean_return": round(float(ret.mean()), 6),
+            "prob_loss": round(float((ret < 0).mean()), 4),
+            "risk": risk,
+            "terminal_value": {
+                "mean": round(float(values.mean()), 2),
+                "percentiles": {
+                    str(p): round(float(v), 2)
+                    for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))
+                },
+                "histogram": {
+                    "counts": counts.tolist(),
+                    "edges": np.round(edges, 2).tolist(),
+                },
+            },
+        })
+    return out
+
+
+def monte_carlo_risk(returns, weights=None, horizons=(1, 5, 21), confidences=(0.95, 0.99),
+                     n_paths=10000, method="gbm", block_size=5, seed=None,
+                     initial_value=1.0) -> dict:
+    if not confidences:
+        raise ValueError("At least one confidence level is required")
+    for c in confidences:
+        if not 0 < c < 1:
+            raise ValueError("Confidence levels must be between 0 and 1")
+
+    started = time.perf_counter()
+    terminal = simulate_terminal_returns(
+        returns, weights, horizons, n_paths, method, block_size, seed
+    )
+    return {
+        "method": method,
+        "n_paths": n_paths,
+        "seed": seed,
+        "block_size": block_size if method == "block_bootstrap" else None,
+        "initial_value": initial_value,
+        "horizons": risk_summary(terminal, horizons, confidences, initial_value),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
@@ -0,0 +1,291 @@
+"""
+One LSTM shared by every symbol.
+
+The per-symbol models in model_registry cost one .keras file, one scaler
+and one loaded model per symbol. This model type is trained once on the
+pooled panel of all symbols instead:
+
+- features are z-scored with per-symbol statistics, so price-level
+  features (EMAs) of a $20 and a $2000 stock land on the same scale;
+- a learned symbol embedding is concatenated to the LSTM state, letting
+  the head specialize per symbol;
+- embedding row 0 stands for "unknown symbol" and is trained by randomly
+  masking symbol ids, so symbols outside the training panel get usable
+  predictions straight away.
+
+Serving keeps a single shared model in memory (NumPy runtime when the
+export is fresh) and hands out light per-symbol views with the
+LSTMPredictor interface. Enable it with LSTM_MODEL_TYPE=multi_symbol and
+train it with:
+
+    python -m backend.multi_symbol_lstm --symbols all --epochs 10
+"""
+
+import sys
+import json
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+
+from backend.artifacts import atomic_path, get_meta_path
+from backend.diagnostics import register_cache, track_model
+from backend.features import FEATURE_COLS
+from backend.numpy_runtime import (
+    NumpyMultiSymbolLSTM,
+    export_multi_symbol,
+    get_runtime_path,
+    sliding_windows,
+    source_fingerprint,
+)
+
+ARTIFACT_VERSION = 2
+EMBEDDING_DIM = 8
+UNKNOWN_SYMBOL = 0     # embedding row shared by symbols outside the training panel
+SYMBOL_DROPOUT = 0.1   # share of training samples relabelled as UNKNOWN_SYMBOL
+
+
+def feature_stats(X: np.ndarray) -> dict:
+    std = X.std(axis=0)
+    return {
+        "mean": X.mean(axis=0).tolist(),
+        "std": np.where(std > 1e-12, std, 1.0).tolist(),
+    }
+
+
+def normalize(X: np.ndarray, stats: dict) -> np.ndarray:
+    return ((X - np.asarray(stats["mean"])) / np.asarray(stats["std"])).astype(np.float32)
+
+
+class MultiSymbolLSTM:
+    runtime = "keras"
+
+    def __init__(self, lookback: int = 60, horizon: int = 1):
+        self.lookback = lookback
+        self.horizon = horizon
+        self.model = None
+        self.symbols = {}   # symbol -> embedding row (1-based; 0 = unknown)
+        self.stats = {}     # symbol -> {"mean": [...], "std": [...]}
+        self.metadata = {}
+
+    def _build_model(self, n_features: int, n_symbols: int):
+        from tensorflow.keras import Model
+        from tensorflow.keras.layers import (
+            LSTM, Concatenate, Dense, Embedding, Flatten, Input,
+        )
+
+        features = Input(shape=(self.lookback, n_features), name="features")
+        symbol = Input(shape=(1,), dtype="int32", name="symbol")
+
+        state = LSTM(64, name="lstm")(features)
+        embedding = Flatten()(
+            Embedding(n_symbols + 1, EMBEDDING_DIM, name="symbol_embedding")(symbol)
+        )
+        hidden = Dense(32, activation="relu", name="hidden")(
+            Concatenate()([state, embedding])
+        )
+        output = Dense(self.horizon, name="head")(hidden)
+
+        model = Model([features, symbol], output)
+        model.compile(optimizer="adam", loss="mse")
+        return model
+
+    def _panel_samples(self, panel: dict):
+        X_parts, y_parts, id_parts = [], [], []
+        for symbol in sorted(panel):
+            X, prices = panel[symbol]
+            returns = (prices[1:] - prices[:-1]) / prices[:-1]
+            X = X[:-1]  # align with returns
+
+            ends = np.arange(self.lookback, len(X) - self.horizon + 1)
+            if len(ends) == 0:
+                continue
+
+            self.symbols[symbol] = len(self.symbols) + 1
+            self.stats[symbol] = feature_stats(X)
+
+            X_parts.append(sliding_windows(normalize(X, self.stats[symbol]), ends, self.lookback))
+            # target for the window ending at i is returns[i:i + horizon]
+            y_parts.append(sliding_windows(returns[:, None], ends + self.horizon, self.horizon)[:, :, 0])
+            id_parts.append(np.full(len(ends), self.symbols[symbol], dtype=np.int32))
+
+        if not X_parts:
+            raise ValueError(
+                f"Not enough history to train lookback={self.lookback}, horizon={self.horizon}"
+            )
+        return np.concatenate(X_parts), np.concatenate(y_parts), np.concatenate(id_parts)
+
+    def train(self, panel: dict, epochs: int = 10, seed: int = 0):
+        """`panel` maps symbol -> (features, prices) as used by LSTMPredictor.train."""
+        self.symbols, self.stats = {}, {}
+        X_seq, y_seq, ids = self._panel_samples(panel)
+
+        rng = np.random.default_rng(seed)
+        ids = np.where(rng.random(len(ids)) < SYMBOL_DROPOUT, UNKNOWN_SYMBOL, ids)
+
+        self.model = self._build_model(X_seq.shape[2], len(self.symbols))
+        self.model.fit(
+            [X_seq, ids[:, None]], y_seq,
+            epochs=epochs, batch_size=64, shuffle=True, verbose=0,
+        )
+        self.metadata = {
+            "version": ARTIFACT_VERSION,
+            "model_type": "multi_symbol",
+            "lookback": self.lookback,
+            "horizon": self.horizon,
+            "n_features": int(X_seq.shape[2]),
+            "n_symbols": len(self.symbols),
+            "trained_at": datetime.now(timezone.utc).isoformat(),
+            "n_samples": int(len(X_seq)),
+        }
+        track_model("lstm", self.model)
+
+    def predict(self, windows: np.ndarray, symbol_ids: np.ndarray) -> np.ndarray:
+        """Return paths for normalized windows (n, lookback, n_features) and symbol ids (n,)."""
+        if self.model is None:
+            raise ValueError("Model not loaded")
+        ids = np.asarray(symbol_ids, dtype=np.int32)[:, None]
+        return self.model.predict([windows, ids], batch_size=256, verbose=0)
+
+    def save(self, model_path: str):
+        with atomic_path(model_path) as tmp:
+            self.model.save(tmp)
+        self.export_numpy(model_path)
+        with atomic_path(get_meta_path(model_path)) as tmp:
+            with open(tmp, "w") as f:
+                json.dump(
+                    dict(self.metadata, symbols=self.symbols, stats=self.stats), f, indent=2
+                )
+
+    def export_numpy(self, model_path: str) -> str:
+        return export_multi_symbol(
+            self.model, get_runtime_path(model_path), sources=[model_path],
+            symbols=self.symbols, stats=self.stats, metadata=self.metadata,
+        )
+
+    def load(self, model_path: str):
+        from tensorflow.keras.models import load_model
+
+        self.model = load_model(model_path)
+        with open(get_meta_path(model_path)) as f:
+            meta = json.load(f)
+        self.symbols = meta.pop("symbols")
+        self.stats = meta.pop("stats")
+        self.metadata = meta
+        self.lookback = int(self.model.input_shape[0][1])
+        self.horizon = int(self.model.output_shape[-1])
+        track_model("lstm", self.model)
+
+
+# -------------------------------------------------
+# Serving: one shared model, per-symbol views
+# -------------------------------------------------
+_shared = {}          # model_path -> (fingerprint, model)
+_symbol_stats = {}    # symbols outside the training panel -> stats
+register_cache("multi_symbol_lstm", _shared)
+register_cache("multi_symbol_stats", _symbol_stats)
+
+
+def load_shared(model_path: str, runtime: str = "numpy"):
+    """The shared model, reloaded only when the artifact on disk changes."""
+    fingerprint = source_fingerprint([model_path])
+    cached = _shared.get(model_path)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    model = None
+    if runtime == "numpy":
+        model = NumpyMultiSymbolLSTM.load(get_runtime_path(model_path), model_path)
+    if model is None:
+        model = MultiSymbolLSTM()
+        model.load(model_path)
+        if runtime == "numpy":
+            model.export_numpy(model_path)
+
+    _shared[model_path] = (fingerprint, model)
+    return model
+
+
+def symbol_stats(shared, symbol: str) -> dict:
+    """Training-time stats, or stats fitted once on the symbol's own history."""
+    if symbol in shared.stats:
+        return shared.stats[symbol]
+    if symbol not in _symbol_stats:
+        from backend.feature_store import load_features
+
+        df_feat = load_features(symbol)
+        _symbol_stats[symbol] = feature_stats(df_feat[FEATURE_COLS].values[:-1])
+    return _symbol_stats[symbol]
+
+
+class SymbolPredictor:
+    """LSTMPredictor-compatible view of the shared model for one symbol."""
+
+    def __init__(self, shared, symbol: str):
+        self.shared = shared
+        self.symbol = symbol
+        self.symbol_id = shared.symbols.get(symbol, UNKNOWN_SYMBOL)
+        self.stats = symbol_stats(shared, symbol)
+        self.runtime = shared.runtime
+        self.lookback = shared.lookback
+        self.horizon = shared.horizon
+        self.metadata = shared.metadata
+
+    def predict_windows(self, windows: np.ndarray) -> np.ndarray:
+        """Predicted return paths for raw feature windows shaped (n, lookback, n_features)."""
+        ids = np.full(len(windows), self.symbol_id, dtype=np.int32)
+        return np.asarray(self.shared.predict(normalize(windows, self.stats), ids), dtype=float)
+
+    def predict_returns(self, X: np.ndarray) -> np.ndarray:
+        return self.predict_windows(X[-self.lookback:][None])[0]
+
+    def predict_return(self, X: np.ndarray) -> float:
+        return float(self.predict_returns(X)[0])
+
+    def predict_returns_batch(self, X: np.ndarray, ends) -> np.ndarray:
+        return self.predict_windows(sliding_windows(X, ends, self.lookback))
+
+
+# -------------------------------------------------
+# Training CLI
+# -------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the shared multi-symbol LSTM")
+    parser.add_argument("--symbols", default="all",
+                        help="comma separated symbols, or 'all' for SUPPORTED_STOCKS")
+    parser.add_argument("--period", default="2y")
+    parser.add_argument("--lookback", type=int, default=60)
+    parser.add_argument("--horizon", type=int, default=1)
+    parser.add_argument("--epochs", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    from backend.feature_store import load_features
+    from backend.model_registry import get_multi_symbol_model_path
+
+    if args.symbols == "all":
+        from backend.config.stocks import SUPPORTED_STOCKS
+        symbols = list(SUPPORTED_STOCKS)
+    else:
+        symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
+
+    panel = {}
+    for symbol in symbols:
+        try:
+            df_feat = load_features(symbol, period=args.period)
+        except Exception as e:
+            print(f">>> {symbol}: skipped ({e})", file=sys.stderr)
+            continue
+        panel[symbol] = (df_feat[FEATURE_COLS].values, df_feat["Close"].values)
+
+    model = MultiSymbolLSTM(lookback=args.lookback, horizon=args.horizon)
+    model.train(panel, epochs=args.epochs)
+
+    path = get_multi_symbol_model_path()
+    model.save(path)
+    print(f">>> {model.metadata['n_samples']} samples from {len(model.symbols)} symbols")
+    print(f">>> Multi-symbol model saved to: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
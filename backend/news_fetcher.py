@@ -2,6 +2,8 @@ import requests
 import os
 from datetime import datetime, timedelta
 
+from backend.metrics import span
+
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 BASE_URL = "https://newsapi.org/v2/everything"
 
@@ -21,7 +23,8 @@ def fetch_company_news(company, days=5, page_size=20):
         "apiKey": NEWS_API_KEY,
     }
 
-    response = requests.get(BASE_URL, params=params, timeout=10)
+    with span("news_fetch"):
+        response = requests.get(BASE_URL, params=params, timeout=10)
     response.raise_for_status()
 
     data = response.json()
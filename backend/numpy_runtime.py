@@ -0,0 +1,389 @@
+"""
+NumPy-only inference runtime for the LSTM predictor and the DQN agent.
+
+Trained Keras models are exported to a small .npz next to the .keras file
+(`models/lstm/AAPL.keras` -> `models/lstm/AAPL.npz`). The export holds the
+layer weights, the layer spec, the fitted MinMaxScaler (LSTM only) and a
+fingerprint of the source artifacts, so a stale export is never served
+after the model is retrained. Serving from the export needs no TensorFlow
+import at all; every forward pass is batched.
+
+    python -m backend.numpy_runtime --symbols AAPL,MSFT --verify
+"""
+
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+
+from backend.artifacts import atomic_path
+
+RUNTIME_FORMAT = 1
+PARITY_TOLERANCE = 1e-5
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "tanh": np.tanh,
+    # tanh form is exact and never overflows
+    "sigmoid": lambda x: 0.5 * (np.tanh(0.5 * x) + 1),
+}
+
+
+def get_runtime_path(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + ".npz"
+
+
+def source_fingerprint(paths) -> list:
+    fingerprint = []
+    for path in paths:
+        st = os.stat(path)
+        fingerprint.append([os.path.basename(path), st.st_mtime_ns, st.st_size])
+    return fingerprint
+
+
+def sliding_windows(X: np.ndarray, ends, lookback: int) -> np.ndarray:
+    """Stack the `lookback` rows before each index in `ends` -> (n, lookback, n_features)."""
+    ends = np.asarray(ends, dtype=int)
+    if len(ends) and (ends.min() < lookback or ends.max() > len(X)):
+        raise ValueError(f"Window ends must lie in [{lookback}, {len(X)}]")
+
+    windows = np.lib.stride_tricks.sliding_window_view(X, lookback, axis=0)
+    # sliding_window_view puts the window axis last
+    return windows[ends - lookback].transpose(0, 2, 1)
+
+
+# -------------------------------------------------
+# Export
+# -------------------------------------------------
+def _activation_name(config: dict, key: str = "activation") -> str:
+    name = config.get(key) or "linear"
+    if not isinstance(name, str) or name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation for NumPy runtime: {name}")
+    return name
+
+
+def model_arrays(model):
+    """Layer spec + weight arrays for Sequential LSTM/Dense stacks."""
+    layers, arrays = [], {}
+
+    for i, layer in enumerate(model.layers):
+        kind = type(layer).__name__
+        config = layer.get_config()
+        weights = layer.get_weights()
+
+        if kind == "LSTM":
+            if config.get("return_sequences") or config.get("go_backwards") or config.get("stateful"):
+                raise ValueError(f"Unsupported LSTM configuration in layer {layer.name}")
+            if not config.get("use_bias", True):
+                weights.append(np.zeros(weights[1].shape[1], dtype=np.float32))
+            layers.append({
+                "type": "lstm",
+                "activation": _activation_name(config),
+                "recurrent_activation": _activation_name(config, "recurrent_activation"),
+            })
+            names = ("kernel", "recurrent_kernel", "bias")
+        elif kind == "Dense":
+            if not config.get("use_bias", True):
+                weights.append(np.zeros(weights[0].shape[1], dtype=np.float32))
+            layers.append({"type": "dense", "activation": _activation_name(config)})
+            names = ("kernel", "bias")
+        else:
+            raise ValueError(f"Unsupported layer for NumPy runtime: {kind}")
+
+        for name, w in zip(names, weights):
+            arrays[f"layer{i}_{name}"] = np.asarray(w, dtype=np.float32)
+
+    return layers, arrays
+
+
+def _write_export(path: str, spec: dict, arrays: dict, sources) -> str:
+    spec = dict(spec, format=RUNTIME_FORMAT, sources=source_fingerprint(sources))
+    with atomic_path(path) as tmp:
+        np.savez(tmp, spec=np.array(json.dumps(spec)), **arrays)
+    return path
+
+
+def export_model(model, path: str, sources, scaler=None, metadata=None) -> str:
+    """Write the NumPy runtime export for `model` to `path` (atomically)."""
+    layers, arrays = model_arrays(model)
+    spec = {
+        "layers": layers,
+        "input_shape": [d for d in model.input_shape[1:]],
+        "metadata": metadata or {},
+    }
+    if scaler is not None:
+        arrays["scaler_scale"] = np.asarray(scaler.scale_, dtype=np.float64)
+        arrays["scaler_min"] = np.asarray(scaler.min_, dtype=np.float64)
+
+    return _write_export(path, spec, arrays, sources)
+
+
+def export_multi_symbol(model, path: str, sources, symbols: dict, stats: dict, metadata: dict) -> str:
+    """Export the shared multi-symbol LSTM (see backend.multi_symbol_lstm)."""
+    lstm = model.get_layer("lstm")
+    lstm_config = lstm.get_config()
+    kernel, recurrent_kernel, bias = lstm.get_weights()
+    arrays = {
+        "lstm_kernel": kernel,
+        "lstm_recurrent_kernel": recurrent_kernel,
+        "lstm_bias": bias,
+        "embedding": model.get_layer("symbol_embedding").get_weights()[0],
+    }
+    for name in ("hidden", "head"):
+        arrays[f"{name}_kernel"], arrays[f"{name}_bias"] = model.get_layer(name).get_weights()
+    arrays = {k: np.asarray(v, dtype=np.float32) for k, v in arrays.items()}
+
+    spec = {
+        "architecture": "multi_symbol_lstm",
+        "activation": _activation_name(lstm_config),
+        "recurrent_activation": _activation_name(lstm_config, "recurrent_activation"),
+        "hidden_activation": _activation_name(model.get_layer("hidden").get_config()),
+        "metadata": metadata,
+        "symbols": symbols,
+        "stats": stats,
+    }
+    return _write_export(path, spec, arrays, sources)
+
+
+def load_export(path: str, sources):
+    """
+    Returns (spec, arrays) for a fresh export, or None when it is missing,
+    written by another format version, or older than its source artifacts.
+    """
+    if not os.path.exists(path):
+        return None
+
+    with np.load(path) as data:
+        spec = json.loads(str(data["spec"]))
+        arrays = {k: data[k] for k in data.files if k != "spec"}
+
+    if spec.get("format") != RUNTIME_FORMAT:
+        return None
+    try:
+        if spec.get("sources") != source_fingerprint(sources):
+            return None
+    except OSError:
+        return None
+    return spec, arrays
+
+
+# -------------------------------------------------
+# Forward pass
+# -------------------------------------------------
+def _lstm(x, kernel, recurrent_kernel, bias, activation, recurrent_activation):
+    act = ACTIVATIONS[activation]
+    rec = ACTIVATIONS[recurrent_activation]
+    units = recurrent_kernel.shape[0]
+
+    # Input projection for all timesteps in one matmul; gate order i, f, c, o
+    xw = x @ kernel + bias
+    h = np.zeros((x.shape[0], units), dtype=x.dtype)
+    c = np.zeros_like(h)
+
+    for t in range(x.shape[1]):
+        z = xw[:, t] + h @ recurrent_kernel
+        i = rec(z[:, :units])
+        f = rec(z[:, units:2 * units])
+        g = act(z[:, 2 * units:3 * units])
+        o = rec(z[:, 3 * units:])
+        c = f * c + i * g
+        h = o * act(c)
+
+    return h
+
+
+class NumpyModel:
+    """Batched forward pass over an exported layer stack."""
+
+    def __init__(self, layers, arrays):
+        self.layers = layers
+        self.arrays = arrays
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float32)
+        for i, layer in enumerate(self.layers):
+            w = lambda name: self.arrays[f"layer{i}_{name}"]
+            if layer["type"] == "lstm":
+                x = _lstm(
+                    x, w("kernel"), w("recurrent_kernel"), w("bias"),
+                    layer["activation"], layer["recurrent_activation"],
+                )
+            else:
+                x = ACTIVATIONS[layer["activation"]](x @ w("kernel") + w("bias"))
+        return x
+
+
+class NumpyLSTMPredictor:
+    """Inference-only drop-in for a trained LSTMPredictor."""
+
+    runtime = "numpy"
+
+    def __init__(self, spec, arrays):
+        self.model = NumpyModel(spec["layers"], arrays)
+        self.scale = arrays["scaler_scale"]
+        self.min = arrays["scaler_min"]
+        self.lookback = int(spec["input_shape"][0])
+        self.horizon = int(arrays[f"layer{len(spec['layers']) - 1}_bias"].shape[0])
+        self.metadata = spec.get("metadata", {})
+
+    @classmethod
+    def load(cls, path: str, model_path: str, scaler_path: str):
+        """Returns None when no fresh export exists."""
+        export = load_export(path, [model_path, scaler_path])
+        return cls(*export) if export is not None else None
+
+    def _scale(self, X: np.ndarray) -> np.ndarray:
+        # MinMaxScaler.transform in float64, then float32 as Keras would
+        return (np.asarray(X, dtype=np.float64) * self.scale + self.min).astype(np.float32)
+
+    def predict_returns(self, X: np.ndarray) -> np.ndarray:
+        seq = self._scale(X[-self.lookback:])[None]
+        return np.asarray(self.model(seq)[0], dtype=float)
+
+    def predict_return(self, X: np.ndarray) -> float:
+        return float(self.predict_returns(X)[0])
+
+    def predict_windows(self, windows: np.ndarray) -> np.ndarray:
+        """Predicted return paths for raw feature windows shaped (n, lookback, n_features)."""
+        return np.asarray(self.model(self._scale(windows)), dtype=float)
+
+    def predict_returns_batch(self, X: np.ndarray, ends) -> np.ndarray:
+        """Predicted return paths for the windows ending before each index in `ends`."""
+        windows = sliding_windows(self._scale(X), ends, self.lookback)
+        return np.asarray(self.model(windows), dtype=float)
+
+
+class NumpyDQNAgent:
+    """Greedy, inference-only drop-in for DQNAgentTF."""
+
+    runtime = "numpy"
+
+    def __init__(self, spec, arrays):
+        self.model = NumpyModel(spec["layers"], arrays)
+        self.state_size = int(spec["input_shape"][0])
+        self.action_size = int(arrays[f"layer{len(spec['layers']) - 1}_bias"].shape[0])
+
+    @classmethod
+    def load(cls, path: str, model_path: str):
+        export = load_export(path, [model_path])
+        return cls(*export) if export is not None else None
+
+    def q_values(self, states: np.ndarray) -> np.ndarray:
+        return self.model(np.reshape(states, (-1, self.state_size)))
+
+    def act(self, state) -> int:
+        return int(np.argmax(self.q_values(state)[0]))
+
+
+class NumpyMultiSymbolLSTM:
+    """NumPy forward pass of the shared multi-symbol LSTM."""
+
+    runtime = "numpy"
+
+    def __init__(self, spec, arrays):
+        self.spec = spec
+        self.arrays = arrays
+        self.metadata = spec.get("metadata", {})
+        self.symbols = spec["symbols"]
+        self.stats = spec["stats"]
+        self.lookback = int(self.metadata["lookback"])
+        self.horizon = int(arrays["head_bias"].shape[0])
+
+    @classmethod
+    def load(cls, path: str, model_path: str):
+        export = load_export(path, [model_path])
+        return cls(*export) if export is not None else None
+
+    def predict(self, windows: np.ndarray, symbol_ids: np.ndarray) -> np.ndarray:
+        """Return paths for normalized windows (n, lookback, n_features) and symbol ids (n,)."""
+        a = self.arrays
+        h = _lstm(
+            np.asarray(windows, dtype=np.float32),
+            a["lstm_kernel"], a["lstm_recurrent_kernel"], a["lstm_bias"],
+            self.spec["activation"], self.spec["recurrent_activation"],
+        )
+        z = np.concatenate([h, a["embedding"][np.asarray(symbol_ids, dtype=int)]], axis=1)
+        z = ACTIVATIONS[self.spec["hidden_activation"]](z @ a["hidden_kernel"] + a["hidden_bias"])
+        return z @ a["head_kernel"] + a["head_bias"]
+
+
+# -------------------------------------------------
+# Export / parity CLI
+# -------------------------------------------------
+def max_abs_error(keras_model, numpy_model, inputs) -> float:
+    expected = keras_model.predict(inputs, verbose=0)
+    return float(np.max(np.abs(expected - numpy_model(inputs))))
+
+
+def export_symbol(symbol: str, verify: bool = False, batch: int = 64, seed: int = 0) -> dict:
+    from backend.model_registry import get_model_path, get_scaler_path, get_rl_model_path
+
+    rng = np.random.default_rng(seed)
+    result = {"symbol": symbol}
+
+    model_path, scaler_path = get_model_path(symbol), get_scaler_path(symbol)
+    if os.path.exists(model_path) and os.path.exists(scaler_path):
+        from backend.lstm_model import LSTMPredictor
+
+        predictor = LSTMPredictor()
+        predictor.load(model_path, scaler_path)
+        path = predictor.export_numpy(model_path, scaler_path)
+        result["lstm"] = {"path": path}
+        if verify:
+            runtime = NumpyLSTMPredictor.load(path, model_path, scaler_path)
+            shape = (batch, runtime.lookback, predictor.model.input_shape[-1])
+            inputs = rng.uniform(0, 1, shape).astype(np.float32)
+            result["lstm"]["max_abs_error"] = max_abs_error(predictor.model, runtime.model, inputs)
+
+    rl_path = get_rl_model_path(symbol)
+    if os.path.exists(rl_path):
+        from backend.dqn_agent_tf import DQNAgentTF
+
+        agent = DQNAgentTF(state_size=6, model_path=rl_path, inference_only=True)
+        path = agent.export_numpy(rl_path)
+        result["rl"] = {"path": path}
+        if verify:
+            runtime = NumpyDQNAgent.load(path, rl_path)
+            inputs = rng.normal(size=(batch, runtime.state_size)).astype(np.float32)
+            result["rl"]["max_abs_error"] = max_abs_error(agent.model, runtime.model, inputs)
+
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export Keras models to the NumPy runtime")
+    parser.add_argument("--symbols", default="all",
+                        help="comma separated symbols, or 'all' for SUPPORTED_STOCKS")
+    parser.add_argument("--verify", action="store_true",
+                        help="check Keras/NumPy parity on random batched inputs")
+    parser.add_argument("--tolerance", type=float, default=PARITY_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    if args.symbols == "all":
+        from backend.config.stocks import SUPPORTED_STOCKS
+        symbols = list(SUPPORTED_STOCKS)
+    else:
+        symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
+
+    failed = False
+    for symbol in symbols:
+        result = export_symbol(symbol, verify=args.verify)
+        for kind in ("lstm", "rl"):
+            if kind not in result:
+                continue
+            line = f"{symbol} {kind}: {result[kind]['path']}"
+            if "max_abs_error" in result[kind]:
+                err = result[kind]["max_abs_error"]
+                ok = err <= args.tolerance
+                failed |= not ok
+                line += f" max_abs_error={err:.2e} {'ok' if ok else 'MISMATCH'}"
+            print(line)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,367 @@
+# backend/paper_sessions.py
+"""
+Persistent paper-trading sessions.
+
+/paper-trade restarts from INITIAL_CASH and replays the last `days` bars
+on every call. A session instead keeps its cash, position, trade log and
+equity curve in SQLite (WAL mode, so readers never block the writer).
+Stepping a session only fetches and processes bars newer than its last
+processed bar, so looking at a long-running account costs the same on
+day 300 as on day 3.
+"""
+
+import os
+import uuid
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Optional
+
+import pandas as pd
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from backend.paper_trading import INITIAL_CASH
+from backend.stock_data import fetch_stock_data, rows_since
+from backend.metrics import span
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAPER_TRADING_DB = os.getenv(
+    "PAPER_TRADING_DB", os.path.join(BASE_DIR, "data", "paper_trading.db")
+)
+STEP_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id            TEXT PRIMARY KEY,
+    symbol        TEXT NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'open',
+    quantity      INTEGER NOT NULL,
+    initial_cash  REAL NOT NULL,
+    cash          REAL NOT NULL,
+    shares        INTEGER NOT NULL DEFAULT 0,
+    last_price    REAL,
+    last_bar      TEXT,
+    created_at    TEXT NOT NULL,
+    closed_at     TEXT
+);
+CREATE TABLE IF NOT EXISTS trades (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id  TEXT NOT NULL REFERENCES sessions(id),
+    bar         TEXT NOT NULL,
+    action      TEXT NOT NULL,
+    shares      INTEGER NOT NULL,
+    price       REAL NOT NULL,
+    cash_after  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS equity (
+    session_id  TEXT NOT NULL REFERENCES sessions(id),
+    bar         TEXT NOT NULL,
+    equity      REAL NOT NULL,
+    PRIMARY KEY (session_id, bar)
+);
+CREATE INDEX IF NOT EXISTS trades_session ON trades(session_id, id);
+"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class PaperTradingStore:
+    def __init__(self, path: str = PAPER_TRADING_DB):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # One short-lived connection per operation; sqlite3 connections are
+        # not shared across the threadpool threads FastAPI runs handlers in
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    # -------------------------------------------------
+    # Sessions
+    # -------------------------------------------------
+    def create_session(self, symbol: str, initial_cash: float = INITIAL_CASH,
+                       quantity: int = 1, backfill_bars: int = 0) -> dict:
+        """
+        Open a session. Its cursor starts `backfill_bars` bars before the
+        latest one, so the first step replays those bars; with 0 only bars
+        arriving after creation are traded.
+        """
+        if initial_cash <= 0 or quantity <= 0 or backfill_bars < 0:
+            raise ValueError("initial_cash and quantity must be positive, backfill_bars >= 0")
+
+        data = fetch_stock_data(symbol, period="1y")
+        if data is None or data.empty:
+            raise ValueError(f"No data available for {symbol}")
+
+        backfill_bars = min(backfill_bars, len(data) - 1)
+        cursor_row = data.iloc[-1 - backfill_bars]
+
+        session_id = uuid.uuid4().hex[:12]
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO sessions (id, symbol, quantity, initial_cash, cash, last_price,"
+                " last_bar, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (session_id, symbol, quantity, initial_cash, initial_cash,
+                 float(cursor_row["Close"]), str(cursor_row["Date"]), _now()),
+            )
+        return self.get_session(session_id)
+
+    def _row(self, conn, session_id: str):
+        row = conn.execute("SELECT * FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown session: {session_id}")
+        return row
+
+    def _summary(self, conn, row) -> dict:
+        n_trades = conn.execute(
+            "SELECT COUNT(*) FROM trades WHERE session_id = ?", (row["id"],)
+        ).fetchone()[0]
+        value = row["cash"] + row["shares"] * (row["last_price"] or 0.0)
+        return {
+            "session_id": row["id"],
+            "symbol": row["symbol"],
+            "status": row["status"],
+            "quantity": row["quantity"],
+            "initial_cash": row["initial_cash"],
+            "cash": round(row["cash"], 2),
+            "shares_held": row["shares"],
+            "last_price": row["last_price"],
+            "portfolio_value": round(value, 2),
+            "total_return": round(value / row["initial_cash"] - 1, 4),
+            "n_trades": n_trades,
+            "last_bar": row["last_bar"],
+            "created_at": row["created_at"],
+            "closed_at": row["closed_at"],
+        }
+
+    def get_session(self, session_id: str) -> dict:
+        with closing(self._connect()) as conn:
+            return self._summary(conn, self._row(conn, session_id))
+
+    def list_sessions(self, status: Optional[str] = None) -> list:
+        with closing(self._connect()) as conn:
+            if status:
+                rows = conn.execute(
+                    "SELECT * FROM sessions WHERE status = ? ORDER BY created_at", (status,)
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM sessions ORDER BY created_at").fetchall()
+            return [self._summary(conn, row) for row in rows]
+
+    def close_session(self, session_id: str) -> dict:
+        with closing(self._connect()) as conn:
+            self._row(conn, session_id)
+            conn.execute(
+                "UPDATE sessions SET status = 'closed', closed_at = ? "
+                "WHERE id = ? AND status = 'open'",
+                (_now(), session_id),
+            )
+            return self._summary(conn, self._row(conn, session_id))
+
+    # -------------------------------------------------
+    # Incremental processing
+    # -------------------------------------------------
+    def step_session(self, session_id: str, signal_fn=None) -> dict:
+        """
+        Trade every bar newer than the session's cursor and advance it.
+
+        Bars are fetched and signals computed without holding a lock; the
+        fills are then written in a short IMMEDIATE transaction that first
+        checks the cursor has not moved. If a concurrent step advanced it,
+        the step starts over from the new cursor, so no bar is processed
+        twice.
+        """
+        if signal_fn is None:
+            from backend.trade_signal import get_trade_signal
+
+            signal_fn = lambda symbol: get_trade_signal(symbol).get("signal", "HOLD")
+
+        for _ in range(STEP_ATTEMPTS):
+            with closing(self._connect()) as conn:
+                row = self._row(conn, session_id)
+            if row["status"] != "open":
+                raise ValueError(f"Session {session_id} is closed")
+
+            # Fetch from the cursor's day on; cost follows the new bars
+            start = pd.Timestamp(row["last_bar"]).strftime("%Y-%m-%d")
+            with span("fetch_stock_data"):
+                data = fetch_stock_data(row["symbol"], start=start)
+            if data is None:
+                data = pd.DataFrame(columns=["Date", "Close"])
+            new_bars = rows_since(data, row["last_bar"])
+            actions = [signal_fn(row["symbol"]) for _ in range(len(new_bars))]
+
+            cash, shares, quantity = row["cash"], row["shares"], row["quantity"]
+            trades, equity = [], []
+            for date, close, action in zip(new_bars["Date"], new_bars["Close"], actions):
+                bar, price = str(date), float(close)
+                if action == "BUY" and cash >= price * quantity:
+                    shares += quantity
+                    cash -= price * quantity
+                elif action == "SELL" and shares >= quantity:
+                    shares -= quantity
+                    cash += price * quantity
+                else:
+                    action = None
+
+                if action:
+                    trades.append((session_id, bar, action, quantity, price, cash))
+                equity.append((session_id, bar, cash + shares * price))
+
+            with closing(self._connect()) as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    current = self._row(conn, session_id)
+                    if current["status"] != "open":
+                        raise ValueError(f"Session {session_id} is closed")
+                    if current["last_bar"] != row["last_bar"]:
+                        # Another step advanced the cursor; redo from there
+                        conn.execute("ROLLBACK")
+                        continue
+
+                    conn.executemany(
+                        "INSERT INTO trades (session_id, bar, action, shares, price,"
+                        " cash_after) VALUES (?, ?, ?, ?, ?, ?)",
+                        trades,
+                    )
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO equity (session_id, bar, equity) VALUES (?, ?, ?)",
+                        equity,
+                    )
+                    if len(new_bars):
+                        conn.execute(
+                            "UPDATE sessions SET cash = ?, shares = ?, last_price = ?, last_bar = ? "
+                            "WHERE id = ?",
+                            (cash, shares, float(new_bars["Close"].iloc[-1]),
+                             str(new_bars["Date"].iloc[-1]), session_id),
+                        )
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+
+                summary = self._summary(conn, self._row(conn, session_id))
+
+            summary["processed_bars"] = len(new_bars)
+            summary["new_trades"] = [
+                {"date": t[1], "action": t[2], "shares": t[3], "price": round(t[4], 2)}
+                for t in trades
+            ]
+            return summary
+
+        raise ValueError(f"Session {session_id} kept changing during the step; retry")
+
+    def trades(self, session_id: str, limit: int = 100) -> list:
+        with closing(self._connect()) as conn:
+            self._row(conn, session_id)
+            rows = conn.execute(
+                "SELECT bar, action, shares, price, cash_after FROM trades "
+                "WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (session_id, limit),
+            ).fetchall()
+        return [
+            {"date": r["bar"], "action": r["action"], "shares": r["shares"],
+             "price": round(r["price"], 2), "cash_after": round(r["cash_after"], 2)}
+            for r in reversed(rows)
+        ]
+
+    def equity_curve(self, session_id: str, since: Optional[str] = None) -> list:
+        # Bars are stored in their string form, which sorts chronologically
+        # for a single symbol's timestamps
+        with closing(self._connect()) as conn:
+            self._row(conn, session_id)
+            rows = conn.execute(
+                "SELECT bar, equity FROM equity WHERE session_id = ? AND bar > ? ORDER BY bar",
+                (session_id, since or ""),
+            ).fetchall()
+        return [{"date": r["bar"], "equity": round(r["equity"], 2)} for r in rows]
+
+
+_store = None
+
+
+def get_store() -> PaperTradingStore:
+    global _store
+    if _store is None:
+        _store = PaperTradingStore()
+    return _store
+
+
+# -------------------------------------------------
+# API
+# -------------------------------------------------
+router = APIRouter(prefix="/paper-trade/sessions", tags=["Paper Trading"])
+
+
+class CreateSessionRequest(BaseModel):
+    symbol: str
+    initial_cash: float = INITIAL_CASH
+    quantity: int = 1
+    backfill_bars: int = 0
+
+
+def _call(fn, *args, **kwargs):
+    try:
+        return fn(*args, **kwargs)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e).strip("'"))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("")
+def create_session(req: CreateSessionRequest):
+    return _call(
+        get_store().create_session,
+        req.symbol, req.initial_cash, req.quantity, req.backfill_bars,
+    )
+
+
+@router.get("")
+def list_sessions(status: Optional[str] = None):
+    return {"sessions": _call(get_store().list_sessions, status)}
+
+
+@router.get("/{session_id}")
+def get_session(session_id: str, trades: int = 20):
+    store = get_store()
+    summary = _call(store.get_session, session_id)
+    summary["recent_trades"] = _call(store.trades, session_id, trades)
+    return summary
+
+
+@router.post("/{session_id}/step")
+def step_session(session_id: str):
+    return _call(get_store().step_session, session_id)
+
+
+@router.get("/{session_id}/trades")
+def session_trades(session_id: str, limit: int = 100):
+    return {"session_id": session_id, "trades": _call(get_store().trades, session_id, limit)}
+
+
+@router.get("/{session_id}/equity")
+def session_equity(session_id: str, since: Optional[str] = None):
+    """Pass the last returned date as `since` to receive only newer points."""
+    curve = _call(get_store().equity_curve, session_id, since)
+    return {
+        "session_id": session_id,
+        "equity_curve": curve,
+        "cursor": curve[-1]["date"] if curve else since,
+    }
+
+
+@router.post("/{session_id}/close")
+def close_session(session_id: str):
+    return _call(get_store().close_session, session_id)
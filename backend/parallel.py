@@ -0,0 +1,65 @@
+# backend/parallel.py
+
+import os
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "TF_NUM_INTRAOP_THREADS",
+)
+
+
+def pin_threads(threads: int = 1):
+    """
+    Limit BLAS/OpenMP and TensorFlow thread pools in the current process.
+    Must run before TensorFlow executes its first op, i.e. as a worker
+    initializer, so that N workers use N * threads cores in total.
+    """
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+    # TensorFlow reads the TF_NUM_* variables when it is first imported;
+    # only an already imported TensorFlow needs configuring here, so
+    # NumPy-only workers never pay for the import
+    if "tensorflow" not in sys.modules:
+        return
+    try:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    except RuntimeError:
+        # TensorFlow already initialized in this process; env vars still apply to BLAS
+        pass
+
+
+def default_workers(threads: int = 1) -> int:
+    return max(1, (os.cpu_count() or 1) // max(1, threads))
+
+
+def _init_worker(threads: int, initializer, initargs):
+    pin_threads(threads)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def process_pool(workers: int | None = None, threads: int = 1,
+                 initializer=None, initargs=()) -> ProcessPoolExecutor:
+    """
+    Process pool whose workers are pinned to `threads` threads each and
+    then run the optional `initializer(*initargs)`.
+    Uses 'spawn' because TensorFlow is not fork-safe.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers or default_workers(threads),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads, initializer, initargs),
+    )
@@ -0,0 +1,150 @@
+# backend/profiling.py
+
+import os
+import re
+import sys
+import time
+import uuid
+import cProfile
+import threading
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+
+# -------------------------------------------------
+# Configuration
+# -------------------------------------------------
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(BASE_DIR, "profiles"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+
+MODES = ("cprofile", "sample")
+_PROFILE_ID_RE = re.compile(r"^[0-9A-Za-z-]+$")
+
+# Only one profiler may run at a time (cProfile is process-global on 3.12+)
+_active = threading.Lock()
+
+
+def requested_mode(value: str | None) -> str | None:
+    """
+    Map the value of the `X-Profile` header / `profile` query flag to a
+    profiler mode. Truthy values select the deterministic profiler.
+    """
+    if value is None:
+        return None
+    value = value.strip().lower()
+    if value in ("", "0", "false", "no", "off"):
+        return None
+    if value in MODES:
+        return value
+    return "cprofile"
+
+
+def new_profile_id() -> str:
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def profile_files(profile_id: str) -> dict:
+    """Existing artifact paths for a profile, keyed by format."""
+    if not _PROFILE_ID_RE.match(profile_id):
+        raise ValueError(f"Invalid profile id: {profile_id}")
+    files = {}
+    for fmt in ("pstats", "collapsed"):
+        path = os.path.join(PROFILE_DIR, f"{profile_id}.{fmt}")
+        if os.path.exists(path):
+            files[fmt] = path
+    return files
+
+
+def list_profiles() -> list:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    ids = {
+        name.rsplit(".", 1)[0]
+        for name in os.listdir(PROFILE_DIR)
+        if name.endswith((".pstats", ".collapsed"))
+    }
+    return sorted(ids, reverse=True)
+
+
+# -------------------------------------------------
+# Sampling profiler (flamegraph collapsed stacks)
+# -------------------------------------------------
+class StackSampler:
+    """
+    Periodically samples the stack of one thread and aggregates the
+    samples into `frame;frame;frame count` lines, the input format of
+    flamegraph.pl / speedscope.
+    """
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = [
+                f"{entry.name} ({os.path.basename(entry.filename)}:{entry.lineno})"
+                for entry in traceback.extract_stack(frame)
+            ]
+            self.stacks[";".join(stack)] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+# -------------------------------------------------
+# Request profiling
+# -------------------------------------------------
+@contextmanager
+def profiled(mode: str):
+    """
+    Profile the enclosed block and save it under PROFILE_DIR.
+
+    Yields the profile id, or None when another profile is already being
+    recorded. Both profilers observe the calling thread, i.e. the event
+    loop for async handlers, so concurrent requests on the same loop can
+    appear in the profile too.
+    """
+    if not _active.acquire(blocking=False):
+        yield None
+        return
+
+    try:
+        profile_id = new_profile_id()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+
+        if mode == "sample":
+            sampler = StackSampler(threading.get_ident())
+            sampler.start()
+            try:
+                yield profile_id
+            finally:
+                sampler.stop()
+                sampler.dump(os.path.join(PROFILE_DIR, f"{profile_id}.collapsed"))
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield profile_id
+            finally:
+                profiler.disable()
+                profiler.dump_stats(os.path.join(PROFILE_DIR, f"{profile_id}.pstats"))
+    finally:
+        _active.release()
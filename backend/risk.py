@@ -0,0 +1,63 @@
+# backend/risk.py
+
+import numpy as np
+from scipy.optimize import minimize
+
+TRADING_DAYS = 252
+
+
+def simple_returns(prices: np.ndarray) -> np.ndarray:
+    prices = np.asarray(prices, dtype=float)
+    return np.diff(prices) / prices[:-1]
+
+
+def risk_metrics(returns: np.ndarray) -> dict:
+    """
+    Annualized volatility, max drawdown and historical VaR (95%)
+    of a daily return series.
+    """
+    # --- Volatility (annualized) ---
+    volatility = float(np.std(returns) * np.sqrt(TRADING_DAYS))
+
+    # --- Max Drawdown ---
+    cumulative = np.cumprod(1 + returns)
+    peak = np.maximum.accumulate(cumulative)
+    drawdown = (cumulative - peak) / peak
+    max_drawdown = float(drawdown.min())
+
+    # --- VaR (95%) ---
+    var_95 = float(np.percentile(returns, 5))
+
+    return {
+        "volatility": volatility,
+        "max_drawdown": max_drawdown,
+        "var_95": var_95,
+    }
+
+
+def min_variance_weights(cov_matrix: np.ndarray) -> np.ndarray:
+    """Long-only, fully invested minimum-variance weights (SLSQP)."""
+    n = cov_matrix.shape[0]
+
+    def portfolio_volatility(weights):
+        return np.sqrt(weights.T @ cov_matrix @ weights)
+
+    constraints = [{"type": "eq", "fun": lambda w: np.sum(w) - 1}]
+    bounds = [(0, 1)] * n
+    init_weights = np.ones(n) / n
+
+    result = minimize(
+        portfolio_volatility,
+        init_weights,
+        method="SLSQP",
+        bounds=bounds,
+        constraints=constraints,
+    )
+    return result.x
+
+
+def portfolio_stats(weights: np.ndarray, mean_returns: np.ndarray, cov_matrix: np.ndarray):
+    """Annualized expected return and risk of a weight vector."""
+    expected_return = float(mean_returns @ weights * TRADING_DAYS)
+    expected_risk = float(np.sqrt(weights.T @ cov_matrix @ weights) * np.sqrt(TRADING_DAYS))
+    return expected_return, expected_risk
@@ -2,7 +2,9 @@
 
 import os
 import numpy as np
-from backend.dqn_agent_tf import DQNAgentTF
+from backend.model_registry import get_rl_model_path, INFERENCE_RUNTIME
+from backend.numpy_runtime import NumpyDQNAgent, get_runtime_path
+from backend.batching import get_batcher, stacked
 import random
 
 class RLTrader:
@@ -13,24 +15,39 @@ class RLTrader:
         self.state_size = 6
         self.action_size = 3  # BUY, HOLD, SELL
 
-        model_path = f"models/rl/{symbol}.keras"
+        model_path = get_rl_model_path(symbol)
         if not os.path.exists(model_path):
             raise RuntimeError(f"RL model not found at {model_path}")
 
-        self.agent = DQNAgentTF(
-            state_size=self.state_size,
-            action_size=self.action_size,
-            model_path=model_path,
-            inference_only=True
-        )
+        self.agent = None
+        if INFERENCE_RUNTIME == "numpy":
+            self.agent = NumpyDQNAgent.load(get_runtime_path(model_path), model_path)
+
+        if self.agent is None:
+            # No fresh NumPy export → TensorFlow (and export for next time)
+            from backend.dqn_agent_tf import DQNAgentTF
+
+            self.agent = DQNAgentTF(
+                state_size=self.state_size,
+                action_size=self.action_size,
+                model_path=model_path,
+                inference_only=True
+            )
+            if INFERENCE_RUNTIME == "numpy":
+                self.agent.export_numpy(model_path)
+
+        self.runtime = self.agent.runtime
+        # Concurrent requests for the same weights share one forward pass
+        self.batch_key = (symbol, self.runtime, os.stat(model_path).st_mtime_ns)
 
     def predict_signal(self):
         # Dummy state for now (same as training layout)
         
 
         # Simulate changing market state
-        state = np.random.randn(self.state_size)
-        action = self.agent.act(state)
+        state = np.random.randn(self.state_size).astype(np.float32)
+        q_values = get_batcher("rl")(self.batch_key, stacked(self.agent.q_values), state)
+        action = int(np.argmax(q_values))
 
 
         if action == 0:
@@ -1,21 +1,40 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 
 # ---------- Prediction ----------
 class PredictionRequest(BaseModel):
     symbol: str
-    horizon: int = 1
+    horizon: int = 1  # number of trading days to forecast
 
 
 class PredictionResponse(BaseModel):
     symbol: str
-    predicted_price: float
+    predicted_price: float  # price at the end of the horizon
     last_close: float
     confidence_note: str
+    horizon: int = 1
+    predicted_path: List[float] = []  # one predicted price per step 1..horizon
+    predicted_returns: List[float] = []
+    model_version: Optional[int] = None
 
 
 # ---------- Portfolio Optimization ----------
 class PortfolioRequest(BaseModel):
     symbols: List[str]
     lookback: int = 252
+    covariance: str = "sample"  # sample | ledoit_wolf | ewma
+
+
+# ---------- Monte Carlo Risk ----------
+class MonteCarloRequest(BaseModel):
+    symbols: List[str]
+    weights: Optional[List[float]] = None  # equal weights when omitted
+    method: str = "gbm"  # gbm | bootstrap | block_bootstrap
+    n_paths: int = 10000
+    horizons: List[int] = [1, 5, 21]
+    confidence: List[float] = [0.95, 0.99]
+    block_size: int = 5
+    seed: Optional[int] = None
+    window: int = 504
+    initial_value: float = 100000
@@ -0,0 +1,237 @@
+# backend/screener.py
+"""
+Cross-sectional screener over a symbol universe.
+
+Close and volume histories are pivoted into date x symbol panels (cached
+for SCREENER_TTL seconds per symbol set). Every screening field is then
+computed for all symbols at once with column-wise pandas/NumPy
+operations, and only the latest row is kept. Filters and ranking run on
+that one-row-per-symbol table.
+
+    GET /screener?filters=rsi<30,ema_20>ema_50&sort=momentum_21&order=desc&page=1
+"""
+
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import APIRouter, HTTPException
+
+from backend.config.stocks import SUPPORTED_STOCKS
+from backend.diagnostics import register_cache
+from backend.expressions import wilder_rsi
+from backend.metrics import record_cache, span
+from backend.stock_data import fetch_stock_data
+
+SCREENER_TTL = float(os.getenv("SCREENER_TTL", "300"))
+SCREENER_FETCH_WORKERS = int(os.getenv("SCREENER_FETCH_WORKERS", "8"))
+MAX_PAGE_SIZE = 200
+MAX_PANELS = 32
+
+FIELDS = (
+    "price", "change_1d", "rsi", "ema_20", "ema_50", "ema_spread",
+    "volatility", "volatility_annual", "momentum_5", "momentum_21", "momentum_63",
+    "from_high_52w", "volume_avg_20", "volume_ratio",
+)
+_FILTER = re.compile(r"^\s*([a-z_0-9]+)\s*(<=|>=|==|!=|<|>)\s*([^\s]+)\s*$")
+_OPS = {
+    "<": np.less, "<=": np.less_equal, ">": np.greater,
+    ">=": np.greater_equal, "==": np.equal, "!=": np.not_equal,
+}
+
+_panels = OrderedDict()  # (symbols, period) -> (built_at, close, volume, skipped)
+_panels_lock = threading.Lock()
+register_cache("screener_panels", _panels)
+
+
+# -------------------------------------------------
+# Panel
+# -------------------------------------------------
+def _fetch(symbol: str, period: str):
+    try:
+        df = fetch_stock_data(symbol, period=period, columns=["Date", "Close", "Volume"])
+    except Exception:
+        return None
+    if df is None or df.empty:
+        return None
+    return df.set_index("Date")
+
+
+def build_panel(symbols, period: str = "1y"):
+    """(close, volume, skipped): date x symbol frames on the union of dates."""
+    key = (tuple(symbols), period)
+    with _panels_lock:
+        _evict_expired(time.time())
+        cached = _panels.get(key)
+        if cached is not None:
+            _panels.move_to_end(key)
+    record_cache("screener_panel", cached is not None)
+    if cached is not None:
+        return cached[1:]
+
+    with span("fetch_stock_data"):
+        with ThreadPoolExecutor(max_workers=min(SCREENER_FETCH_WORKERS, len(symbols))) as pool:
+            frames = dict(zip(symbols, pool.map(lambda s: _fetch(s, period), symbols)))
+
+    skipped = [s for s, df in frames.items() if df is None]
+    frames = {s: df for s, df in frames.items() if df is not None}
+    if not frames:
+        raise ValueError("No data available for any requested symbol")
+
+    close = pd.concat({s: df["Close"] for s, df in frames.items()}, axis=1).sort_index()
+    volume = pd.concat({s: df["Volume"] for s, df in frames.items()}, axis=1).sort_index()
+    # Fill holiday gaps of one market from the previous bar, never backwards
+    close, volume = close.ffill(), volume.fillna(0.0)
+
+    with _panels_lock:
+        _panels[key] = (time.time(), close, volume, skipped)
+        _panels.move_to_end(key)
+        while len(_panels) > MAX_PANELS:
+            _panels.popitem(last=False)
+    return close, volume, skipped
+
+
+def _evict_expired(now: float):
+    """Drop panels older than SCREENER_TTL; callers hold _panels_lock."""
+    for key in [k for k, v in _panels.items() if now - v[0] >= SCREENER_TTL]:
+        del _panels[key]
+
+
+def screen_fields(close: pd.DataFrame, volume: pd.DataFrame) -> pd.DataFrame:
+    """One row per symbol with every field in FIELDS, from the panels' latest bar."""
+    returns = close.pct_change()
+    ema_20 = close.ewm(span=20, min_periods=20, adjust=False).mean()
+    ema_50 = close.ewm(span=50, min_periods=50, adjust=False).mean()
+    volatility = returns.rolling(20).std()
+    volume_avg = volume.rolling(20).mean()
+
+    last = close.iloc[-1]
+    table = pd.DataFrame({
+        "price": last,
+        "change_1d": returns.iloc[-1],
+        "rsi": wilder_rsi(close.to_numpy())[-1],
+        "ema_20": ema_20.iloc[-1],
+        "ema_50": ema_50.iloc[-1],
+        "ema_spread": (ema_20 / ema_50 - 1).iloc[-1],
+        "volatility": volatility.iloc[-1],
+        "volatility_annual": volatility.iloc[-1] * np.sqrt(252),
+        "momentum_5": last / close.shift(5).iloc[-1] - 1,
+        "momentum_21": last / close.shift(21).iloc[-1] - 1,
+        "momentum_63": last / close.shift(63).iloc[-1] - 1,
+        "from_high_52w": last / close.rolling(252, min_periods=1).max().iloc[-1] - 1,
+        "volume_avg_20": volume_avg.iloc[-1],
+        "volume_ratio": (volume / volume_avg).iloc[-1],
+    })
+    table.index.name = "symbol"
+    return table
+
+
+# -------------------------------------------------
+# Filtering and ranking
+# -------------------------------------------------
+def parse_filters(text: Optional[str]) -> list:
+    """'rsi<30,ema_20>ema_50' -> [("rsi", "<", 30.0), ("ema_20", ">", "ema_50")]"""
+    filters = []
+    for part in (text or "").split(","):
+        if not part.strip():
+            continue
+        match = _FILTER.match(part)
+        if not match:
+            raise ValueError(f"Invalid filter '{part}'; expected <field><op><number|field>")
+        field, op, value = match.groups()
+        if field not in FIELDS:
+            raise ValueError(f"Unknown field '{field}'; expected one of {FIELDS}")
+        if value in FIELDS:
+            filters.append((field, op, value))
+        else:
+            try:
+                filters.append((field, op, float(value)))
+            except ValueError:
+                raise ValueError(f"'{value}' is neither a number nor a field")
+    return filters
+
+
+def apply_screen(table: pd.DataFrame, filters, sort: Optional[str] = None,
+                 descending: bool = True) -> pd.DataFrame:
+    mask = np.ones(len(table), dtype=bool)
+    for field, op, value in filters:
+        rhs = table[value].values if isinstance(value, str) else value
+        # NaN (not enough history) never passes a filter
+        mask &= _OPS[op](table[field].values, rhs) & table[field].notna().values
+
+    result = table[mask]
+    if sort:
+        if sort not in FIELDS:
+            raise ValueError(f"Unknown sort field '{sort}'; expected one of {FIELDS}")
+        result = result.sort_values(sort, ascending=not descending, na_position="last", kind="stable")
+    return result
+
+
+def run_screener(symbols=None, filters: Optional[str] = None, sort: Optional[str] = None,
+                 order: str = "desc", page: int = 1, page_size: int = 20,
+                 period: str = "1y") -> dict:
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be 'asc' or 'desc'")
+    if page < 1 or not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f"page must be >= 1 and page_size between 1 and {MAX_PAGE_SIZE}")
+
+    symbols = list(dict.fromkeys(symbols or SUPPORTED_STOCKS))
+    parsed = parse_filters(filters)
+    close, volume, skipped = build_panel(symbols, period)
+
+    with span("screener"):
+        table = apply_screen(screen_fields(close, volume), parsed, sort, order == "desc")
+
+    rows = table.iloc[(page - 1) * page_size:page * page_size]
+    results = [
+        {"symbol": symbol, **{
+            k: (None if pd.isna(v) else round(float(v), 6)) for k, v in row.items()
+        }}
+        for symbol, row in rows.iterrows()
+    ]
+    return {
+        "as_of": str(close.index[-1]),
+        "universe": len(symbols),
+        "skipped": skipped,
+        "matched": len(table),
+        "page": page,
+        "page_size": page_size,
+        "pages": -(-len(table) // page_size),
+        "results": results,
+    }
+
+
+# -------------------------------------------------
+# API
+# -------------------------------------------------
+router = APIRouter(prefix="/screener", tags=["Screener"])
+
+
+@router.get("")
+def screener(
+    symbols: Optional[str] = None,
+    filters: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: str = "desc",
+    page: int = 1,
+    page_size: int = 20,
+    period: str = "1y",
+):
+    """
+    Screen SUPPORTED_STOCKS (or a comma separated `symbols` list).
+
+    filters: comma separated <field><op><number|field>, e.g.
+             rsi<30,ema_20>ema_50,volatility_annual<0.4
+    sort:    any field; order asc|desc
+    """
+    try:
+        universe = [s.strip().upper() for s in symbols.split(",") if s.strip()] if symbols else None
+        return run_screener(universe, filters, sort, order, page, page_size, period)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
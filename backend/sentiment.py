@@ -2,8 +2,14 @@ from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
 import numpy as np
 
+from backend.metrics import span, record_cache
+from backend.batching import get_batcher
+
 MODEL_NAME = "ProsusAI/finbert"
 
+# Texts per FinBERT forward pass when several requests are batched together
+FINBERT_CHUNK_SIZE = 64
+
 # Cache model in memory (VERY IMPORTANT)
 _tokenizer = None
 _model = None
@@ -11,25 +17,20 @@ _model = None
 
 def load_finbert():
     global _tokenizer, _model
-    if _tokenizer is None or _model is None:
-        _tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-        _model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+    loaded = _tokenizer is not None and _model is not None
+    record_cache("finbert", loaded)
+    if not loaded:
+        with span("finbert_load"):
+            _tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+            _model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
 
 
-def sentiment_score(texts, max_texts=20):
-    """
-    Converts a list of news texts into a single sentiment score [-1, +1]
-    """
-    if not texts:
-        return 0.0
-
-    load_finbert()
-
-    scores = []
-
-    for text in texts[:max_texts]:
+def _text_probs(texts):
+    """FinBERT class probabilities for a list of texts, in padded chunks."""
+    probs = []
+    for i in range(0, len(texts), FINBERT_CHUNK_SIZE):
         inputs = _tokenizer(
-            text,
+            texts[i:i + FINBERT_CHUNK_SIZE],
             return_tensors="pt",
             truncation=True,
             padding=True
@@ -37,10 +38,30 @@ def sentiment_score(texts, max_texts=20):
 
         with torch.no_grad():
             outputs = _model(**inputs)
-            probs = torch.softmax(outputs.logits, dim=1)[0].numpy()
+            probs.append(torch.softmax(outputs.logits, dim=1).numpy())
+
+    return np.concatenate(probs)
 
-        # FinBERT label order: [negative, neutral, positive]
-        score = float(probs[2] - probs[0])
-        scores.append(score)
 
-    return float(np.mean(scores))
+def _batch_scores(text_lists):
+    """One score per request: every request's texts go through one pass."""
+    load_finbert()
+
+    texts = [text for texts in text_lists for text in texts]
+    with span("finbert_inference"):
+        probs = _text_probs(texts)
+
+    # FinBERT label order: [negative, neutral, positive]
+    scores = probs[:, 2] - probs[:, 0]
+    bounds = np.cumsum([0] + [len(texts) for texts in text_lists])
+    return [float(np.mean(scores[a:b])) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def sentiment_score(texts, max_texts=20):
+    """
+    Converts a list of news texts into a single sentiment score [-1, +1]
+    """
+    if not texts:
+        return 0.0
+
+    return get_batcher("finbert")("finbert", _batch_scores, list(texts[:max_texts]))
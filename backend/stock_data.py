@@ -1,19 +1,48 @@
-import yfinance as yf
 import pandas as pd
 
-def fetch_stock_data(symbol: str, period="2y", interval="1d"):
+from backend.data_providers import get_provider
+
+def fetch_stock_data(symbol: str, period="2y", interval="1d",
+                     start=None, end=None, columns=None):
     """
-    Fetch live historical stock data.
+    Fetch historical stock data from the configured market data
+    provider (MARKET_DATA_PROVIDER: yfinance, local or synthetic).
     Supports US and Indian stocks.
     Example:
       AAPL
       RELIANCE.NS
     """
-    ticker = yf.Ticker(symbol)
-    df = ticker.history(period=period, interval=interval)
+    return get_provider().fetch(
+        symbol,
+        period=period,
+        interval=interval,
+        start=start,
+        end=end,
+        columns=columns,
+    )
+
+
+def rows_since(df: pd.DataFrame, since: str | None, column: str = "Date"):
+    """
+    Return only the rows strictly newer than `since`.
+
+    `since` is the cursor handed out by a previous call (the string form
+    of the last seen timestamp) or any ISO date/datetime. Naive values are
+    interpreted in the timezone of the data.
+    """
+    if since is None or df.empty:
+        return df
+
+    try:
+        cursor = pd.Timestamp(since)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid 'since' value: {since}")
 
-    if df.empty:
-        raise ValueError("Invalid stock symbol or no data found")
+    dates = pd.to_datetime(df[column])
+    tz = dates.dt.tz
+    if tz is not None and cursor.tzinfo is None:
+        cursor = cursor.tz_localize(tz)
+    elif tz is None and cursor.tzinfo is not None:
+        cursor = cursor.tz_convert(None)
 
-    df = df.reset_index()
-    return df
+    return df[(dates > cursor).values]
@@ -0,0 +1,307 @@
+"""
+Parallel parameter sweeps of the vectorized backtester.
+
+Every symbol's close prices are fetched once and packed into a single
+shared-memory block. Pool workers attach to it at start-up and read
+their slices as zero-copy NumPy views, so a task only ships a few grid
+points. Results stream back as tasks finish: the ranked summary and the
+progress line update continuously, and each grid point can be appended
+to a JSON-lines file as soon as it is known.
+
+    python -m backend.sweep --strategy ema_crossover --symbols all \
+        --param fast=5,10,20 --param slow=50,100,200 --param cost_bps=0,5 \
+        --metric sharpe --top 10 --workers 4 --output sweep.jsonl
+
+Grid parameters are either indicator parameters of the strategy
+(STRATEGY_PARAMS) or keyword arguments of backtesting.run_backtest.
+"""
+
+import sys
+import json
+import time
+import heapq
+import argparse
+import itertools
+from concurrent.futures import as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from backend.config.stocks import SUPPORTED_STOCKS
+from backend.parallel import process_pool
+
+STRATEGY_PARAMS = {
+    "ema_crossover": {"fast": 20, "slow": 50},
+    "rsi": {"period": 14, "lower": 30.0, "upper": 70.0, "exit_level": 50.0},
+}
+ENGINE_PARAMS = (
+    "cost_bps", "slippage_bps", "sizing", "leverage", "max_leverage",
+    "allow_short", "target_vol", "vol_window",
+)
+METRICS = ("sharpe", "sortino", "cagr", "total_return", "max_drawdown", "hit_rate")
+
+
+def expand_grid(grid: dict) -> list:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def _validate(strategy: str, points: list) -> list:
+    if strategy not in STRATEGY_PARAMS:
+        raise ValueError(f"Unknown strategy '{strategy}'; expected one of {tuple(STRATEGY_PARAMS)}")
+    allowed = set(STRATEGY_PARAMS[strategy]) | set(ENGINE_PARAMS)
+    for point in points:
+        unknown = set(point) - allowed
+        if unknown:
+            raise ValueError(f"Unknown parameters for {strategy}: {sorted(unknown)}")
+    if strategy == "ema_crossover":
+        defaults = STRATEGY_PARAMS[strategy]
+        points = [
+            p for p in points
+            if p.get("fast", defaults["fast"]) < p.get("slow", defaults["slow"])
+        ]
+    return points
+
+
+# -------------------------------------------------
+# Shared price panel
+# -------------------------------------------------
+class SharedPanel:
+    """
+    Close prices of many symbols in one shared-memory block.
+    `layout` maps symbol -> (offset, length) in float64 elements and is
+    all a worker needs, together with the block name, to attach.
+    """
+
+    def __init__(self, prices: dict):
+        self.layout, offset = {}, 0
+        for symbol, values in prices.items():
+            self.layout[symbol] = (offset, len(values))
+            offset += len(values)
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, offset) * 8)
+        data = np.ndarray((offset,), dtype=np.float64, buffer=self.shm.buf)
+        for symbol, (start, length) in self.layout.items():
+            data[start:start + length] = prices[symbol]
+        del data  # release the export so the block can be closed
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+_worker = {}  # per-process state: shared block, views, indicator cache
+
+
+def _attach(name: str, layout: dict):
+    shm = shared_memory.SharedMemory(name=name)
+    data = np.ndarray((sum(n for _, n in layout.values()),), dtype=np.float64, buffer=shm.buf)
+    _worker.update(
+        shm=shm,
+        prices={s: data[start:start + n] for s, (start, n) in layout.items()},
+        cache={},
+    )
+
+
+def _indicator(symbol: str, name: str, window: int) -> np.ndarray:
+    """EMA/RSI of a symbol's closes, cached per worker across grid points."""
+    key = (symbol, name, window)
+    cache = _worker["cache"]
+    if key not in cache:
+        import pandas as pd
+        import ta
+
+        close = pd.Series(_worker["prices"][symbol])
+        if name == "ema":
+            values = ta.trend.EMAIndicator(close, window=window).ema_indicator()
+        else:
+            values = ta.momentum.RSIIndicator(close, window=window).rsi()
+        cache[key] = values.to_numpy()
+    return cache[key]
+
+
+def _signals(strategy: str, symbol: str, params: dict) -> np.ndarray:
+    from backend.backtesting import ema_crossover_signals, rsi_signals
+
+    if strategy == "ema_crossover":
+        return ema_crossover_signals(
+            _indicator(symbol, "ema", params["fast"]), _indicator(symbol, "ema", params["slow"])
+        )
+    return rsi_signals(
+        _indicator(symbol, "rsi", params["period"]),
+        params["lower"], params["upper"], params["exit_level"],
+    )
+
+
+def evaluate(strategy: str, points: list) -> list:
+    """Backtest grid points on every symbol of the attached panel (worker side)."""
+    from backend.backtesting import run_backtest
+
+    results = []
+    for point in points:
+        params = dict(STRATEGY_PARAMS[strategy], **point)
+        engine = {k: v for k, v in point.items() if k in ENGINE_PARAMS}
+
+        per_symbol = {}
+        for symbol, prices in _worker["prices"].items():
+            sheet = run_backtest(prices, _signals(strategy, symbol, params), series=False, **engine)
+            per_symbol[symbol] = {m: round(float(sheet[m]), 4) for m in METRICS}
+
+        summary = {
+            m: round(float(np.mean([r[m] for r in per_symbol.values()])), 4) for m in METRICS
+        }
+        summary["worst_drawdown"] = min(r["max_drawdown"] for r in per_symbol.values())
+        results.append({"params": point, "mean": summary, "symbols": per_symbol})
+    return results
+
+
+# -------------------------------------------------
+# Driver
+# -------------------------------------------------
+def load_prices(symbols, period: str = "2y") -> dict:
+    from backend.stock_data import fetch_stock_data
+
+    prices = {}
+    for symbol in symbols:
+        try:
+            df = fetch_stock_data(symbol, period=period)
+        except Exception as e:
+            print(f">>> {symbol}: skipped ({e})", file=sys.stderr)
+            continue
+        if df is not None and len(df) > 1:
+            prices[symbol] = df["Close"].to_numpy(dtype=np.float64)
+    if not prices:
+        raise ValueError("No price data for any requested symbol")
+    return prices
+
+
+def print_progress(done: int, total: int, elapsed: float, best):
+    eta = elapsed / done * (total - done) if done else 0.0
+    line = f"\r[sweep] {done}/{total} ({done / total:.0%})  {elapsed:.1f}s  ETA {eta:.1f}s"
+    if best is not None:
+        line += f"  best {best[0]:.4f} {json.dumps(best[1])}"
+    print(line, end="" if done < total else "\n", file=sys.stderr, flush=True)
+
+
+def run_sweep(strategy: str, grid: dict, symbols=None, period: str = "2y",
+              metric: str = "sharpe", top: int = 20, workers=None, chunksize: int = 4,
+              output=None, progress=print_progress) -> dict:
+    """
+    Evaluate every grid point on every symbol and rank the points by the
+    cross-symbol mean of `metric` (max_drawdown ranks least negative first).
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}'; expected one of {METRICS}")
+    points = _validate(strategy, expand_grid(grid))
+    if not points:
+        raise ValueError("Parameter grid is empty")
+
+    started = time.perf_counter()
+    panel = SharedPanel(load_prices(symbols or list(SUPPORTED_STOCKS), period))
+    load_s = time.perf_counter() - started
+
+    ranked, done = [], 0  # min-heap of (score, index, result) holding the top `top`
+    sink = open(output, "w") if output else None
+    try:
+        with process_pool(workers, initializer=_attach, initargs=(panel.name, panel.layout)) as pool:
+            futures = [
+                pool.submit(evaluate, strategy, points[i:i + chunksize])
+                for i in range(0, len(points), chunksize)
+            ]
+            for future in as_completed(futures):
+                for result in future.result():
+                    score = result["mean"][metric]
+                    entry = (score, done, result)
+                    if len(ranked) < top:
+                        heapq.heappush(ranked, entry)
+                    elif score > ranked[0][0]:
+                        heapq.heapreplace(ranked, entry)
+                    if sink:
+                        sink.write(json.dumps(result) + "\n")
+                    done += 1
+                if sink:
+                    sink.flush()
+                if progress:
+                    best = max(ranked, key=lambda e: e[0]) if ranked else None
+                    progress(
+                        done, len(points), time.perf_counter() - started,
+                        (best[0], best[2]["params"]) if best else None,
+                    )
+    finally:
+        panel.close()
+        if sink:
+            sink.close()
+
+    return {
+        "strategy": strategy,
+        "metric": metric,
+        "symbols": list(panel.layout),
+        "n_points": len(points),
+        "load_s": round(load_s, 2),
+        "wall_s": round(time.perf_counter() - started, 2),
+        "top": [
+            {"rank": i + 1, "params": r["params"], **r["mean"]}
+            for i, (_, _, r) in enumerate(sorted(ranked, key=lambda e: (-e[0], e[1])))
+        ],
+    }
+
+
+def _parse_value(text: str):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def parse_grid(specs) -> dict:
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if not name or not values:
+            raise ValueError(f"Expected name=v1,v2,... but got '{spec}'")
+        grid[name.strip()] = [_parse_value(v.strip()) for v in values.split(",")]
+    return grid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep of backtests")
+    parser.add_argument("--strategy", choices=tuple(STRATEGY_PARAMS), default="ema_crossover")
+    parser.add_argument("--param", action="append", default=[],
+                        help="grid axis as name=v1,v2,... (repeatable)")
+    parser.add_argument("--symbols", default="all",
+                        help="comma separated symbols, or 'all' for SUPPORTED_STOCKS")
+    parser.add_argument("--period", default="2y")
+    parser.add_argument("--metric", choices=METRICS, default="sharpe")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: cpu_count)")
+    parser.add_argument("--chunksize", type=int, default=4, help="grid points per task")
+    parser.add_argument("--output", help="stream every result to this JSON-lines file")
+    args = parser.parse_args(argv)
+
+    if args.symbols == "all":
+        symbols = list(SUPPORTED_STOCKS)
+    else:
+        symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
+
+    report = run_sweep(
+        args.strategy, parse_grid(args.param), symbols, period=args.period,
+        metric=args.metric, top=args.top, workers=args.workers,
+        chunksize=args.chunksize, output=args.output,
+    )
+
+    print(f"{report['n_points']} grid points x {len(report['symbols'])} symbols "
+          f"in {report['wall_s']} s")
+    for row in report["top"]:
+        print(f"{row['rank']:>3}. {args.metric} {row[args.metric]:>8.4f}  "
+              f"cagr {row['cagr']:>8.4f}  dd {row['worst_drawdown']:>8.4f}  "
+              f"{json.dumps(row['params'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from backend.rl_inference import RLTrader
+from backend.metrics import span
 
 router = APIRouter(prefix="/trade-signal", tags=["Trade Signal"])
 
@@ -16,14 +17,16 @@ class TradeSignalRequest(BaseModel):
 def get_trade_signal(symbol: str, horizon: int = 1):
     from backend.rl_inference import RLTrader
     try:
-        trader = RLTrader(symbol)
-        signal, confidence = trader.predict_signal()
+        with span("rl_model_load"):
+            trader = RLTrader(symbol)
+        with span("rl_inference"):
+            signal, confidence = trader.predict_signal()
 
         return {
             "symbol": symbol,
             "signal": signal,
             "confidence": round(float(confidence), 3),
-            "context": "TensorFlow RL (inference-only)"
+            "context": f"{'NumPy' if trader.runtime == 'numpy' else 'TensorFlow'} RL (inference-only)"
         }
 
     except Exception as e:
@@ -0,0 +1,160 @@
+"""
+Offline batch training of the LSTM and RL models for a symbol universe.
+
+Each symbol is one task in a spawn-based process pool. A worker fetches
+the symbol's history once, builds features once, then trains the LSTM
+and/or the DQN agent from them, with TF/BLAS threads pinned per worker
+to avoid oversubscription. Artifacts are written atomically, so the API
+can keep serving the previous models while a run is in progress.
+
+    python -m backend.train_all --symbols all --workers 4 --threads 1
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import traceback
+
+from backend.config.stocks import SUPPORTED_STOCKS
+from backend.features import FEATURE_COLS
+from backend.parallel import process_pool
+
+
+def train_symbol(symbol: str, models=("lstm", "rl"), period: str = "2y",
+                 horizon: int = 1, epochs: int = 10, episodes: int = 5,
+                 refresh: bool = False) -> dict:
+    """
+    Train and save the requested models for one symbol; returns timings.
+    With `refresh`, an existing LSTM is fine-tuned on its new bars only.
+    """
+    timings = {}
+    report = {"symbol": symbol, "status": "ok", "timings": timings}
+    started = time.perf_counter()
+
+    try:
+        from backend.stock_data import fetch_stock_data
+        from backend.feature_store import load_features
+
+        t = time.perf_counter()
+        df = fetch_stock_data(symbol, period=period)
+        timings["fetch_s"] = round(time.perf_counter() - t, 3)
+
+        t = time.perf_counter()
+        df_feat = load_features(symbol, df, period=period)
+        features = df_feat[FEATURE_COLS].values
+        prices = df_feat["Close"].values
+        timings["features_s"] = round(time.perf_counter() - t, 3)
+        report["bars"] = int(len(prices))
+
+        if "lstm" in models:
+            from backend.lstm_model import LSTMPredictor
+            from backend.model_registry import get_model_path, get_scaler_path, refresh_lstm
+
+            t = time.perf_counter()
+            if refresh and os.path.exists(get_model_path(symbol)):
+                report["lstm_refresh"] = refresh_lstm(symbol, df_feat=df_feat)
+            else:
+                predictor = LSTMPredictor(horizon=horizon)
+                predictor.train(features, prices, epochs=epochs,
+                                last_bar=str(df_feat["Date"].iloc[-1]))
+                predictor.save(get_model_path(symbol), get_scaler_path(symbol))
+            timings["lstm_s"] = round(time.perf_counter() - t, 3)
+
+        if "rl" in models:
+            from backend.train_rl_tf import train_rl_agent
+            from backend.model_registry import get_rl_model_path
+
+            t = time.perf_counter()
+            agent = train_rl_agent(prices, features, episodes, verbose=False)
+            agent.save(get_rl_model_path(symbol))
+            timings["rl_s"] = round(time.perf_counter() - t, 3)
+
+    except Exception as e:
+        report["status"] = "error"
+        report["error"] = f"{type(e).__name__}: {e}"
+        report["traceback"] = traceback.format_exc()
+
+    timings["total_s"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def train_universe(symbols, workers=None, threads=1, **kwargs) -> dict:
+    started = time.perf_counter()
+    results = []
+
+    if workers == 1:
+        from backend.parallel import pin_threads
+        pin_threads(threads)
+        for sym in symbols:
+            results.append(train_symbol(sym, **kwargs))
+            print(f">>> {sym}: {results[-1]['status']} ({results[-1]['timings']['total_s']} s)")
+    else:
+        with process_pool(workers, threads) as pool:
+            futures = {pool.submit(train_symbol, sym, **kwargs): sym for sym in symbols}
+            for future in futures:
+                results.append(future.result())
+                print(f">>> {futures[future]}: {results[-1]['status']} "
+                      f"({results[-1]['timings']['total_s']} s)")
+
+    wall = time.perf_counter() - started
+    busy = sum(r["timings"]["total_s"] for r in results)
+    return {
+        "wall_s": round(wall, 2),
+        "worker_busy_s": round(busy, 2),
+        # busy / wall ≈ effective number of workers kept busy
+        "parallel_speedup": round(busy / wall, 2) if wall else None,
+        "failed": [r["symbol"] for r in results if r["status"] != "ok"],
+        "symbols": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-train LSTM and RL models")
+    parser.add_argument("--symbols", default="all",
+                        help="comma separated symbols, or 'all' for SUPPORTED_STOCKS")
+    parser.add_argument("--models", default="lstm,rl", help="lstm, rl or both")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: cpu_count / threads)")
+    parser.add_argument("--threads", type=int, default=1, help="TF/BLAS threads per worker")
+    parser.add_argument("--period", default="2y")
+    parser.add_argument("--horizon", type=int, default=1, help="LSTM forecast horizon")
+    parser.add_argument("--epochs", type=int, default=10, help="LSTM epochs")
+    parser.add_argument("--episodes", type=int, default=5, help="RL episodes")
+    parser.add_argument("--refresh", action="store_true",
+                        help="fine-tune existing LSTMs on new bars instead of retraining")
+    parser.add_argument("--report", help="write the JSON timing report to this file")
+    args = parser.parse_args(argv)
+
+    if args.symbols == "all":
+        symbols = list(SUPPORTED_STOCKS)
+    else:
+        symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
+    models = tuple(m.strip() for m in args.models.split(",") if m.strip())
+
+    report = train_universe(
+        symbols,
+        workers=args.workers,
+        threads=args.threads,
+        models=models,
+        period=args.period,
+        horizon=args.horizon,
+        epochs=args.epochs,
+        episodes=args.episodes,
+        refresh=args.refresh,
+    )
+
+    print(f"wall: {report['wall_s']} s, busy: {report['worker_busy_s']} s, "
+          f"speedup: {report['parallel_speedup']}x")
+    if report["failed"]:
+        print(f"failed: {', '.join(report['failed'])}", file=sys.stderr)
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,21 @@
 import numpy as np
-import os
 
+from backend.stock_data import fetch_stock_data
+from backend.features import FEATURE_COLS
+from backend.feature_store import load_features
+from backend.rl_env import TradingEnv
+from backend.dqn_agent_tf import DQNAgentTF
+from backend.model_registry import get_rl_model_path
 
-from stock_data import fetch_stock_data
-from features import create_features
-from rl_env import TradingEnv
-from dqn_agent_tf import DQNAgentTF
 
-
-print(">>> TensorFlow RL training started")
-
-
-def run_rl_training(
-    symbol: str = "AAPL",
-    episodes: int = 5,
-):
+def train_rl_agent(prices, features, episodes: int = 5, sentiment=None, verbose: bool = True):
     # -------------------------------------------------
-    # 1. Fetch and prepare data
+    # 1. Create trading environment
     # -------------------------------------------------
-    df = fetch_stock_data(symbol)
-    df_feat = create_features(df)
+    if sentiment is None:
+        # Sentiment placeholder (can be real later)
+        sentiment = np.zeros(len(prices))
 
-    feature_cols = ["rsi", "ema_20", "ema_50", "volatility"]
-    features = df_feat[feature_cols].values
-    prices = df_feat["Close"].values
-
-    # Sentiment placeholder (can be real later)
-    sentiment = np.zeros(len(prices))
-
-    # -------------------------------------------------
-    # 2. Create trading environment
-    # -------------------------------------------------
     env = TradingEnv(
         prices=prices,
         features=features,
@@ -42,16 +27,17 @@ def run_rl_training(
     state_size = len(state)
 
     # -------------------------------------------------
-    # 3. Create RL agent
+    # 2. Create RL agent
     # -------------------------------------------------
     agent = DQNAgentTF(state_size)
 
-    print(">>> RL environment ready")
-    print(f">>> State size: {state_size}")
-    print(f">>> Episodes: {episodes}")
+    if verbose:
+        print(">>> RL environment ready")
+        print(f">>> State size: {state_size}")
+        print(f">>> Episodes: {episodes}")
 
     # -------------------------------------------------
-    # 4. Training loop
+    # 3. Training loop
     # -------------------------------------------------
     for ep in range(episodes):
         state = env.reset()
@@ -75,17 +61,36 @@ def run_rl_training(
             if done:
                 break
 
-        print(
-            f"Episode {ep + 1}/{episodes} — "
-            f"Reward: {total_reward:.4f}"
-        )
+        if verbose:
+            print(
+                f"Episode {ep + 1}/{episodes} — "
+                f"Reward: {total_reward:.4f}"
+            )
+
+    return agent
+
+
+def run_rl_training(
+    symbol: str = "AAPL",
+    episodes: int = 5,
+):
+    print(">>> TensorFlow RL training started")
 
     # -------------------------------------------------
-# 5. Save trained RL model
-# -------------------------------------------------
-    os.makedirs("models/rl", exist_ok=True)
+    # Fetch and prepare data
+    # -------------------------------------------------
+    df = fetch_stock_data(symbol)
+    df_feat = load_features(symbol, df)
+
+    features = df_feat[FEATURE_COLS].values
+    prices = df_feat["Close"].values
 
-    model_path = f"models/rl/{symbol}.keras"
+    agent = train_rl_agent(prices, features, episodes)
+
+    # -------------------------------------------------
+    # Save trained RL model
+    # -------------------------------------------------
+    model_path = get_rl_model_path(symbol)
     agent.save(model_path)
 
     print(f">>> RL model saved to: {model_path}")
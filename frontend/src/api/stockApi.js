@@ -4,8 +4,9 @@ const api = axios.create({
   baseURL: "http://127.0.0.1:8000",
 });
 
-export const fetchHistory = (symbol) =>
-  api.get(`/history/${symbol}`);
+// Pass { since: cursor } to receive only bars newer than the last response
+export const fetchHistory = (symbol, params = {}) =>
+  api.get(`/history/${symbol}`, { params });
 
 export const predictStock = (payload) =>
   api.post("/predict", payload);